@@ -3,127 +3,109 @@
 Add a new Cannabis Flower product to Dutchie’s product catalog.
 """
 import sys
-import time
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.common.keys import Keys
-from automation.login import login_to_dutchie
+from automation.locators import RETRY_ATTEMPTS, find, retry, wait_gone
+from automation.session import dutchie_session
+from automation.urls import url
+from automation.waits import StepTimer, wait_for_network_idle, wait_for_page_ready
 
-# URLs and XPaths
-NEW_PRODUCT_URL = "https://peak.backoffice.dutchie.com/products/catalog/newProduct"
-HEADER_XPATH = "/html/body/div[1]/div/div[2]/div[2]/div[1]/header/div[1]/div/h1"
+NEW_PRODUCT_URL = url("/products/catalog/newProduct")
 
-NAME_INPUT_XPATH = "/html/body/div[1]/div/div[2]/div[2]/div[1]/div[2]/div[1]/div[1]/div/div/input"
-GENERATE_SKU_XPATH = "/html/body/div[1]/div/div[2]/div[2]/div[1]/div[2]/div[1]/div[2]/div/div/div/button"
+# Steps of the New Product form, in order (locators live in automation/locators.py)
+STEPS = (
+    "load new product page", "name + SKU", "category dropdowns", "prices",
+    "strain", "vendor", "pricing tier", "save",
+)
 
-CATEGORY_DROPDOWN_XPATH = "/html/body/div[1]/div/div[2]/div[2]/div[1]/div[2]/div[1]/div[5]/div/div"
-CATEGORY_OPTION_XPATH = "/html/body/div[3]/div[3]/ul/li[2]"  # Cannabis Flower
 
-EXTERNAL_CAT_DROPDOWN_XPATH = "/html/body/div[1]/div/div[2]/div[2]/div[1]/div[2]/div[1]/div[6]/div/div"
-EXTERNAL_CAT_OPTION_XPATH = "/html/body/div[3]/div[3]/ul/li[2]"  # Buds by Strain
+def _fill(el, text):
+    el.clear()
+    el.send_keys(text)
 
-TYPE_DROPDOWN_XPATH = "/html/body/div[1]/div/div[2]/div[2]/div[1]/div[2]/div[1]/div[8]/div/div"
-TYPE_OPTION_XPATH = "/html/body/div[3]/div[3]/ul/li[2]"  # Weight
 
-UNIT_DROPDOWN_XPATH = "/html/body/div[1]/div/div[2]/div[2]/div[1]/div[2]/div[1]/div[9]/div/div"
-UNIT_OPTION_XPATH = "/html/body/div[3]/div[3]/ul/li[1]"  # Gram
+def _close_menus(driver):
+    """Dismiss a dropdown left open by a failed attempt."""
+    driver.find_element(By.TAG_NAME, "body").send_keys(Keys.ESCAPE)
 
-RETAIL_INPUT_XPATH = "/html/body/div[1]/div/div[2]/div[2]/div[1]/div[2]/div[1]/div[14]/div/div/input"
-COST_INPUT_XPATH   = "/html/body/div[1]/div/div[2]/div[2]/div[1]/div[2]/div[1]/div[18]/div/div/input"
 
-STRAIN_DROPDOWN_XPATH     = "/html/body/div[1]/div/div[2]/div[2]/div[1]/div[2]/div[1]/div[22]/div/div/div"
-STRAIN_OPTION_XPATH       = "/html/body/div[3]/div/div[2]/div/div/div/ul/li[1]/div/div"
+def _select_option(driver, dropdown, option, timeout):
+    """Open a dropdown, pick an option and wait for the menu to close."""
+    find(driver, dropdown, timeout, clickable=True).click()
+    find(driver, option, timeout, clickable=True).click()
+    wait_gone(driver, option, timeout)
 
-VENDOR_DROPDOWN_XPATH     = "/html/body/div[1]/div/div[2]/div[2]/div[1]/div[2]/div[1]/div[23]/div/div"
-VENDOR_OPTION_XPATH       = "/html/body/div[3]/div/div[2]/div/div/div/ul/li[1]"
 
-PRICING_TIER_DROPDOWN_XPATH = "/html/body/div[1]/div/div[2]/div[2]/div[1]/div[2]/div[1]/div[33]/div/div/div/svg"
-PRICING_TIER_OPTION_XPATH   = "/html/body/div[3]/div/div[2]/div/div/div/ul/li[3]/div/div/span"
+def _select_search_option(driver, dropdown, option, text, timeout):
+    """Open a searchable dropdown, type `text` and pick the first result."""
+    box = find(driver, dropdown, timeout, clickable=True)
+    box.click()
+    inputs = box.find_elements(By.XPATH, "./input") or box.find_elements(By.TAG_NAME, "input")
+    _fill(inputs[0] if inputs else driver.switch_to.active_element, text)
+    wait_for_network_idle(driver, timeout)
+    find(driver, option, timeout, clickable=True).click()
+    wait_gone(driver, option, timeout)
 
-SAVE_BUTTON_XPATH = "/html/body/div[1]/div/div[2]/div[2]/div[1]/div[2]/div[2]/div/button"
 
-
-def add_cannabis_flower_product(driver, product_name, retail_price, cost_price, strain_name, vendor_name, timeout=15):
+def add_cannabis_flower_product(driver, product_name, retail_price, cost_price, strain_name,
+                                vendor_name, timeout=15, on_step=None):
     """
     Create a new Cannabis Flower product in Dutchie.
+
+    Each step is retried with backoff on stale elements and timeouts;
+    `on_step(name)` is called after every step that completes.
     """
-    # 1) Navigate to New Product page
-    driver.get(NEW_PRODUCT_URL)
-    WebDriverWait(driver, timeout).until(
-        EC.text_to_be_present_in_element((By.XPATH, HEADER_XPATH), "New Product")
-    )
-    time.sleep(1)
-
-    # 2) Fill product name & generate SKU
-    driver.find_element(By.XPATH, NAME_INPUT_XPATH).send_keys(product_name)
-    driver.find_element(By.XPATH, GENERATE_SKU_XPATH).click()
-    time.sleep(1)
-
-    # 3) Select Category
-    driver.find_element(By.XPATH, CATEGORY_DROPDOWN_XPATH).click()
-    WebDriverWait(driver, timeout).until(
-        EC.element_to_be_clickable((By.XPATH, CATEGORY_OPTION_XPATH))
-    ).click()
-    time.sleep(0.5)
-
-    # 4) Select External Category
-    driver.find_element(By.XPATH, EXTERNAL_CAT_DROPDOWN_XPATH).click()
-    WebDriverWait(driver, timeout).until(
-        EC.element_to_be_clickable((By.XPATH, EXTERNAL_CAT_OPTION_XPATH))
-    ).click()
-    time.sleep(0.5)
-
-    # 5) Select Type
-    driver.find_element(By.XPATH, TYPE_DROPDOWN_XPATH).click()
-    WebDriverWait(driver, timeout).until(
-        EC.element_to_be_clickable((By.XPATH, TYPE_OPTION_XPATH))
-    ).click()
-    time.sleep(0.5)
-
-    # 6) Select Unit
-    driver.find_element(By.XPATH, UNIT_DROPDOWN_XPATH).click()
-    WebDriverWait(driver, timeout).until(
-        EC.element_to_be_clickable((By.XPATH, UNIT_OPTION_XPATH))
-    ).click()
-    time.sleep(0.5)
-
-    # 7) Enter prices
-    driver.find_element(By.XPATH, RETAIL_INPUT_XPATH).send_keys(str(retail_price))
-    driver.find_element(By.XPATH, COST_INPUT_XPATH).send_keys(str(cost_price))
-    time.sleep(0.5)
-
-    # 8) Select Strain
-    driver.find_element(By.XPATH, STRAIN_DROPDOWN_XPATH).click()
-    time.sleep(0.5)
-    search_box = driver.find_element(By.XPATH, STRAIN_DROPDOWN_XPATH + "/input")
-    search_box.send_keys(strain_name)
-    WebDriverWait(driver, timeout).until(
-        EC.element_to_be_clickable((By.XPATH, STRAIN_OPTION_XPATH))
-    ).click()
-    time.sleep(0.5)
-
-    # 9) Select Vendor
-    driver.find_element(By.XPATH, VENDOR_DROPDOWN_XPATH).click()
-    time.sleep(0.5)
-    vendor_box = driver.find_element(By.XPATH, VENDOR_DROPDOWN_XPATH + "/input")
-    vendor_box.send_keys(vendor_name)
-    WebDriverWait(driver, timeout).until(
-        EC.element_to_be_clickable((By.XPATH, VENDOR_OPTION_XPATH))
-    ).click()
-    time.sleep(0.5)
-
-    # 10) Select Pricing Tier
-    driver.find_element(By.XPATH, PRICING_TIER_DROPDOWN_XPATH).click()
-    WebDriverWait(driver, timeout).until(
-        EC.element_to_be_clickable((By.XPATH, PRICING_TIER_OPTION_XPATH))
-    ).click()
-    time.sleep(0.5)
-
-    # 11) Save new product
-    driver.find_element(By.XPATH, SAVE_BUTTON_XPATH).click()
-    time.sleep(2)
+    timer = StepTimer(f"Add Product {product_name!r}", trace="add_product", driver=driver)
+
+    def load_page():
+        driver.get(NEW_PRODUCT_URL)
+        header = find(driver, "new_product.header", timeout)
+        WebDriverWait(driver, timeout).until(lambda d: header.text.strip() == "New Product")
+        wait_for_page_ready(driver, timeout)
+
+    def name_and_sku():
+        _fill(find(driver, "new_product.name", timeout), product_name)
+        find(driver, "new_product.generate_sku", timeout, clickable=True).click()
+        wait_for_network_idle(driver, timeout)
+
+    def categories():
+        # Category, External Category, Type, Unit
+        _select_option(driver, "new_product.category", "new_product.category.flower", timeout)
+        _select_option(driver, "new_product.external_category",
+                       "new_product.external_category.buds", timeout)
+        _select_option(driver, "new_product.type", "new_product.type.weight", timeout)
+        _select_option(driver, "new_product.unit", "new_product.unit.gram", timeout)
+
+    def prices():
+        _fill(find(driver, "new_product.retail", timeout), str(retail_price))
+        _fill(find(driver, "new_product.cost", timeout), str(cost_price))
+
+    def strain():
+        _select_search_option(driver, "new_product.strain", "new_product.strain.first",
+                              strain_name, timeout)
+
+    def vendor():
+        _select_search_option(driver, "new_product.vendor", "new_product.vendor.first",
+                              vendor_name, timeout)
+
+    def pricing_tier():
+        _select_option(driver, "new_product.pricing_tier", "new_product.pricing_tier.option", timeout)
+
+    def save():
+        find(driver, "new_product.save", timeout, clickable=True).click()
+        wait_for_page_ready(driver, timeout)
+
+    actions = (load_page, name_and_sku, categories, prices, strain, vendor, pricing_tier, save)
+    for name, action in zip(STEPS, actions):
+        with timer.step(name):
+            # Saving twice could create a duplicate, so never retry the click
+            retry(action, attempts=1 if action is save else RETRY_ATTEMPTS,
+                  on_retry=lambda e: _close_menus(driver), label=f"{product_name}: {name}")
+        if on_step:
+            on_step(name)
     print(f"[Add Product] Created: {product_name}")
+    timer.report()
 
 
 def main():
@@ -131,12 +113,11 @@ def main():
         print("Usage: python add_product.py <name> <retail> <cost> <strain> <vendor>")
         sys.exit(1)
     name, retail, cost, strain, vendor = sys.argv[1:6]
-    driver = login_to_dutchie()
-    if not driver:
-        print("Login failed.")
-        sys.exit(1)
-    add_cannabis_flower_product(driver, name, retail, cost, strain, vendor)
-    driver.quit()
+    with dutchie_session() as driver:
+        if not driver:
+            print("Login failed.")
+            sys.exit(1)
+        add_cannabis_flower_product(driver, name, retail, cost, strain, vendor)
 
 if __name__ == "__main__":
     main()
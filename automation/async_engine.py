@@ -0,0 +1,516 @@
+# automation/async_engine.py
+"""
+An asyncio browser engine: one Chrome process, one logged-in browser
+context and up to ASYNC_PAGES tabs working at the same time.
+
+The Selenium flows need a thread and a whole Chrome per concurrent task;
+here every task borrows a tab of the same browser, and the tabs share the
+context's cookies, so one login serves them all. AsyncEngine offers async
+versions of search_catalog, search_vendor, create_or_edit_strain and
+add_cannabis_flower_product, reusing the Selenium modules' locators, XPaths,
+page scripts and step names (traced as "async.<flow>.<step>"):
+
+    async with AsyncEngine(pages=8) as engine:
+        results = await asyncio.gather(*(engine.search_catalog(t) for t in terms))
+
+Needs Playwright (pip install playwright). By default it drives the
+installed Chrome (INTAKE_PLAYWRIGHT_CHANNEL=chrome); set the variable to an
+empty value to use Playwright's own Chromium (playwright install chromium).
+
+Usage:
+    python -m automation.async_engine [--pages N] catalog TERM [TERM ...]
+    python -m automation.async_engine [--pages N] vendors NAME [NAME ...]
+    python -m automation.async_engine [--pages N] strains NAME [NAME ...]
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+from contextlib import asynccontextmanager
+import tracing
+from selenium.webdriver.common.by import By
+from secrets import username, password  # Loaded from .env
+from automation import strains
+from automation.add_product import NEW_PRODUCT_URL, STEPS
+from automation.catalog_search import ROWS_XPATH as CATALOG_ROWS_XPATH, SEARCH_COLUMNS
+from automation.driver_factory import DEFAULT_PROFILE, PROFILES, WINDOW_SIZE
+from automation.grid import READ_GRID_JS
+from automation.locators import LOCATORS, RETRY_ATTEMPTS, RETRY_DELAY, RETRY_MAX_DELAY
+from automation.login import FORM_GRACE, HOME_URL, LOGIN_TIMEOUT, USERNAME_INPUT_ID
+from automation.urls import url
+from automation.vendors import ROWS_BASE_XPATH as VENDOR_ROWS_BASE_XPATH, VENDOR_COLUMNS
+from automation.waits import (
+    DEFAULT_TIMEOUT, NETWORK_STATE_JS, POLL_INTERVAL, SETTLE_TIME, SPINNER_CSS,
+    SPINNER_VISIBLE_JS, StepTimer,
+)
+
+try:
+    from playwright.async_api import Error as PlaywrightError
+    from playwright.async_api import TimeoutError as PlaywrightTimeout
+    from playwright.async_api import async_playwright
+except ImportError:  # optional; AsyncEngine.start() explains how to install it
+    async_playwright = None
+
+    class PlaywrightError(Exception):
+        pass
+
+    PlaywrightTimeout = PlaywrightError
+
+# Tabs working at once per engine
+ASYNC_PAGES = int(os.getenv("INTAKE_ASYNC_PAGES", "5"))
+# Browser Playwright launches: "chrome" (installed Chrome) or "" (bundled Chromium)
+CHANNEL = os.getenv("INTAKE_PLAYWRIGHT_CHANNEL", "chrome")
+
+CATALOG_URL = url("/products/catalog")
+VENDOR_PAGE_URL = url("/products/vendors")
+VENDOR_ROWS_XPATH = VENDOR_ROWS_BASE_XPATH + "/div"
+
+# Failures worth another attempt: our polls and Playwright's own waits
+TRANSIENT = (TimeoutError, PlaywrightTimeout)
+
+_SELECTOR_ENGINES = {By.XPATH: "xpath", By.CSS_SELECTOR: "css", By.ID: "id"}
+
+# Names already reported as matching a fallback
+_healed = set()
+
+
+def _js(script):
+    """A Selenium execute_script body as a page.evaluate() function of [arguments]."""
+    return f"(args) => (function () {{\n{script}\n}}).apply(null, args)"
+
+
+# ── waits ────────────────────────────────────────────────────────────
+async def _until(condition, timeout, message):
+    """Await `condition()` every POLL_INTERVAL until it is truthy; returns its value."""
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            result = await condition()
+        except PlaywrightError:
+            result = None  # navigating: the page's context was replaced
+        if result:
+            return result
+        if time.monotonic() >= deadline:
+            raise TimeoutError(message)
+        await asyncio.sleep(POLL_INTERVAL)
+
+
+async def wait_for_network_idle(page, timeout=DEFAULT_TIMEOUT, settle=SETTLE_TIME):
+    """waits.wait_for_network_idle for a Playwright page."""
+    state = {"last": None, "since": time.monotonic()}
+
+    async def idle():
+        snapshot = tuple(await page.evaluate(_js(NETWORK_STATE_JS), []))
+        now = time.monotonic()
+        if snapshot != state["last"]:
+            state["last"], state["since"] = snapshot, now
+            return False
+        ready, pending, _ = snapshot
+        return ready == "complete" and pending == 0 and now - state["since"] >= settle
+
+    await _until(idle, timeout, f"{page.url} never went idle")
+
+
+async def wait_for_page_ready(page, timeout=DEFAULT_TIMEOUT):
+    """Network idle and no loading indicator."""
+    await wait_for_network_idle(page, timeout)
+
+    async def no_spinner():
+        return not await page.evaluate(_js(SPINNER_VISIBLE_JS), [SPINNER_CSS])
+
+    await _until(no_spinner, timeout, f"{page.url}: loading indicator never went away")
+
+
+async def wait_for_results(page, rows_xpath, timeout=DEFAULT_TIMEOUT, settle=SETTLE_TIME):
+    """After submitting a search: wait for the request, the spinner and the rows."""
+    await wait_for_page_ready(page, timeout)
+    rows = page.locator(f"xpath={rows_xpath}")
+    state = {"count": None, "since": time.monotonic()}
+
+    async def stable():
+        count = await rows.count()
+        now = time.monotonic()
+        if count != state["count"]:
+            state["count"], state["since"] = count, now
+            return False
+        return now - state["since"] >= settle
+
+    await _until(stable, timeout, f"rows of {rows_xpath} never settled")
+    return state["count"]
+
+
+async def wait_for_text(locator, text, timeout=DEFAULT_TIMEOUT):
+    """Wait until `text` appears in the element's text."""
+    async def has_text():
+        return text in await locator.inner_text()
+
+    await _until(has_text, timeout, f"{text!r} never appeared")
+
+
+# ── locators ─────────────────────────────────────────────────────────
+def _selector(by, value):
+    return f"{_SELECTOR_ENGINES[by]}={value}"
+
+
+async def _match(page, name, clickable):
+    for index, (by, value) in enumerate(LOCATORS[name]):
+        candidates = page.locator(_selector(by, value))
+        for n in range(await candidates.count()):
+            el = candidates.nth(n)
+            if await el.is_visible() and (not clickable or await el.is_enabled()):
+                if index and name not in _healed:
+                    _healed.add(name)
+                    print(f"[Locators] {name!r}: primary locator failed, matched fallback #{index}: {value}")
+                return el
+    return None
+
+
+async def find(page, name, timeout=DEFAULT_TIMEOUT, clickable=False):
+    """locators.find for a Playwright page: the first usable match of `name`'s locators."""
+    return await _until(lambda: _match(page, name, clickable), timeout,
+                        f"No locator for {name!r} matched within {timeout}s")
+
+
+async def wait_gone(page, name, timeout=DEFAULT_TIMEOUT):
+    async def gone():
+        return await _match(page, name, False) is None
+
+    await _until(gone, timeout, f"{name!r} still visible after {timeout}s")
+
+
+async def retry(fn, *args, attempts=RETRY_ATTEMPTS, delay=RETRY_DELAY,
+                on_retry=None, label=None, **kwargs):
+    """locators.retry for coroutines: await fn(*args, **kwargs) with backoff on timeouts."""
+    label = label or getattr(fn, "__name__", "step")
+    for attempt in range(1, attempts + 1):
+        try:
+            return await fn(*args, **kwargs)
+        except TRANSIENT as e:
+            if attempt == attempts:
+                raise
+            wait = min(delay * 2 ** (attempt - 1), RETRY_MAX_DELAY)
+            print(f"[Retry] {label}: {type(e).__name__} (attempt {attempt}/{attempts}); "
+                  f"retrying in {wait:.1f}s")
+            tracing.count_retry()
+            await asyncio.sleep(wait)
+            if on_retry:
+                try:
+                    await on_retry(e)
+                except PlaywrightError:
+                    pass
+
+
+async def read_grid(page, rows_xpath, columns):
+    """grid.read_grid for a Playwright page."""
+    rows = await page.evaluate(_js(READ_GRID_JS), [rows_xpath, columns]) or []
+    return [row for row in rows if None not in row.values()]
+
+
+# ── engine ───────────────────────────────────────────────────────────
+class AsyncEngine:
+    """
+    One browser and one logged-in context; page() lends out at most
+    `pages` tabs at a time and keeps finished ones open for reuse.
+    """
+
+    def __init__(self, pages=ASYNC_PAGES, profile=None, channel=CHANNEL):
+        self.max_pages = pages
+        self.settings = PROFILES[profile or DEFAULT_PROFILE]
+        self.channel = channel or None
+        self._playwright = None
+        self.browser = None
+        self.context = None
+        self._slots = None
+        self._login_lock = None
+        self._idle = []
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def start(self):
+        """Launch the browser and log in once for every tab."""
+        if async_playwright is None:
+            raise ImportError("The async engine needs Playwright: pip install playwright")
+        self._slots = asyncio.Semaphore(self.max_pages)
+        self._login_lock = asyncio.Lock()
+        self._playwright = await async_playwright().start()
+        self.browser = await self._playwright.chromium.launch(
+            headless=self.settings["headless"], channel=self.channel
+        )
+        width, height = map(int, WINDOW_SIZE.split(","))
+        self.context = await self.browser.new_context(viewport={"width": width, "height": height})
+        blocked = {kind for kind, key in (("image", "block_images"), ("font", "block_fonts"))
+                   if self.settings[key]}
+        if blocked:
+            async def block(route):
+                if route.request.resource_type in blocked:
+                    await route.abort()
+                else:
+                    await route.continue_()
+            await self.context.route("**/*", block)
+        async with self.page() as page:
+            await self.login(page)
+
+    async def close(self):
+        if self.browser:
+            await self.browser.close()
+        if self._playwright:
+            await self._playwright.stop()
+        self.browser = self._playwright = None
+        self._idle.clear()
+
+    @asynccontextmanager
+    async def page(self):
+        """Borrow a tab; waits while `pages` tabs are already in use."""
+        async with self._slots:
+            page = self._idle.pop() if self._idle else await self.context.new_page()
+            try:
+                yield page
+            except BaseException:
+                # Possibly left mid-navigation or behind a menu; start clean next time
+                try:
+                    await page.close()
+                except PlaywrightError:
+                    pass
+                raise
+            self._idle.append(page)
+
+    async def login(self, page, timeout=LOGIN_TIMEOUT):
+        """Log the shared context in from `page`, unless it already is."""
+        async with self._login_lock:
+            await page.goto(HOME_URL)
+            await wait_for_page_ready(page, timeout)
+            form = page.locator(f"id={USERNAME_INPUT_ID}")
+            try:
+                await form.wait_for(state="visible", timeout=FORM_GRACE * 1000)
+            except PlaywrightTimeout:
+                return  # the session is still valid
+            with tracing.span("async.login"):
+                await form.fill(username)
+                password_input = page.locator("xpath=//input[@placeholder='Password']")
+                await password_input.fill(password)
+                await password_input.press("Enter")
+                await form.wait_for(state="hidden", timeout=timeout * 1000)
+                await wait_for_page_ready(page, timeout)
+            print("[Async] Logged in")
+
+    async def goto(self, page, address, timeout=DEFAULT_TIMEOUT):
+        """Open `address`, logging back in first if the session has expired."""
+        await page.goto(address, timeout=timeout * 1000)
+        if await page.locator(f"id={USERNAME_INPUT_ID}").count():
+            await self.login(page)
+            await page.goto(address, timeout=timeout * 1000)
+
+    # ── list searches ────────────────────────────────────────────────
+    async def _search_list(self, page, address, title, term, rows_xpath, columns, timer, timeout):
+        with timer.step(f"load {title.lower()} page") as step:
+            await self.goto(page, address, timeout)
+            await wait_for_text(await find(page, "page.header", timeout), title, timeout)
+            step.set(url=page.url)
+        with timer.step("search"):
+            search_input = await find(page, "list.search_input", timeout)
+            await search_input.fill(term)
+            await search_input.press("Enter")
+            await wait_for_results(page, rows_xpath, timeout)
+        with timer.step("read rows"):
+            return await read_grid(page, rows_xpath, columns)
+
+    async def search_catalog(self, product_name, timeout=15):
+        """Catalog rows matching `product_name` (always searched live, not the mirror)."""
+        timer = StepTimer(f"Catalog Search {product_name!r}", trace="async.catalog_search")
+        async with self.page() as page:
+            results = await retry(self._search_list, page, CATALOG_URL, "Catalog", product_name,
+                                  CATALOG_ROWS_XPATH, SEARCH_COLUMNS, timer, timeout)
+        timer.report()
+        return results
+
+    async def search_vendor(self, vendor_name, timeout=15):
+        """Vendor rows matching `vendor_name` as {'name', 'license'} dicts."""
+        timer = StepTimer(f"Vendor Search {vendor_name!r}", trace="async.vendor_search")
+        async with self.page() as page:
+            results = await retry(self._search_list, page, VENDOR_PAGE_URL, "Vendors", vendor_name,
+                                  VENDOR_ROWS_XPATH, VENDOR_COLUMNS, timer, timeout)
+        timer.report()
+        return results
+
+    # ── strains ──────────────────────────────────────────────────────
+    async def _header_text(self, page):
+        header = await _match(page, "page.header", False)
+        return (await header.inner_text()).strip() if header else ""
+
+    async def _wait_for_header(self, page, text, timeout):
+        async def shown():
+            return await self._header_text(page) == text
+
+        await _until(shown, timeout, f"{text!r} never appeared")
+
+    async def _search_strains(self, page, strain_name, timeout):
+        on_page = await self._header_text(page) == "Strains" \
+            and await _match(page, "list.search_input", False) is not None
+        if not on_page:
+            await self.goto(page, strains.STRAINS_URL, timeout)
+            await self._wait_for_header(page, "Strains", timeout)
+            await page.evaluate("document.querySelectorAll('div.sc-cUPSFq').forEach(b => b.remove())")
+        await (await find(page, "list.search_input", timeout)).fill(strain_name)
+        await (await find(page, "list.search_button", timeout, clickable=True)).click()
+        await wait_for_results(page, strains.ROWS_XPATH, timeout)
+
+        no_data = await _match(page, "list.no_data", False)
+        if no_data and (await no_data.inner_text()).strip() == "No data available":
+            return []
+        return await read_grid(page, strains.ROWS_XPATH, strains.STRAIN_COLUMNS)
+
+    async def _fill_strain_form(self, page, strain, editing, timeout):
+        changed = 0
+        for name in strains.FORM_FIELDS:
+            element = await find(page, name, timeout)
+            if editing and await element.input_value() == strain:
+                continue
+            await element.fill(strain)
+            changed += 1
+        return changed
+
+    async def _save_strain(self, page, timeout):
+        await (await find(page, "strain.save", timeout, clickable=True)).click()
+        await wait_gone(page, "strain.save", timeout)
+
+    async def _create_or_edit_strain(self, page, strain_name, timeout):
+        rows = await self._search_strains(page, strain_name, timeout)
+        row = next((i for i, r in enumerate(rows, start=1)
+                    if r["name"].lower() == strain_name.lower()), None)
+        if row is None:
+            await (await find(page, "list.add_button", timeout, clickable=True)).click()
+            await self._wait_for_header(page, "Add strain", timeout)
+            await self._fill_strain_form(page, strain_name, False, timeout)
+            await self._save_strain(page, timeout)
+            print(f"[Strain] Created: {strain_name}")
+            return "added"
+        if rows[row - 1] == {"name": strain_name, "abbreviation": strain_name}:
+            return "unchanged"
+        await page.locator(f"xpath=({strains.ROWS_XPATH})[{row}]").click()
+        await find(page, "strain.name", timeout)
+        if not await self._fill_strain_form(page, strain_name, True, timeout):
+            print(f"[Strain] Unchanged: {strain_name}")
+            return "unchanged"
+        await self._save_strain(page, timeout)
+        print(f"[Strain] Edited: {strain_name}")
+        return "edited"
+
+    async def create_or_edit_strain(self, strain_name, timeout=10):
+        """strains.create_or_edit_strain on a tab: 'added', 'edited' or 'unchanged'."""
+        async with self.page() as page:
+            with tracing.span("async.strain_upsert.strain", step=strain_name) as span:
+                result = await retry(self._create_or_edit_strain, page, strain_name, timeout,
+                                     label=f"strain {strain_name}")
+                span.set(result=result, url=page.url)
+        return result
+
+    # ── new product ──────────────────────────────────────────────────
+    async def _select_option(self, page, dropdown, option, timeout):
+        await (await find(page, dropdown, timeout, clickable=True)).click()
+        await (await find(page, option, timeout, clickable=True)).click()
+        await wait_gone(page, option, timeout)
+
+    async def _select_search_option(self, page, dropdown, option, text, timeout):
+        box = await find(page, dropdown, timeout, clickable=True)
+        await box.click()
+        inputs = box.locator("input")
+        if await inputs.count():
+            await inputs.first.fill(text)
+        else:
+            await page.keyboard.type(text)
+        await wait_for_network_idle(page, timeout)
+        await (await find(page, option, timeout, clickable=True)).click()
+        await wait_gone(page, option, timeout)
+
+    async def add_cannabis_flower_product(self, product_name, retail_price, cost_price,
+                                          strain_name, vendor_name, timeout=15, on_step=None):
+        """add_product.add_cannabis_flower_product on a tab, step for step."""
+        timer = StepTimer(f"Add Product {product_name!r}", trace="async.add_product")
+        async with self.page() as page:
+            async def load_page():
+                await self.goto(page, NEW_PRODUCT_URL, timeout)
+                await wait_for_text(await find(page, "new_product.header", timeout), "New Product", timeout)
+                await wait_for_page_ready(page, timeout)
+
+            async def name_and_sku():
+                await (await find(page, "new_product.name", timeout)).fill(product_name)
+                await (await find(page, "new_product.generate_sku", timeout, clickable=True)).click()
+                await wait_for_network_idle(page, timeout)
+
+            async def categories():
+                await self._select_option(page, "new_product.category", "new_product.category.flower", timeout)
+                await self._select_option(page, "new_product.external_category",
+                                          "new_product.external_category.buds", timeout)
+                await self._select_option(page, "new_product.type", "new_product.type.weight", timeout)
+                await self._select_option(page, "new_product.unit", "new_product.unit.gram", timeout)
+
+            async def prices():
+                await (await find(page, "new_product.retail", timeout)).fill(str(retail_price))
+                await (await find(page, "new_product.cost", timeout)).fill(str(cost_price))
+
+            async def strain():
+                await self._select_search_option(page, "new_product.strain", "new_product.strain.first",
+                                                 strain_name, timeout)
+
+            async def vendor():
+                await self._select_search_option(page, "new_product.vendor", "new_product.vendor.first",
+                                                 vendor_name, timeout)
+
+            async def pricing_tier():
+                await self._select_option(page, "new_product.pricing_tier",
+                                          "new_product.pricing_tier.option", timeout)
+
+            async def save():
+                await (await find(page, "new_product.save", timeout, clickable=True)).click()
+                await wait_for_page_ready(page, timeout)
+
+            async def close_menus(error):
+                await page.keyboard.press("Escape")
+
+            actions = (load_page, name_and_sku, categories, prices, strain, vendor, pricing_tier, save)
+            for name, action in zip(STEPS, actions):
+                with timer.step(name) as step:
+                    # Saving twice could create a duplicate, so never retry the click
+                    await retry(action, attempts=1 if action is save else RETRY_ATTEMPTS,
+                                on_retry=close_menus, label=f"{product_name}: {name}")
+                    step.set(url=page.url)
+                if on_step:
+                    on_step(name)
+        print(f"[Add Product] Created: {product_name}")
+        timer.report()
+
+
+# ── command line ─────────────────────────────────────────────────────
+async def _run(command, items, pages):
+    async with AsyncEngine(pages=pages) as engine:
+        operation = {
+            "catalog": engine.search_catalog,
+            "vendors": engine.search_vendor,
+            "strains": engine.create_or_edit_strain,
+        }[command]
+        results = await asyncio.gather(*(operation(item) for item in items), return_exceptions=True)
+    return {item: f"{type(r).__name__}: {r}" if isinstance(r, Exception) else r
+            for item, r in zip(items, results)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run Dutchie operations concurrently in one browser.")
+    parser.add_argument("--pages", type=int, default=ASYNC_PAGES, help="Tabs working at once")
+    parser.add_argument("command", choices=("catalog", "vendors", "strains"))
+    parser.add_argument("items", nargs="+", help="Search terms, vendor names or strain names")
+    args = parser.parse_args()
+    start = time.perf_counter()
+    results = asyncio.run(_run(args.command, args.items, args.pages))
+    print(json.dumps(results, indent=2))
+    print(f"[Async] {len(args.items)} {args.command} operations on {args.pages} tabs "
+          f"in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+# automation/bulk_add_products.py
+"""
+Create many Cannabis Flower products in one run on warm, logged-in browsers.
+
+Progress is recorded per product in the product_job table, so re-running the
+same batch after a crash or failures only retries what has not succeeded.
+
+Usage:
+    python -m automation.bulk_add_products --csv products.csv [--batch NAME] [--workers N]
+    python -m automation.bulk_add_products --manifest [MANIFEST] [--batch NAME] [--workers N]
+"""
+import argparse
+import os
+import queue
+import threading
+from automation.add_product import STEPS, add_cannabis_flower_product
+from automation.catalog import search_catalog_product
+from automation.session import SessionPool, get_pool, is_alive
+from data import product_jobs
+from data.database import get_manager
+
+
+# Checkpoints after which the product may already exist in Dutchie
+SAVE_REACHED = set(STEPS[STEPS.index("pricing tier"):])
+
+
+def _price(value):
+    return "" if value is None else value
+
+
+def _already_created(driver, product_name):
+    """True if Dutchie's catalog already has `product_name`."""
+    match = search_catalog_product(driver, product_name, force=True)
+    return bool(match) and match["Product Name"].lower() == product_name.lower()
+
+
+def create_product(driver, job, on_step=None):
+    """
+    Create the product for one job. Returns (status, error).
+    `on_step(name)` is called as each form step completes.
+    """
+    # The last attempt got as far as Save before it failed or was
+    # interrupted; Dutchie may have saved the product anyway.
+    if job.get("last_step") in SAVE_REACHED and _already_created(driver, job["name"]):
+        return "done", None
+    try:
+        add_cannabis_flower_product(
+            driver, job["name"], _price(job["retail"]), _price(job["cost"]),
+            job["strain"], job["vendor"], on_step=on_step,
+        )
+        return "done", None
+    except Exception as e:
+        print(f"[Bulk Add] Failed: {job['name']}: {e}")
+        return "failed", str(e)
+
+
+def _worker(pool, todo, events):
+    """
+    Take jobs off `todo` until it is empty, reporting each status change and
+    completed form step to `events`.
+    """
+    try:
+        while not todo.empty():
+            with pool.session() as driver:
+                if not driver:
+                    print("[Bulk Add] Login failed.")
+                    return
+                while True:
+                    try:
+                        job = todo.get_nowait()
+                    except queue.Empty:
+                        return
+                    events.put(("running", job, None))
+                    status, error = create_product(
+                        driver, job, on_step=lambda step, job=job: events.put(("step", job, step))
+                    )
+                    events.put((status, job, error))
+                    if status == "failed" and not is_alive(driver):
+                        break  # get a fresh browser for the next job
+    finally:
+        events.put((None, None, None))
+
+
+def run_batch(db, batch, workers=1):
+    """
+    Create every unfinished product in `batch`, across `workers` browsers.
+    Job updates are written through the `db` ConnectionManager's writer.
+    Returns the batch summary {status: count}.
+    """
+    conn = db.reader()
+    jobs = product_jobs.unfinished_jobs(conn, batch)
+    if not jobs:
+        print(f"[Bulk Add] Nothing to do for batch '{batch}'.")
+        return product_jobs.summary(conn, batch)
+
+    todo = queue.Queue()
+    for job in jobs:
+        todo.put(job)
+    events = queue.Queue()
+
+    workers = max(1, min(workers, len(jobs)))
+    pool = SessionPool(max_size=workers) if workers > 1 else get_pool()
+    threads = [
+        threading.Thread(target=_worker, args=(pool, todo, events), daemon=True)
+        for _ in range(workers)
+    ]
+    for t in threads:
+        t.start()
+
+    done = 0
+    running = len(threads)
+    while running:
+        status, job, detail = events.get()  # detail: error, or the completed step
+        if status is None:
+            running -= 1
+            continue
+        if status == "step":
+            db.write(product_jobs.mark_step, batch, job["name"], detail).result()
+            continue
+        db.write(product_jobs.mark, batch, job["name"], status, detail).result()
+        if status != "running":
+            done += 1
+            print(f"[Bulk Add] {done}/{len(jobs)} {status}: {job['name']}")
+
+    if pool is not get_pool():
+        pool.close()
+    return product_jobs.summary(conn, batch)
+
+
+def create_products(db=None, csv_path=None, manifest=None, batch=None, workers=1):
+    """
+    Queue products from a CSV, or from unresolved active_manifest rows
+    (`manifest` = "" for all of them), and run the batch, writing through
+    the `db` ConnectionManager (the shared one by default).
+    Returns (batch, status summary).
+    """
+    db = db or get_manager()
+    if csv_path:
+        products = product_jobs.products_from_csv(csv_path)
+        batch = batch or os.path.splitext(os.path.basename(csv_path))[0]
+    else:
+        products = product_jobs.products_from_manifest(db.reader(), manifest or None)
+        batch = batch or f"manifest-{manifest or 'all'}"
+
+    added = db.write(product_jobs.enqueue, batch, products).result()
+    print(f"[Bulk Add] Batch '{batch}': {added} new of {len(products)} products.")
+    return batch, run_batch(db, batch, workers)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk-create Cannabis Flower products in Dutchie.")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--csv", help="CSV with columns name,retail,cost,strain,vendor")
+    source.add_argument("--manifest", nargs="?", const="",
+                        help="Unresolved active_manifest rows (optionally one manifest)")
+    parser.add_argument("--batch", help="Batch name; re-use it to resume a batch")
+    parser.add_argument("--workers", type=int, default=1, help="Parallel browsers")
+    args = parser.parse_args()
+
+    _, summary = create_products(None, args.csv, args.manifest, args.batch, args.workers)
+    print(f"[Bulk Add] Result: {summary}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,42 +1,85 @@
 # automation/catalog.py
 
-import time
-from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
+from automation.catalog_search import CATALOG_COLUMNS, ROWS_XPATH
+from automation.grid import read_grid
+from automation.locators import find
+from automation.urls import url
+from automation.waits import wait_for_results
+from data import catalog_cache
+from data.database import get_manager
 
-def search_catalog_product(driver, product_name, timeout=15):
+CATALOG_LABELS = {
+    'product_name': 'Product Name',
+    'category': 'Category Name',
+    'vendor': 'Vendor Name',
+    'sku': 'SKU',
+    'rec_price': 'Rec Price',
+    'measurement_type': 'Measurement Type',
+}
+
+
+def _from_cache(row):
+    return {
+        'Product Name': row['product_name'],
+        'Category Name': row['category'] or '',
+        'Vendor Name': row['vendor'] or '',
+        'SKU': row['sku'] or '',
+        'Rec Price': row['rec_price'] or '',
+        'Measurement Type': row['measurement_type'] or '',
+    }
+
+
+def search_catalog_product(driver, product_name, timeout=15, conn=None, force=False):
+    """
+    Look up `product_name` in the local catalog mirror, falling back to a
+    catalog search in `driver` on a miss (or always, when `force` is set).
+    Browser results are written back to the mirror. Without `conn` this
+    reads on the thread's shared connection and writes through the writer.
+    """
+    if not force:
+        cached = catalog_cache.find_product(conn or get_manager().reader(), product_name)
+        if cached:
+            return _from_cache(cached)
+
+    product_data = _search_catalog_page(driver, product_name, timeout)
+    if product_data:
+        _store(conn, [{
+            'product_name': product_data['Product Name'],
+            'category': product_data['Category Name'],
+            'vendor': product_data['Vendor Name'],
+            'sku': product_data['SKU'],
+            'rec_price': product_data['Rec Price'],
+            'measurement_type': product_data['Measurement Type'],
+        }])
+    return product_data
+
+
+def _store(conn, products):
+    if conn is None:
+        get_manager().write(catalog_cache.upsert_products, products).result()
+    else:
+        catalog_cache.upsert_products(conn, products)
+
+
+def _search_catalog_page(driver, product_name, timeout):
     try:
         # Navigate directly to the catalog page
-        driver.get("https://peak.backoffice.dutchie.com/products/catalog")
-        time.sleep(2)
+        driver.get(url("/products/catalog"))
 
         # Search input
-        search_input_xpath = "/html/body/div[1]/div/div[2]/div[2]/div[1]/div[1]/div/div[1]/div/input"
-        search_input = WebDriverWait(driver, timeout).until(
-            EC.presence_of_element_located((By.XPATH, search_input_xpath))
-        )
+        search_input = find(driver, "list.search_input", timeout)
         search_input.clear()
         search_input.send_keys(product_name)
         search_input.send_keys(Keys.ENTER)
-        time.sleep(3)
-
-        # Wait for first row
-        row_xpath = "/html/body/div[1]/div/div[2]/div[2]/div[1]/div[2]/div/div[2]/div[2]/div/div/div[1]/div[1]"
-        WebDriverWait(driver, timeout).until(
-            EC.presence_of_element_located((By.XPATH, row_xpath))
-        )
-        row = driver.find_element(By.XPATH, row_xpath)
-
-        product_data = {
-            'Product Name': row.find_element(By.XPATH, './div[2]/div').text.strip(),
-            'Category Name': row.find_element(By.XPATH, './div[3]/div').text.strip(),
-            'Vendor Name': row.find_element(By.XPATH, './div[4]/div').text.strip(),
-            'SKU': row.find_element(By.XPATH, './div[5]/div').text.strip(),
-            'Rec Price': row.find_element(By.XPATH, './div[8]/div').text.strip(),
-            'Measurement Type': row.find_element(By.XPATH, './div[9]/div').text.strip()
-        }
+
+        # Wait for the search results, then the first row
+        wait_for_results(driver, ROWS_XPATH, timeout, allow_empty=False)
+        columns = {field: CATALOG_COLUMNS[field] for field in CATALOG_LABELS}
+        rows = read_grid(driver, f"({ROWS_XPATH})[1]", columns)
+        if not rows:
+            raise ValueError("first result row is incomplete")
+        product_data = {label: rows[0][field] for field, label in CATALOG_LABELS.items()}
 
         return product_data
 
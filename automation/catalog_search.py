@@ -3,80 +3,115 @@
 Search Dutchie's product catalog for a given term and return all matching rows.
 """
 import sys
-import time
-from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from automation.login import login_to_dutchie
+from automation import http_backend
+from automation.session import dutchie_session
+from automation.grid import read_grid
+from automation.locators import find, retry
+from automation.urls import url
+from automation.waits import StepTimer, wait_for_results
+from data import catalog_cache
+from data.database import get_manager
 
+ROWS_XPATH = "/html/body/div[1]/div/div[2]/div[2]/div[1]/div[2]/div/div[2]/div[2]/div/div/div[1]/div"
 
-def search_catalog(product_name, timeout=15):
+# Zero-based cell index of each field in a Catalog grid row. catalog.py and
+# catalog_sync.py read the same grid into the same catalog_cache columns.
+# rec_price is the cell search_catalog always read (div[6]); catalog.py used
+# to read div[8] instead. Neither has been checked against the live grid.
+CATALOG_COLUMNS = {
+    "product_name": 1,
+    "category": 2,
+    "vendor": 3,
+    "sku": 4,
+    "rec_price": 5,
+    "measurement_type": 8,
+    "strain_name": 9,
+    "cost": 10,
+}
+# The fields a search returns
+SEARCH_COLUMNS = {field: CATALOG_COLUMNS[field] for field in
+                  ("product_name", "category", "vendor", "rec_price", "strain_name", "cost")}
+
+
+def search_catalog(product_name, timeout=15, conn=None, force=False):
     """
-    Log into Dutchie, navigate to the Catalog page, search for `product_name`,
-    and return a list of dicts for every matching row.
+    Return a list of dicts for every catalog product matching `product_name`.
+    Answers from the local catalog mirror once a full sync has filled it and
+    it has matches; otherwise (or when `force` is set) borrows a logged-in
+    driver and searches the Catalog page, or asks the HTTP backend if
+    INTAKE_READ_BACKEND=http, writing the results back to the mirror.
+    Without `conn` this reads on the thread's shared connection and writes
+    through the writer.
     """
-    driver = login_to_dutchie()
-    if not driver:
-        print("[Catalog Search] Login failed.")
-        return []
+    reader = conn or get_manager().reader()
+    if not force and catalog_cache.is_complete(reader):
+        cached = catalog_cache.search_products(reader, product_name)
+        if cached:
+            return [{
+                "product_name": row["product_name"],
+                "category": row["category"] or "",
+                "vendor": row["vendor"] or "",
+                "rec_price": row["rec_price"] or "",
+                "strain_name": row["strain_name"] or "",
+                "cost": row["cost"] or "",
+            } for row in cached]
 
-    # 1) Go to catalog
-    driver.get("https://peak.backoffice.dutchie.com/products/catalog")
-    # Wait for header 'Catalog'
-    header_xpath = "/html/body/div[1]/div/div[2]/div[2]/div[1]/header/div[1]/div/h1"
-    WebDriverWait(driver, timeout).until(
-        EC.text_to_be_present_in_element((By.XPATH, header_xpath), "Catalog")
-    )
+    if http_backend.enabled():
+        results = http_backend.search_catalog(product_name, timeout)
+    else:
+        with dutchie_session() as driver:
+            if not driver:
+                print("[Catalog Search] Login failed.")
+                return []
+            results = retry(_search_catalog, driver, product_name, timeout)
+    products = [
+        {"product_name": r["product_name"], "category": r["category"],
+         "vendor": r["vendor"], "rec_price": r["rec_price"],
+         "strain_name": r["strain_name"], "cost": r["cost"]}
+        for r in results
+    ]
+    if conn is None:
+        get_manager().write(catalog_cache.upsert_products, products).result()
+    else:
+        catalog_cache.upsert_products(conn, products)
+    return results
 
-    # 2) Enter search term
-    search_input_xpath = "/html/body/div[1]/div/div[2]/div[2]/div[1]/div[1]/div/div[1]/div/input"
-    search_input = WebDriverWait(driver, timeout).until(
-        EC.presence_of_element_located((By.XPATH, search_input_xpath))
-    )
-    search_input.clear()
-    search_input.send_keys(product_name)
-    search_input.send_keys(Keys.ENTER)
-    time.sleep(2)
 
-    # 3) Locate table rows
-    rows_base = "/html/body/div[1]/div/div[2]/div[2]/div[1]/div[2]/div/div[2]/div[2]/div/div/div[1]"
-    rows = driver.find_elements(By.XPATH, rows_base + "/div")
+def _search_catalog(driver, product_name, timeout):
+    timer = StepTimer(f"Catalog Search {product_name!r}", trace="catalog_search", driver=driver)
 
-    results = []
-    for i in range(1, len(rows) + 1):
-        row_xpath = f"{rows_base}/div[{i}]"
-        try:
-            name = driver.find_element(By.XPATH, row_xpath + "/div[2]/div").text.strip()
-            category = driver.find_element(By.XPATH, row_xpath + "/div[3]/div").text.strip()
-            vendor = driver.find_element(By.XPATH, row_xpath + "/div[4]/div").text.strip()
-            rec_price = driver.find_element(By.XPATH, row_xpath + "/div[6]/div").text.strip()
-            strain_name = driver.find_element(By.XPATH, row_xpath + "/div[10]/div").text.strip()
-            cost = driver.find_element(By.XPATH, row_xpath + "/div[11]/div").text.strip()
-        except Exception as e:
-            print(f"[Catalog Search] Skipping row {i} due to error: {e}")
-            continue
+    # 1) Go to catalog
+    with timer.step("load catalog page"):
+        driver.get(url("/products/catalog"))
+        # Wait for header 'Catalog'
+        header = find(driver, "page.header", timeout)
+        WebDriverWait(driver, timeout).until(lambda d: "Catalog" in header.text)
+
+    # 2) Enter search term
+    with timer.step("search"):
+        search_input = find(driver, "list.search_input", timeout)
+        search_input.clear()
+        search_input.send_keys(product_name)
+        search_input.send_keys(Keys.ENTER)
+        wait_for_results(driver, ROWS_XPATH, timeout)
 
-        results.append({
-            "product_name": name,
-            "category": category,
-            "vendor": vendor,
-            "rec_price": rec_price,
-            "strain_name": strain_name,
-            "cost": cost
-        })
+    # 3) Read every row in one round trip
+    with timer.step("read rows"):
+        results = read_grid(driver, ROWS_XPATH, SEARCH_COLUMNS)
 
-    driver.quit()
+    timer.report()
     return results
 
 
 if __name__ == "__main__":
     if len(sys.argv) < 2:
-        print("Usage: python catalog_search.py <search_term>")
+        print("Usage: python catalog_search.py <search_term> [--force]")
         sys.exit(1)
 
     term = sys.argv[1]
-    matches = search_catalog(term)
+    matches = search_catalog(term, force="--force" in sys.argv[2:])
     if not matches:
         print(f"No matches found for '{term}'.")
     else:
@@ -0,0 +1,140 @@
+# automation/catalog_sync.py
+"""
+Mirror Dutchie's product catalog into the local catalog_cache table.
+
+The first run (or --full) pages through the whole catalog and drops products
+that no longer exist. Later runs are incremental: they sort the grid by last
+modified, newest first, and stop once several pages in a row bring nothing
+new or changed. If the grid can't be sorted that way the run is a full one,
+since an early stop would miss edits further down.
+
+Usage:
+    python -m automation.catalog_sync [--full]
+"""
+import argparse
+from datetime import datetime
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException
+from automation.catalog_search import CATALOG_COLUMNS, ROWS_XPATH
+from automation.grid import read_grid
+from automation.session import dutchie_session
+from automation.urls import url
+from automation.waits import StepTimer, wait_for_results
+from data import catalog_cache
+from data.database import get_manager
+
+CATALOG_URL = url("/products/catalog")
+HEADER_XPATH = "/html/body/div[1]/div/div[2]/div[2]/div[1]/header/div[1]/div/h1"
+NEXT_PAGE_XPATH = "//button[@aria-label='Go to next page']"
+MODIFIED_HEADER_XPATH = ("//*[@role='columnheader'][contains(normalize-space(), 'Last Modified')"
+                         " or contains(normalize-space(), 'Updated')]")
+
+# Incremental sync stops after this many pages without changes
+STOP_AFTER_UNCHANGED = 3
+LAST_FULL_SYNC = catalog_cache.LAST_FULL_SYNC
+LAST_SYNC = catalog_cache.LAST_SYNC
+
+
+def _read_page(driver):
+    return [p for p in read_grid(driver, ROWS_XPATH, CATALOG_COLUMNS) if p["product_name"]]
+
+
+def _next_page(driver, timeout):
+    """Go to the next catalog page. Returns False on the last page."""
+    buttons = driver.find_elements(By.XPATH, NEXT_PAGE_XPATH)
+    if not buttons or not buttons[0].is_enabled() \
+            or buttons[0].get_attribute("aria-disabled") == "true":
+        return False
+    buttons[0].click()
+    wait_for_results(driver, ROWS_XPATH, timeout)
+    return True
+
+
+def _sort_by_modified(driver, timeout):
+    """Sort the grid by last modified, newest first. Returns False if it can't be."""
+    for _ in range(3):  # unsorted -> ascending -> descending
+        headers = driver.find_elements(By.XPATH, MODIFIED_HEADER_XPATH)
+        if not headers:
+            return False
+        if headers[0].get_attribute("aria-sort") == "descending":
+            return True
+        headers[0].click()
+        wait_for_results(driver, ROWS_XPATH, timeout)
+    return False
+
+
+def sync_catalog(driver, db=None, full=None, timeout=15):
+    """
+    Page through the catalog and upsert every row into catalog_cache,
+    writing through the `db` ConnectionManager's writer.
+    `full` defaults to True until a full sync has completed once.
+    Returns {'pages', 'seen', 'changed', 'removed'}.
+    """
+    db = db or get_manager()
+    if full is None:
+        full = catalog_cache.get_state(db.reader(), LAST_FULL_SYNC) is None
+    started = datetime.now().isoformat(timespec="seconds")
+    timer = StepTimer("Catalog Sync", trace="catalog_sync", driver=driver)
+    stats = {"pages": 0, "seen": 0, "changed": 0, "removed": 0}
+
+    with timer.step("load catalog page"):
+        driver.get(CATALOG_URL)
+        WebDriverWait(driver, timeout).until(
+            EC.text_to_be_present_in_element((By.XPATH, HEADER_XPATH), "Catalog")
+        )
+        wait_for_results(driver, ROWS_XPATH, timeout)
+
+    if not full:
+        with timer.step("sort by last modified"):
+            if not _sort_by_modified(driver, timeout):
+                print("[Catalog Sync] Grid can't be sorted by last modified; doing a full sync.")
+                full = True
+
+    unchanged_pages = 0
+    while True:
+        with timer.step("read page"):
+            products = _read_page(driver)
+        with timer.step("store page"):
+            changed = db.write(catalog_cache.upsert_products, products, started).result()
+        stats["pages"] += 1
+        stats["seen"] += len(products)
+        stats["changed"] += changed
+        print(f"[Catalog Sync] Page {stats['pages']}: {len(products)} rows, {changed} new/changed")
+
+        unchanged_pages = 0 if changed else unchanged_pages + 1
+        if not full and unchanged_pages >= STOP_AFTER_UNCHANGED:
+            break
+        try:
+            with timer.step("next page"):
+                if not _next_page(driver, timeout):
+                    break
+        except TimeoutException:
+            print("[Catalog Sync] Next page never loaded; stopping.")
+            full = False  # incomplete: don't prune or record a full sync
+            break
+
+    if full:
+        stats["removed"] = db.write(catalog_cache.delete_not_synced_since, started).result()
+        db.write(catalog_cache.set_state, LAST_FULL_SYNC, started)
+    db.write(catalog_cache.set_state, LAST_SYNC, started).result()
+    timer.report()
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mirror the Dutchie catalog locally.")
+    parser.add_argument("--full", action="store_true", help="Walk every page and prune removed products")
+    args = parser.parse_args()
+
+    with dutchie_session() as driver:
+        if not driver:
+            print("[Catalog Sync] Login failed.")
+            return
+        stats = sync_catalog(driver, full=True if args.full else None)
+    print(f"[Catalog Sync] Done: {stats}")
+
+
+if __name__ == "__main__":
+    main()
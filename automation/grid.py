@@ -0,0 +1,53 @@
+# automation/grid.py
+"""
+Read Dutchie's div-based data grids in a single round trip.
+
+Each page declares which cell holds which field, e.g.
+    {"name": 1, "qty": 3}   # zero-based index among the row's <div> cells
+and `read_grid` returns one dict per row from a single execute_script call,
+instead of a find_element (and a .text) per cell.
+"""
+
+# arguments: rows XPath, {field: cell index}. Cells are the row's direct
+# <div> children, matching the old "./div" lookups; innerText is what
+# WebElement.text returns for a visible element.
+READ_GRID_JS = """
+const [rowsXpath, columns] = arguments;
+const snapshot = document.evaluate(
+    rowsXpath, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+const rows = [];
+for (let i = 0; i < snapshot.snapshotLength; i++) {
+    const cells = Array.from(snapshot.snapshotItem(i).children)
+        .filter(el => el.tagName === 'DIV');
+    const row = {};
+    for (const [field, index] of Object.entries(columns)) {
+        row[field] = index < cells.length ? cells[index].innerText.trim() : null;
+    }
+    rows.push(row);
+}
+return rows;
+"""
+
+READ_TEXTS_JS = """
+const snapshot = document.evaluate(
+    arguments[0], document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+const texts = [];
+for (let i = 0; i < snapshot.snapshotLength; i++) {
+    texts.push(snapshot.snapshotItem(i).innerText.trim());
+}
+return texts;
+"""
+
+
+def read_grid(driver, rows_xpath, columns):
+    """
+    Text of every row matched by `rows_xpath`, as dicts keyed like `columns`.
+    Rows too short to hold every column are skipped.
+    """
+    rows = driver.execute_script(READ_GRID_JS, rows_xpath, columns) or []
+    return [row for row in rows if None not in row.values()]
+
+
+def read_texts(driver, xpath):
+    """Trimmed text of every element matched by `xpath`, in document order."""
+    return driver.execute_script(READ_TEXTS_JS, xpath) or []
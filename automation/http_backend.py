@@ -0,0 +1,223 @@
+# automation/http_backend.py
+"""
+Read Dutchie data over HTTP instead of rendering pages in Chrome.
+Experimental: see ENDPOINTS below.
+
+A browser still logs in (login_to_dutchie through the session pool); its
+cookies, user agent and any bearer token in localStorage are copied into a
+pooled requests.Session that calls the backoffice JSON endpoints directly.
+Writes (creating products, vendors, strains) stay on Selenium.
+
+Set INTAKE_READ_BACKEND=http to route catalog search, vendor search and the
+Receive Inventory scrape through here. The functions below keep the
+signatures of their Selenium counterparts.
+
+ENDPOINTS lists the paths and JSON field names used. They are only known
+to match the local stand-in in benchmarks/fake_backoffice, not the real
+backoffice; check them against the browser's network tab before relying
+on this backend.
+"""
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from automation.login import login_to_dutchie
+from automation.session import dutchie_session
+from automation.urls import BASE_URL
+
+READ_BACKEND = os.getenv("INTAKE_READ_BACKEND", "selenium")
+# Concurrent requests (and pooled connections) per backend
+HTTP_WORKERS = int(os.getenv("INTAKE_HTTP_WORKERS", "4"))
+PAGE_SIZE = 100
+
+ENDPOINTS = {
+    "catalog": "/api/v1/products",
+    "vendors": "/api/v1/vendors",
+    "manifests": "/api/v1/receive/transactions",
+    "manifest_items": "/api/v1/receive/transactions/{id}/items",
+}
+# Result field -> JSON field, per endpoint
+CATALOG_FIELDS = {
+    "product_name": "productName", "category": "category", "vendor": "vendor",
+    "rec_price": "recPrice", "strain_name": "strain", "cost": "cost",
+}
+VENDOR_FIELDS = {"name": "name", "license": "licenseNumber"}
+MANIFEST_FIELDS = {"name": "productName", "qty": "quantity", "unit": "unit",
+                   "cost": "unitCost", "rec": "recPrice"}
+# localStorage keys that may hold an API token
+TOKEN_KEYS = ("accessToken", "authToken", "token")
+
+TOKEN_JS = """
+for (const key of arguments[0]) {
+    const value = window.localStorage.getItem(key);
+    if (value) return value;
+}
+return null;
+"""
+
+
+class AuthError(Exception):
+    """The backoffice rejected the copied session."""
+
+
+def _text(value):
+    return "" if value is None else str(value).strip()
+
+
+def _pick(item, fields):
+    return {field: _text(item.get(key)) for field, key in fields.items()}
+
+
+class HttpBackend:
+    """A requests.Session carrying a logged-in browser's credentials."""
+
+    def __init__(self, base_url=BASE_URL, workers=HTTP_WORKERS):
+        self.base_url = base_url
+        self.workers = workers
+        self.session = requests.Session()
+        retry = Retry(total=3, backoff_factor=0.3, status_forcelist=(502, 503, 504),
+                      allowed_methods=("GET",))
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=workers, max_retries=retry)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers["Accept"] = "application/json"
+        self._login_lock = threading.Lock()
+        self._logged_in = False
+
+    # ── credentials ──────────────────────────────────────────────────
+    def load_from_driver(self, driver):
+        """Copy cookies, user agent and bearer token from a logged-in driver."""
+        self.session.cookies.clear()
+        for c in driver.get_cookies():
+            self.session.cookies.set(c["name"], c["value"],
+                                     domain=c.get("domain", ""), path=c.get("path", "/"))
+        self.session.headers["User-Agent"] = driver.execute_script("return navigator.userAgent")
+        token = driver.execute_script(TOKEN_JS, list(TOKEN_KEYS))
+        if token:
+            self.session.headers["Authorization"] = f"Bearer {token}"
+        else:
+            self.session.headers.pop("Authorization", None)
+        self._logged_in = True
+
+    def login(self, force=False):
+        """
+        Borrow a logged-in browser from the session pool and copy its session.
+        With `force` the browser logs in again first, since the pool only
+        rechecks an idle browser's login now and then.
+        """
+        with self._login_lock:
+            if self._logged_in and not force:
+                return
+            with dutchie_session() as driver:
+                if driver and force:
+                    driver = login_to_dutchie(driver)
+                if not driver:
+                    raise AuthError("Login failed")
+                self.load_from_driver(driver)
+            print("[HTTP] Session copied from browser")
+
+    def get(self, endpoint, timeout=15, **params):
+        """GET a JSON endpoint, re-copying the browser session once on 401/403."""
+        self.login()
+        url = self.base_url + endpoint
+        response = self.session.get(url, params=params, timeout=timeout)
+        if response.status_code in (401, 403):
+            self.login(force=True)
+            response = self.session.get(url, params=params, timeout=timeout)
+            if response.status_code in (401, 403):
+                raise AuthError(f"{endpoint}: HTTP {response.status_code} after re-login")
+        response.raise_for_status()
+        return response.json()
+
+    def get_all(self, endpoint, timeout=15, **params):
+        """Every item of a paged {'items', 'total'} endpoint."""
+        items, page = [], 0
+        while True:
+            data = self.get(endpoint, timeout, page=page, pageSize=PAGE_SIZE, **params)
+            items.extend(data["items"])
+            page += 1
+            if not data["items"] or len(items) >= data.get("total", 0):
+                return items
+
+    # ── reads ────────────────────────────────────────────────────────
+    def search_catalog(self, product_name, timeout=15):
+        items = self.get_all(ENDPOINTS["catalog"], timeout, search=product_name)
+        return [_pick(item, CATALOG_FIELDS) for item in items]
+
+    def search_vendor(self, vendor_name, timeout=15):
+        items = self.get_all(ENDPOINTS["vendors"], timeout, search=vendor_name)
+        return [_pick(item, VENDOR_FIELDS) for item in items]
+
+    def list_manifests(self, timeout=15):
+        """[{'id', 'title'}] for every transaction awaiting receipt."""
+        return [{"id": t["id"], "title": _text(t["title"])}
+                for t in self.get_all(ENDPOINTS["manifests"], timeout)]
+
+    def manifest_rows(self, manifest_id, timeout=15):
+        items = self.get_all(ENDPOINTS["manifest_items"].format(id=manifest_id), timeout)
+        return [_pick(item, MANIFEST_FIELDS) for item in items]
+
+    def close(self):
+        self.session.close()
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_backend():
+    """The process-wide backend, created on first use."""
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            _backend = HttpBackend()
+        return _backend
+
+
+def enabled():
+    return READ_BACKEND == "http"
+
+
+# ── drop-in replacements ─────────────────────────────────────────────
+def search_catalog(product_name, timeout=15):
+    """Catalog rows matching `product_name`, keyed like catalog_search.SEARCH_COLUMNS."""
+    return get_backend().search_catalog(product_name, timeout)
+
+
+def search_vendor(driver, vendor_name, timeout=15):
+    """vendors.search_vendor over HTTP; `driver` is unused."""
+    return get_backend().search_vendor(vendor_name, timeout)
+
+
+def scrape_manifests(hooks, debug=False, timeout=15):
+    """
+    receive_inventory's scrape over HTTP: list the transactions, then fetch
+    the items of those `hooks` still wants, HTTP_WORKERS at a time.
+    Returns {title: rows}, or the titles when `debug` is set.
+    """
+    backend = get_backend()
+    listed = backend.list_manifests(timeout)
+    titles = [m["title"] for m in listed]
+    print(f"FOUND {len(titles)} manifests:")
+    if debug:
+        return titles
+    todo = set(hooks.titles(titles))
+    wanted = [m for m in listed if m["title"] in todo]
+
+    results = {}
+    with ThreadPoolExecutor(max_workers=backend.workers) as pool:
+        futures = [(m["title"], pool.submit(backend.manifest_rows, m["id"], timeout)) for m in wanted]
+        for title, future in futures:
+            if hooks.cancelled:
+                print("[Receive] Cancelled.")
+                for _, f in futures:
+                    f.cancel()
+                break
+            rows = future.result()
+            if rows:
+                results[title] = rows
+                hooks.manifest(title, rows)
+    print(f"[Receive] {len(results)}/{len(wanted)} manifests over HTTP")
+    return results
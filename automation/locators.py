@@ -0,0 +1,283 @@
+# automation/locators.py
+"""
+Named element locators with fallbacks, plus retry with exponential backoff.
+
+Each name maps to a list of (By, value) pairs: the absolute XPath the flows
+were written against comes first, followed by layout-independent fallbacks
+(labels, visible text, aria attributes, CSS). find() polls them all together
+and uses the first that matches, so one layout shift no longer fails a run,
+and logs when a fallback had to be used so the primary can be updated.
+"""
+import os
+import time
+import tracing
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.common.exceptions import (
+    StaleElementReferenceException, TimeoutException, WebDriverException,
+)
+from automation.waits import DEFAULT_TIMEOUT, POLL_INTERVAL
+
+# Transient failures worth another attempt
+TRANSIENT = (StaleElementReferenceException, TimeoutException)
+RETRY_ATTEMPTS = int(os.getenv("INTAKE_RETRY_ATTEMPTS", "3"))
+RETRY_DELAY = float(os.getenv("INTAKE_RETRY_DELAY", "0.5"))  # first backoff, doubles each time
+RETRY_MAX_DELAY = 8.0
+
+_MAIN = "/html/body/div[1]/div/div[2]/div[2]/div[1]"
+_FORM = _MAIN + "/div[2]/div[1]"
+_MENU = "/html/body/div[3]"
+
+
+def _labelled(label, tail="input"):
+    """XPath for the control following a form label with this text."""
+    return (By.XPATH, f"//label[normalize-space()='{label}']/following::{tail}[1]")
+
+
+def _menu_option(text):
+    return (By.XPATH, f"//ul[@role='listbox']/li[normalize-space()='{text}']")
+
+
+def _button(text):
+    return (By.XPATH, f"//button[normalize-space()='{text}']")
+
+
+_FIRST_RESULT = (By.XPATH, "(//ul[@role='listbox']//li)[1]")
+
+LOCATORS = {
+    # Shared list pages (Catalog, Vendors)
+    "page.header": [
+        (By.XPATH, _MAIN + "/header/div[1]/div/h1"),
+        (By.CSS_SELECTOR, "header h1"),
+    ],
+    "list.search_input": [
+        (By.XPATH, _MAIN + "/div[1]/div/div[1]/div/input"),
+        (By.CSS_SELECTOR, "input[placeholder*='Search' i]"),
+        (By.CSS_SELECTOR, "input[type='search']"),
+    ],
+    "list.search_button": [
+        (By.XPATH, _MAIN + "/div[1]/div/button[2]"),
+        _button("Search"),
+    ],
+    "list.add_button": [
+        (By.XPATH, _MAIN + "/header/div[2]/button[2]"),
+        (By.XPATH, "//header//button[starts-with(normalize-space(), 'Add')]"),
+    ],
+    "list.no_data": [
+        (By.XPATH, _MAIN + "/div[2]/div/div[2]/div[1]/div/div/p[1]"),
+        (By.XPATH, "//p[normalize-space()='No data available']"),
+    ],
+
+    # Strain form (add and edit)
+    "strain.name": [
+        (By.XPATH, _MAIN + "/div/div/div/div[1]/div/div/input"),
+        _labelled("Name"),
+    ],
+    "strain.description": [
+        (By.XPATH, _MAIN + "/div/div/div/div[2]/div/div/input"),
+        _labelled("Description"),
+    ],
+    "strain.abbreviation": [
+        (By.XPATH, _MAIN + "/div/div/div/div[3]/div/div/input"),
+        _labelled("Abbreviation"),
+    ],
+    "strain.save": [
+        (By.XPATH, _MAIN + "/div/div/button"),
+        _button("Save"),
+    ],
+
+    # Add vendor form
+    "vendor.header": [
+        (By.XPATH, _MAIN + "/div[1]/div/h1"),
+        (By.XPATH, "//h1[normalize-space()='Add vendor']"),
+    ],
+    "vendor.name": [
+        (By.XPATH, _MAIN + "/div[2]/div/div[1]/div/div/input"),
+        _labelled("Vendor name"),
+        _labelled("Name"),
+    ],
+    "vendor.license": [
+        (By.XPATH, _MAIN + "/div[2]/div/div[2]/div/div/input"),
+        _labelled("License number"),
+        _labelled("License"),
+    ],
+    "vendor.save": [
+        (By.XPATH, _MAIN + "/div[2]/button"),
+        _button("Save"),
+    ],
+
+    # Receive Inventory (options are XPaths only: their text is read in one script)
+    "receive.manifest_select": [
+        (By.XPATH, _MAIN + "/section/article/div/div[2]/div[2]/div/div"),
+        (By.XPATH, "//label[normalize-space()='Transaction']/following::div[@role='button'][1]"),
+    ],
+    "receive.manifest_option": [
+        (By.XPATH, _MENU + "/div[3]/ul/li"),
+        (By.XPATH, "//ul[@role='listbox']/li"),
+    ],
+
+    # New Product form
+    "new_product.header": [
+        (By.XPATH, _MAIN + "/header/div[1]/div/h1"),
+        (By.XPATH, "//h1[normalize-space()='New Product']"),
+    ],
+    "new_product.name": [
+        (By.XPATH, _FORM + "/div[1]/div/div/input"),
+        _labelled("Product name"),
+        (By.CSS_SELECTOR, "input[name='productName']"),
+    ],
+    "new_product.generate_sku": [
+        (By.XPATH, _FORM + "/div[2]/div/div/div/button"),
+        _button("Generate"),
+        (By.CSS_SELECTOR, "button[aria-label*='generate' i]"),
+    ],
+    "new_product.category": [
+        (By.XPATH, _FORM + "/div[5]/div/div"),
+        _labelled("Category", "div[@role='button' or @role='combobox']"),
+    ],
+    "new_product.category.flower": [
+        (By.XPATH, _MENU + "/div[3]/ul/li[2]"),
+        _menu_option("Cannabis Flower"),
+    ],
+    "new_product.external_category": [
+        (By.XPATH, _FORM + "/div[6]/div/div"),
+        _labelled("External category", "div[@role='button' or @role='combobox']"),
+    ],
+    "new_product.external_category.buds": [
+        (By.XPATH, _MENU + "/div[3]/ul/li[2]"),
+        _menu_option("Buds by Strain"),
+    ],
+    "new_product.type": [
+        (By.XPATH, _FORM + "/div[8]/div/div"),
+        _labelled("Type", "div[@role='button' or @role='combobox']"),
+    ],
+    "new_product.type.weight": [
+        (By.XPATH, _MENU + "/div[3]/ul/li[2]"),
+        _menu_option("Weight"),
+    ],
+    "new_product.unit": [
+        (By.XPATH, _FORM + "/div[9]/div/div"),
+        _labelled("Unit", "div[@role='button' or @role='combobox']"),
+    ],
+    "new_product.unit.gram": [
+        (By.XPATH, _MENU + "/div[3]/ul/li[1]"),
+        _menu_option("Gram"),
+    ],
+    "new_product.retail": [
+        (By.XPATH, _FORM + "/div[14]/div/div/input"),
+        _labelled("Price"),
+        (By.CSS_SELECTOR, "input[name='price']"),
+    ],
+    "new_product.cost": [
+        (By.XPATH, _FORM + "/div[18]/div/div/input"),
+        _labelled("Unit cost"),
+        (By.CSS_SELECTOR, "input[name='unitCost']"),
+    ],
+    "new_product.strain": [
+        (By.XPATH, _FORM + "/div[22]/div/div/div"),
+        _labelled("Strain", "div[.//input]"),
+    ],
+    "new_product.strain.first": [
+        (By.XPATH, _MENU + "/div/div[2]/div/div/div/ul/li[1]/div/div"),
+        _FIRST_RESULT,
+    ],
+    "new_product.vendor": [
+        (By.XPATH, _FORM + "/div[23]/div/div"),
+        _labelled("Vendor", "div[.//input]"),
+    ],
+    "new_product.vendor.first": [
+        (By.XPATH, _MENU + "/div/div[2]/div/div/div/ul/li[1]"),
+        _FIRST_RESULT,
+    ],
+    "new_product.pricing_tier": [
+        (By.XPATH, _FORM + "/div[33]/div/div/div/svg"),
+        _labelled("Pricing tier", "div[.//input]"),
+    ],
+    "new_product.pricing_tier.option": [
+        (By.XPATH, _MENU + "/div/div[2]/div/div/div/ul/li[3]/div/div/span"),
+        (By.XPATH, "(//ul[@role='listbox']//li)[3]"),
+    ],
+    "new_product.save": [
+        (By.XPATH, _MAIN + "/div[2]/div[2]/div/button"),
+        _button("Save"),
+        (By.CSS_SELECTOR, "button[type='submit']"),
+    ],
+}
+
+# Names already reported as matching a fallback
+_healed = set()
+
+
+def _usable(el, clickable):
+    try:
+        return el.is_displayed() and (not clickable or el.is_enabled())
+    except StaleElementReferenceException:
+        return False
+
+
+def _match(driver, name, clickable):
+    for index, (by, value) in enumerate(LOCATORS[name]):
+        for el in driver.find_elements(by, value):
+            if _usable(el, clickable):
+                if index and name not in _healed:
+                    _healed.add(name)
+                    print(f"[Locators] {name!r}: primary locator failed, matched fallback #{index}: {value}")
+                return el
+    return False
+
+
+def find(driver, name, timeout=DEFAULT_TIMEOUT, clickable=False):
+    """
+    The first displayed element (enabled too, if `clickable`) matched by any
+    of `name`'s locators, trying them in order on every poll.
+    """
+    try:
+        return WebDriverWait(driver, timeout, POLL_INTERVAL).until(
+            lambda d: _match(d, name, clickable)
+        )
+    except TimeoutException:
+        raise TimeoutException(f"No locator for {name!r} matched within {timeout}s") from None
+
+
+def present(driver, name):
+    """The element `name` matches right now, or None (no waiting)."""
+    return _match(driver, name, False) or None
+
+
+def matched_xpath(driver, name):
+    """The first of `name`'s XPath locators that matches right now, or None."""
+    return next((value for by, value in LOCATORS[name]
+                 if by == By.XPATH and driver.find_elements(by, value)), None)
+
+
+def wait_gone(driver, name, timeout=DEFAULT_TIMEOUT):
+    """Wait until none of `name`'s locators match a visible element."""
+    WebDriverWait(driver, timeout, POLL_INTERVAL).until(
+        lambda d: not _match(d, name, False)
+    )
+
+
+def retry(fn, *args, attempts=RETRY_ATTEMPTS, delay=RETRY_DELAY,
+          exceptions=TRANSIENT, on_retry=None, label=None, **kwargs):
+    """
+    Call fn(*args, **kwargs), retrying transient failures with exponential
+    backoff (delay, 2*delay, ... capped at RETRY_MAX_DELAY). `on_retry(error)`
+    runs before each new attempt, e.g. to close a half-open menu.
+    """
+    label = label or getattr(fn, "__name__", "step")
+    for attempt in range(1, attempts + 1):
+        try:
+            return fn(*args, **kwargs)
+        except exceptions as e:
+            if attempt == attempts:
+                raise
+            wait = min(delay * 2 ** (attempt - 1), RETRY_MAX_DELAY)
+            print(f"[Retry] {label}: {type(e).__name__} (attempt {attempt}/{attempts}); "
+                  f"retrying in {wait:.1f}s")
+            tracing.count_retry()
+            time.sleep(wait)
+            if on_retry:
+                try:
+                    on_retry(e)
+                except WebDriverException:
+                    pass
@@ -1,20 +1,63 @@
 # automation/login.py
-import time
-from selenium import webdriver
+import tracing
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException
 from secrets import username, password  # Loaded from .env
+from automation.driver_factory import create_driver
+from automation.locators import present
+from automation.urls import url
+from automation.waits import wait_for_page_ready
 
-def login_to_dutchie():
-    driver = webdriver.Chrome()
-    driver.get("https://peak.backoffice.dutchie.com/")
+HOME_URL = url("/")
+USERNAME_INPUT_ID = "input-input_"
+LOGIN_TIMEOUT = 30
+# Extra time for the login form to render once the page is idle
+FORM_GRACE = 3
+
+
+def is_logged_in(driver):
+    """True unless the current page is the Dutchie login form."""
+    return not driver.find_elements(By.ID, USERNAME_INPUT_ID)
+
+
+def login_to_dutchie(driver=None, profile=None):
+    """
+    Log into Dutchie, launching a new Chrome (from the driver factory
+    `profile`) unless `driver` is given. Returns the logged-in driver,
+    or None (after quitting it) on failure.
+    """
+    with tracing.span("login") as span:
+        driver = _login(driver, profile)
+        if driver is None:
+            span.set(outcome="failed")
+        return driver
+
+
+def _login(driver, profile):
+    if driver is None:
+        driver = create_driver(profile)
+    driver.get(HOME_URL)
 
     try:
-        username_input = WebDriverWait(driver, 10).until(
-            EC.presence_of_element_located((By.ID, "input-input_"))
-        )
+        # A persistent Chrome profile may still hold a valid session, in
+        # which case the login form never shows up
+        wait_for_page_ready(driver, LOGIN_TIMEOUT)
+        try:
+            username_input = WebDriverWait(driver, FORM_GRACE).until(
+                EC.presence_of_element_located((By.ID, USERNAME_INPUT_ID))
+            )
+        except TimeoutException:
+            # No form yet: a valid session shows the app's page header, a
+            # slow login page the form. If neither shows up, the login failed.
+            WebDriverWait(driver, LOGIN_TIMEOUT).until(
+                lambda d: present(d, "page.header") or d.find_elements(By.ID, USERNAME_INPUT_ID)
+            )
+            if is_logged_in(driver):
+                return driver
+            username_input = driver.find_element(By.ID, USERNAME_INPUT_ID)
         username_input.send_keys(username)
 
         password_input = WebDriverWait(driver, 10).until(
@@ -23,7 +66,11 @@ def login_to_dutchie():
         password_input.send_keys(password)
         password_input.send_keys(Keys.ENTER)
 
-        time.sleep(10)  # Wait for post-login navigation
+        # Wait for post-login navigation: the form goes away, the app loads
+        WebDriverWait(driver, LOGIN_TIMEOUT).until(
+            EC.invisibility_of_element_located((By.ID, USERNAME_INPUT_ID))
+        )
+        wait_for_page_ready(driver, LOGIN_TIMEOUT)
         return driver  # Keep driver open for next tasks
 
     except Exception as e:
@@ -1,98 +1,292 @@
+import os
+import threading
 import time
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, StaleElementReferenceException
-from automation.login import login_to_dutchie
+from automation import http_backend
+from automation.grid import read_grid, read_texts
+from automation.locators import find, matched_xpath, retry
+from automation.session import SessionPool, dutchie_session
+from automation.urls import url
+from automation.waits import StepTimer, wait_for_gone, wait_for_page_ready, wait_for_results
+from data import manifests
+from data.database import get_manager
 
-def scrape_receive_inventory(debug=False):
-    driver = login_to_dutchie()
-    if not driver:
-        print("LOGIN FAILED")
-        return
+RECEIVE_URL = url("/products/inventory/receive-inventory")
 
+# XPaths (tweak these if the structure shifts); the manifest dropdown and
+# its options live in automation/locators.py
+ROWS_XPATH      = "/html/body/div[1]/div/div[2]/div[2]/div[1]/div[6]/div/div[2]/div[2]/div/div/div[1]/div"
+
+# Zero-based cell index of each field in a manifest row
+MANIFEST_COLUMNS = {"name": 1, "qty": 3, "unit": 4, "cost": 9, "rec": 11}
+
+# Browsers used to scrape manifests in parallel
+SCRAPE_WORKERS = int(os.getenv("INTAKE_SCRAPE_WORKERS", "1"))
+
+
+def scrape_receive_inventory(debug=False, workers=SCRAPE_WORKERS,
+                             on_titles=None, on_manifest=None, cancel=None,
+                             skip_titles=()):
+    """
+    Scrape every manifest on the Receive Inventory page.
+    Returns {title: rows}, or the list of titles when `debug` is set.
+    With `workers` > 1 the manifests are split across that many browsers;
+    with INTAKE_READ_BACKEND=http they are fetched over HTTP instead.
+    Titles in `skip_titles` (e.g. already stored) are listed but not scraped.
+
+    `on_titles(titles)` is called once the manifest list is known and
+    `on_manifest(title, rows)` as soon as each manifest is scraped. Setting
+    the `cancel` threading.Event stops after the manifest in progress.
+    """
+    hooks = _Hooks(on_titles, on_manifest, cancel, skip_titles)
+    if http_backend.enabled():
+        return http_backend.scrape_manifests(hooks, debug)
+    if workers > 1 and not debug:
+        return _scrape_parallel(workers, hooks)
+    with dutchie_session() as driver:
+        if not driver:
+            print("LOGIN FAILED")
+            return
+        return _scrape_receive_inventory(driver, debug, hooks)
+
+
+class _Hooks:
+    """Progress callbacks and cancellation shared by the scrape paths."""
+
+    def __init__(self, on_titles=None, on_manifest=None, cancel=None, skip=()):
+        self.on_titles = on_titles
+        self.on_manifest = on_manifest
+        self.cancel = cancel
+        self.skip = set(skip)
+
+    @property
+    def cancelled(self):
+        return self.cancel is not None and self.cancel.is_set()
+
+    def titles(self, titles):
+        """Report the listed titles; returns the ones still to scrape."""
+        if self.on_titles:
+            self.on_titles(titles)
+        return [t for t in titles if t not in self.skip]
+
+    def manifest(self, title, rows):
+        if self.on_manifest:
+            self.on_manifest(title, rows)
+
+
+def _open_receive_page(driver):
     # 1) Navigate
-    url = "https://peak.backoffice.dutchie.com/products/inventory/receive-inventory"
-    driver.get(url)
+    driver.get(RECEIVE_URL)
     wait = WebDriverWait(driver, 10)
     wait.until(EC.presence_of_element_located((By.TAG_NAME, "body")))
+    wait_for_page_ready(driver)
+    return wait
+
+
+def _close_menu(driver, option_xpath=None):
+    driver.find_element(By.TAG_NAME, "body").send_keys(Keys.ESCAPE)
+    if option_xpath:
+        wait_for_gone(driver, option_xpath)
+
+
+def _open_menu(driver, timeout=10):
+    """
+    Open the manifest dropdown. Returns the XPath of its options (whichever
+    of the registry's option locators matched) and their texts.
+    """
+    dd = find(driver, "receive.manifest_select", timeout, clickable=True)
+    try:
+        dd.click()
+    except Exception:
+        # fallback if click is intercepted
+        driver.execute_script("arguments[0].scrollIntoView(true); arguments[0].click();", dd)
+    find(driver, "receive.manifest_option", timeout)
+    option_xpath = matched_xpath(driver, "receive.manifest_option")
+    if option_xpath is None:
+        raise TimeoutException("manifest menu closed before it could be read")
+    return option_xpath, read_texts(driver, option_xpath)
+
+
+def _list_titles(driver, wait):
+    # Prime the menu and grab all titles, then close it again
+    option_xpath, titles = _open_menu(driver)
+    _close_menu(driver, option_xpath)
+    return titles
+
+
+def _scrape_manifest(driver, wait, title):
+    """
+    Select `title` in the manifest dropdown and scrape its table.
+    Returns the rows, [] if the table never rendered, or None if the
+    title is no longer listed.
+    """
+    option_xpath, texts = _open_menu(driver)
+    idx = next((i for i, text in enumerate(texts, start=1) if text == title), None)
+    if idx is None:
+        print(f"  !! {title!r} no longer listed")
+        _close_menu(driver, option_xpath)
+        return None
+
+    # ensure it's clickable
+    opt = wait.until(EC.element_to_be_clickable((By.XPATH, f"({option_xpath})[{idx}]")))
+    try:
+        opt.click()
+    except Exception:
+        # JS fallback
+        driver.execute_script("arguments[0].scrollIntoView({block:'center'}); arguments[0].click();", opt)
+
+    # Wait for the table to load and stop growing
+    try:
+        wait_for_results(driver, ROWS_XPATH, allow_empty=False)
+    except TimeoutException:
+        print("  !! table rows never appeared")
+        return []
+
+    # Scrape rows (one round trip for the whole table)
+    data = read_grid(driver, ROWS_XPATH, MANIFEST_COLUMNS)
 
-    # 2) XPaths (tweak these if the structure shifts)
-    dropdown_xpath  = "/html/body/div[1]/div/div[2]/div[2]/div[1]/section/article/div/div[2]/div[2]/div/div"
-    list_item_xpath = "/html/body/div[3]/div[3]/ul/li"
-    rows_xpath      = "/html/body/div[1]/div/div[2]/div[2]/div[1]/div[6]/div/div[2]/div[2]/div/div/div[1]/div"
-
-    def open_and_fetch_items():
-        # a) Click the dropdown
-        dd = wait.until(EC.element_to_be_clickable((By.XPATH, dropdown_xpath)))
-        try:
-            dd.click()
-        except Exception:
-            # fallback if click is intercepted
-            driver.execute_script("arguments[0].scrollIntoView(true); arguments[0].click();", dd)
-
-        # b) Wait for the list items to appear
-        wait.until(EC.visibility_of_any_elements_located((By.XPATH, list_item_xpath)))
-        return driver.find_elements(By.XPATH, list_item_xpath)
-
-    # 3) Prime the menu and grab all titles
-    items = open_and_fetch_items()
-    titles = [el.text.strip() for el in items]
+    # Close the pop‑up (ESC)
+    _close_menu(driver, option_xpath)
+    return data
+
+
+def _scrape_titles(driver, titles, timer, hooks, label="", wait=None):
+    """
+    Scrape each of `titles` in turn. Opens the Receive Inventory page first
+    unless `wait` is given for a page that is already open.
+    """
+    timer.driver = driver
+    if wait is None:
+        with timer.step("load receive page"):
+            wait = _open_receive_page(driver)
+    results = {}
+    for idx, title in enumerate(titles, start=1):
+        if hooks.cancelled:
+            print(f"[Receive]{label} Cancelled.")
+            break
+        print(f"\n→ SELECTING{label} #{idx}: {title}")
+        with timer.step(f"manifest #{idx}", span="manifest") as step:
+            data = retry(_scrape_manifest, driver, wait, title,
+                         on_retry=lambda e: _close_menu(driver), label=f"manifest {title[-8:]}")
+            step.set(rows=len(data or ()))
+        if data:
+            results[title] = data
+            hooks.manifest(title, data)
+    return results
+
+
+def _scrape_receive_inventory(driver, debug, hooks):
+    timer = StepTimer("Receive Inventory", trace="receive", driver=driver)
+
+    with timer.step("load receive page"):
+        wait = _open_receive_page(driver)
+
+    with timer.step("list manifests"):
+        titles = retry(_list_titles, driver, wait, on_retry=lambda e: _close_menu(driver))
     print(f"FOUND {len(titles)} manifests:")
     for i, t in enumerate(titles, 1):
         print(f"  {i}. {t!r}")
 
     if debug:
-        driver.quit()
+        timer.report()
         return titles
+    todo = hooks.titles(titles)
+    if len(todo) < len(titles):
+        print(f"SKIPPING {len(titles) - len(todo)} already-scraped manifests")
 
-    # 4) Loop through each option
-    results = {}
-    for idx, title in enumerate(titles, start=1):
-        print(f"\n→ SELECTING #{idx}: {title}")
-        items = open_and_fetch_items()
-        if idx-1 >= len(items):
-            print(f"  !! index {idx} out of range")
-            break
+    results = _scrape_titles(driver, todo, timer, hooks, wait=wait)
+    timer.report()
+    return results
+
+
+def _scrape_parallel(workers, hooks):
+    """Shard the manifest titles across `workers` browsers and merge the results."""
+    pool = SessionPool(max_size=workers)
+    try:
+        with pool.session() as driver:
+            if not driver:
+                print("LOGIN FAILED")
+                return
+            titles = retry(_list_titles, driver, _open_receive_page(driver),
+                           on_retry=lambda e: _close_menu(driver))
+        todo = hooks.titles(titles)
+        print(f"FOUND {len(titles)} manifests; scraping {len(todo)} with {workers} browsers")
+
+        shards = [todo[n::workers] for n in range(workers)]
+        shard_results = [{} for _ in shards]
+        timers = [StepTimer(f"Receive Inventory worker {n + 1}", trace="receive") for n in range(len(shards))]
+
+        def work(n):
+            if not shards[n]:
+                return
+            try:
+                with pool.session() as driver:
+                    if not driver:
+                        print(f"[Receive] worker {n + 1}: LOGIN FAILED")
+                        return
+                    shard_results[n] = _scrape_titles(driver, shards[n], timers[n], hooks, f" [w{n + 1}]")
+            except Exception as e:
+                print(f"[Receive] worker {n + 1} failed: {e}")
 
-        opt = items[idx-1]
-        # ensure it's clickable
-        wait.until(EC.element_to_be_clickable((By.XPATH, f"({list_item_xpath})[{idx}]")))
-        try:
-            opt.click()
-        except Exception:
-            # JS fallback
-            driver.execute_script("arguments[0].scrollIntoView({block:'center'}); arguments[0].click();", opt)
-
-        # 5) Wait for the table to render
-        try:
-            wait.until(EC.presence_of_all_elements_located((By.XPATH, rows_xpath)))
-        except TimeoutException:
-            print("  !! table rows never appeared")
-            continue
-
-        # 6) Scrape rows
-        rows = driver.find_elements(By.XPATH, rows_xpath)
-        data = []
-        for r in rows:
-            cells = r.find_elements(By.XPATH, "./div")
-            data.append({
-                "name": cells[1].text.strip(),
-                "qty":  cells[3].text.strip(),
-                "unit": cells[4].text.strip(),
-                "cost": cells[9].text.strip(),
-                "rec":  cells[11].text.strip(),
-            })
-        results[title] = data
-
-        # 7) Close the pop‑up (ESC)
-        driver.find_element(By.TAG_NAME, "body").send_keys(Keys.ESCAPE)
-        time.sleep(0.3)
-
-    driver.quit()
+        start = time.perf_counter()
+        threads = [threading.Thread(target=work, args=(n,)) for n in range(len(shards))]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        elapsed = time.perf_counter() - start
+    finally:
+        pool.close()
+
+    # Merge in the dropdown's original order
+    merged = {}
+    for n in range(len(shards)):
+        merged.update(shard_results[n])
+    results = {title: merged[title] for title in titles if title in merged}
+
+    for n, timer in enumerate(timers):
+        print(f"[Receive] worker {n + 1}: {len(shard_results[n])}/{len(shards[n])} manifests "
+              f"in {timer.total:.1f}s")
+        timer.report()
+    print(f"[Receive] {len(results)}/{len(todo)} manifests in {elapsed:.1f}s wall time")
     return results
 
+
+def store_receive_inventory(db=None, diff=False, workers=SCRAPE_WORKERS):
+    """
+    Scrape the manifests into active_manifest, logging a scrape_run. Each
+    manifest is queued on the `db` ConnectionManager's writer as soon as it
+    is scraped, so parallel workers never wait on the database.
+    With `diff` only titles not stored yet are scraped. Returns
+    {'run', 'listed', 'scraped', 'dropped'}.
+    """
+    db = db or get_manager()
+    run_id = db.write(manifests.start_run, "diff" if diff else "full").result()
+    listed = []
+    results = None
+    try:
+        results = scrape_receive_inventory(
+            workers=workers,
+            on_titles=listed.extend,
+            on_manifest=lambda title, rows: db.write(manifests.save_manifest, run_id, title, rows),
+            skip_titles=manifests.scraped_titles(db.reader()) if diff else (),
+        )
+    finally:
+        status = "failed" if results is None else "done"
+        dropped = db.write(manifests.drop_missing, listed).result() if listed else 0
+        db.write(manifests.finish_run, run_id, status, len(listed), len(results or {})).result()
+    return {"run": run_id, "listed": len(listed), "scraped": len(results or {}), "dropped": dropped}
+
+
 if __name__ == "__main__":
-    out = scrape_receive_inventory(debug=False)
-    print(out)
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Scrape Receive Inventory manifests into active_manifest.")
+    parser.add_argument("--diff", action="store_true", help="Only scrape titles not stored yet")
+    parser.add_argument("--workers", type=int, default=SCRAPE_WORKERS, help="Parallel browsers")
+    args = parser.parse_args()
+    print(store_receive_inventory(diff=args.diff, workers=args.workers))
@@ -0,0 +1,141 @@
+# automation/session.py
+"""
+Keep logged-in Dutchie browsers alive between operations.
+
+Entry points borrow a driver with ``dutchie_session()`` instead of calling
+``login_to_dutchie()`` and ``driver.quit()`` themselves, so back-to-back
+operations reuse one warm, already-authenticated browser.
+"""
+import atexit
+import os
+import threading
+import time
+from contextlib import contextmanager
+from selenium.common.exceptions import WebDriverException
+from automation.login import login_to_dutchie, is_logged_in, HOME_URL
+
+# Browsers kept per process; raise it for parallel work.
+POOL_SIZE = int(os.getenv("INTAKE_BROWSER_POOL_SIZE", "1"))
+# Re-verify the login of a driver that has sat idle this long (seconds).
+RECHECK_AFTER = 300
+
+
+class SessionPool:
+    def __init__(self, max_size=POOL_SIZE, profile=None):
+        self.max_size = max_size
+        self.profile = profile  # driver factory profile for new browsers
+        self._idle = []  # (driver, last_used) pairs, most recent last
+        self._count = 0  # drivers alive, idle or checked out
+        self._cond = threading.Condition()
+        self._closed = False
+
+    @contextmanager
+    def session(self):
+        """
+        Borrow a logged-in driver, yielding None if login failed.
+        The driver goes back to the pool unless the browser died.
+        """
+        driver = self._checkout()
+        try:
+            yield driver
+        finally:
+            if driver is not None:
+                self._checkin(driver)
+
+    def close(self):
+        """Quit every idle driver and stop handing out new ones."""
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._count -= len(idle)
+            self._cond.notify_all()
+        for driver, _ in idle:
+            _quit(driver)
+
+    def _checkout(self):
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise RuntimeError("Session pool is closed")
+                if self._idle:
+                    driver, last_used = self._idle.pop()
+                    break
+                if self._count < self.max_size:
+                    driver, last_used = None, None
+                    self._count += 1
+                    break
+                self._cond.wait()
+
+        # Health-check and (re)login outside the lock
+        try:
+            if driver is not None and not is_alive(driver):
+                print("[Session] Browser died; starting a new one.")
+                _quit(driver)
+                driver = None
+            if driver is None:
+                driver = login_to_dutchie(profile=self.profile)
+            elif time.monotonic() - last_used > RECHECK_AFTER:
+                driver.get(HOME_URL)
+                if not is_logged_in(driver):
+                    print("[Session] Session expired; logging in again.")
+                    driver = login_to_dutchie(driver)
+        except Exception:
+            if driver is not None:
+                _quit(driver)
+            self._release_slot()
+            raise
+
+        if driver is None:
+            self._release_slot()
+        return driver
+
+    def _checkin(self, driver):
+        alive = is_alive(driver)
+        with self._cond:
+            if alive and not self._closed:
+                self._idle.append((driver, time.monotonic()))
+                self._cond.notify()
+                return
+            self._count -= 1
+            self._cond.notify()
+        _quit(driver)
+
+    def _release_slot(self):
+        with self._cond:
+            self._count -= 1
+            self._cond.notify()
+
+
+def is_alive(driver):
+    """True if the browser behind `driver` still responds."""
+    try:
+        driver.execute_script("return document.readyState")
+        return True
+    except WebDriverException:
+        return False
+
+
+def _quit(driver):
+    try:
+        driver.quit()
+    except WebDriverException:
+        pass
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """The process-wide session pool, created on first use."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = SessionPool()
+            atexit.register(_pool.close)
+        return _pool
+
+
+def dutchie_session():
+    """Borrow a logged-in driver from the shared pool."""
+    return get_pool().session()
@@ -1,10 +1,42 @@
 # automation/strains.py
+"""
+Create and edit strains in Dutchie Backoffice.
 
+sync_strains() mirrors the Strains page into the local strains table, and
+upsert_strains() diffs a list of names against it so only missing or
+different strains are searched for, reusing one open Strains page between
+them instead of reloading it for every strain.
+
+Usage:
+    python -m automation.strains sync
+    python -m automation.strains upsert NAME [NAME ...]
+"""
+import argparse
 import time
+from datetime import datetime
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import StaleElementReferenceException, WebDriverException
+from automation.grid import read_grid
+from automation.locators import find, present, retry, wait_gone
+from automation.session import dutchie_session
+from automation.urls import url
+from automation.waits import StepTimer, wait_for_results
+from data import strain_cache
+from data.database import get_manager
+
+STRAINS_URL = url("/products/strains")
+
+# XPaths (the header, search box, buttons and form fields live in
+# automation/locators.py)
+ROWS_XPATH = "/html/body/div[1]/div/div[2]/div[2]/div[1]/div[2]/div/div[2]/div[2]/div/div/div[1]/div"
+NEXT_PAGE_XPATH = "//button[@aria-label='Go to next page']"
+FORM_FIELDS = ("strain.name", "strain.description", "strain.abbreviation")
+
+# Zero-based cell index of each field in a strain row
+STRAIN_COLUMNS = {"name": 0, "abbreviation": 1}
+
 
 def remove_banner(driver, max_attempts=3, delay=0.25):
     for attempt in range(max_attempts):
@@ -19,82 +51,201 @@ def remove_banner(driver, max_attempts=3, delay=0.25):
             pass
         time.sleep(delay)
 
-def fill_strain_form(driver, strain, editing=False):
-    name_xpath = "/html/body/div[1]/div/div[2]/div[2]/div[1]/div/div/div/div[1]/div/div/input"
-    desc_xpath = "/html/body/div[1]/div/div[2]/div[2]/div[1]/div/div/div/div[2]/div/div/input"
-    abbr_xpath = "/html/body/div[1]/div/div[2]/div[2]/div[1]/div/div/div/div[3]/div/div/input"
 
-    name_input = driver.find_element(By.XPATH, name_xpath)
-    desc_input = driver.find_element(By.XPATH, desc_xpath)
-    abbr_input = driver.find_element(By.XPATH, abbr_xpath)
+def _header_text(driver):
+    header = present(driver, "page.header")
+    try:
+        return header.text.strip() if header else ""
+    except StaleElementReferenceException:
+        return ""  # the page changed under us
 
-    if editing:
-        for element in [name_input, desc_input, abbr_input]:
-            element.send_keys(Keys.BACKSPACE * 20)
-    else:
-        for element in [name_input, desc_input, abbr_input]:
-            element.clear()
 
-    name_input.send_keys(strain)
-    time.sleep(0.25)
-    desc_input.send_keys(strain)
-    time.sleep(0.25)
-    abbr_input.send_keys(strain)
+def _on_strains_page(driver):
+    return _header_text(driver) == "Strains" and present(driver, "list.search_input") is not None
+
+
+def _wait_for_header(driver, text, timeout):
+    WebDriverWait(driver, timeout).until(lambda d: _header_text(d) == text)
+
 
-def create_or_edit_strain(driver, strain_name: str):
-    driver.get("https://peak.backoffice.dutchie.com/products/strains")
-    time.sleep(1)
+def open_strains_page(driver, timeout=10):
+    driver.get(STRAINS_URL)
+    find(driver, "page.header", timeout)
+    _wait_for_header(driver, "Strains", timeout)
     remove_banner(driver)
-    WebDriverWait(driver, 10).until(
-        EC.text_to_be_present_in_element(
-            (By.XPATH, "/html/body/div[1]/div/div[2]/div[2]/div[1]/header/div/div/h1"),
-            "Strains"
-        )
-    )
-
-    # Enter strain in search
-    search_box = driver.find_element(By.XPATH, "/html/body/div[1]/div/div[2]/div[2]/div[1]/div[1]/div/div[1]/div/input")
+
+
+def search_strains(driver, strain_name, timeout=10):
+    """
+    Search the Strains page for `strain_name`, reusing the page if it is
+    already open. Returns the result rows as {'name', 'abbreviation'} dicts.
+    """
+    if not _on_strains_page(driver):
+        open_strains_page(driver, timeout)
+    search_box = find(driver, "list.search_input", timeout)
+    # Select-all + delete: clear() doesn't reach React's input state
+    search_box.send_keys(Keys.CONTROL + "a", Keys.BACKSPACE)
     search_box.send_keys(strain_name)
-    driver.find_element(By.XPATH, "/html/body/div[1]/div/div[2]/div[2]/div[1]/div[1]/div/button[2]").click()
-    time.sleep(2)
+    find(driver, "list.search_button", timeout, clickable=True).click()
+    wait_for_results(driver, ROWS_XPATH, timeout)
 
     # Look for "No data available"
-    no_data_xpath = "/html/body/div[1]/div/div[2]/div[2]/div[1]/div[2]/div/div[2]/div[1]/div/div/p[1]"
-    no_data_elements = driver.find_elements(By.XPATH, no_data_xpath)
+    no_data = present(driver, "list.no_data")
+    if no_data and no_data.text.strip() == "No data available":
+        return []
+    return read_grid(driver, ROWS_XPATH, STRAIN_COLUMNS)
 
-    if no_data_elements and no_data_elements[0].is_displayed() and no_data_elements[0].text.strip() == "No data available":
-        print(f"Strain '{strain_name}' not found. Creating...")
-        add_strain(driver, strain_name)
-    else:
-        print(f"Strain '{strain_name}' exists. Editing...")
-        edit_strain(driver, strain_name)
-
-def add_strain(driver, strain):
-    add_button_xpath = "/html/body/div[1]/div/div[2]/div[2]/div[1]/header/div[2]/button[2]"
-    driver.find_element(By.XPATH, add_button_xpath).click()
-
-    WebDriverWait(driver, 10).until(
-        EC.text_to_be_present_in_element(
-            (By.XPATH, "/html/body/div[1]/div/div[2]/div[2]/div[1]/header/div/div/h1"), "Add strain"
-        )
-    )
-    fill_strain_form(driver, strain, editing=False)
-    save_button = WebDriverWait(driver, 10).until(
-        EC.element_to_be_clickable((By.XPATH, "/html/body/div[1]/div/div[2]/div[2]/div[1]/div/div/button"))
-    )
-    save_button.click()
-    WebDriverWait(driver, 10).until_not(
-        EC.element_to_be_clickable((By.XPATH, "/html/body/div[1]/div/div[2]/div[2]/div[1]/div/div/button"))
-    )
+
+def fill_strain_form(driver, strain, editing=False, timeout=10):
+    """
+    Set name, description and abbreviation to `strain`. When editing, only
+    fields holding a different value are retyped. Returns how many changed.
+    """
+    inputs = [find(driver, name, timeout) for name in FORM_FIELDS]
+    changed = 0
+    for element in inputs:
+        if editing:
+            value = element.get_attribute("value") or ""
+            if value == strain:
+                continue
+            element.send_keys(Keys.BACKSPACE * max(20, len(value)))
+        else:
+            element.clear()
+        element.send_keys(strain)
+        changed += 1
+    return changed
+
+
+def _save(driver, timeout=10):
+    find(driver, "strain.save", timeout, clickable=True).click()
+    wait_gone(driver, "strain.save", timeout)
+
+
+def add_strain(driver, strain, timeout=10):
+    """Create `strain` from an open Strains page."""
+    find(driver, "list.add_button", timeout, clickable=True).click()
+    _wait_for_header(driver, "Add strain", timeout)
+    fill_strain_form(driver, strain, editing=False, timeout=timeout)
+    _save(driver, timeout)
     print(f"[Strain] Created: {strain}")
 
-def edit_strain(driver, strain):
-    row_xpath = "/html/body/div[1]/div/div[2]/div[2]/div[1]/div[2]/div/div[2]/div[2]/div/div/div[1]"
-    driver.find_element(By.XPATH, row_xpath).click()
-    time.sleep(2)
-    fill_strain_form(driver, strain, editing=True)
-    save_button = WebDriverWait(driver, 10).until(
-        EC.element_to_be_clickable((By.XPATH, "/html/body/div[1]/div/div[2]/div[2]/div[1]/div/div/button"))
-    )
-    save_button.click()
+
+def edit_strain(driver, strain, row=1, timeout=10):
+    """
+    Open result `row` (1-based) of an open Strains search and set it to
+    `strain`. Returns False if every field already matched (nothing saved).
+    """
+    driver.find_element(By.XPATH, f"({ROWS_XPATH})[{row}]").click()
+    find(driver, "strain.name", timeout)
+    if not fill_strain_form(driver, strain, editing=True, timeout=timeout):
+        print(f"[Strain] Unchanged: {strain}")
+        return False
+    _save(driver, timeout)
     print(f"[Strain] Edited: {strain}")
+    return True
+
+
+def create_or_edit_strain(driver, strain_name: str, timeout=10):
+    """
+    Make sure `strain_name` exists in Dutchie with name, description and
+    abbreviation all set to it. Returns 'added', 'edited' or 'unchanged'.
+    """
+    rows = search_strains(driver, strain_name, timeout)
+    row = next((i for i, r in enumerate(rows, start=1)
+                if r["name"].lower() == strain_name.lower()), None)
+    if row is None:
+        print(f"Strain '{strain_name}' not found. Creating...")
+        add_strain(driver, strain_name, timeout)
+        return "added"
+    if rows[row - 1] == {"name": strain_name, "abbreviation": strain_name}:
+        return "unchanged"
+    print(f"Strain '{strain_name}' exists. Editing...")
+    return "edited" if edit_strain(driver, strain_name, row, timeout) else "unchanged"
+
+
+def sync_strains(driver, db=None, timeout=15):
+    """
+    Page through the Strains list into the local strains table (through the
+    `db` ConnectionManager's writer), dropping strains no longer listed.
+    Returns {'pages', 'seen', 'changed', 'removed'}.
+    """
+    db = db or get_manager()
+    started = datetime.now().isoformat(timespec="seconds")
+    stats = {"pages": 0, "seen": 0, "changed": 0, "removed": 0}
+    def first_page():
+        open_strains_page(driver, timeout)
+        wait_for_results(driver, ROWS_XPATH, timeout)
+
+    retry(first_page, label="strains: load page")
+    while True:
+        rows = [r for r in read_grid(driver, ROWS_XPATH, STRAIN_COLUMNS) if r["name"]]
+        stats["pages"] += 1
+        stats["seen"] += len(rows)
+        stats["changed"] += db.write(strain_cache.upsert_strains, rows, started).result()
+
+        buttons = driver.find_elements(By.XPATH, NEXT_PAGE_XPATH)
+        if not buttons or not buttons[0].is_enabled() \
+                or buttons[0].get_attribute("aria-disabled") == "true":
+            break
+        buttons[0].click()
+        wait_for_results(driver, ROWS_XPATH, timeout)
+
+    stats["removed"] = db.write(strain_cache.delete_not_synced_since, started).result()
+    print(f"[Strains] Synced {stats['seen']} strains over {stats['pages']} pages "
+          f"({stats['changed']} new/changed, {stats['removed']} removed)")
+    return stats
+
+
+def upsert_strains(driver, db, names, timeout=10):
+    """
+    Create or fix every strain in `names` that the local strains table says
+    is missing or different; the rest are skipped without opening the
+    browser. `db` is the ConnectionManager (None for the shared one).
+    Returns {'requested', 'skipped', 'added', 'edited', 'unchanged', 'failed'}.
+    """
+    db = db or get_manager()
+    todo = strain_cache.diff_strains(db.reader(), names)
+    requested = len({(n or "").strip().lower() for n in names} - {""})
+    stats = {"requested": requested, "skipped": requested - len(todo),
+             "added": 0, "edited": 0, "unchanged": 0, "failed": 0}
+    print(f"[Strains] {len(todo)} of {requested} strains need checking")
+    timer = StepTimer("Strain Upsert", trace="strain_upsert", driver=driver)
+    for name in todo:
+        try:
+            with timer.step(name, span="strain") as step:
+                # Safe to repeat: each attempt searches first, so a strain
+                # saved by a failed attempt is found rather than re-added
+                result = retry(create_or_edit_strain, driver, name, timeout,
+                               on_retry=lambda e: open_strains_page(driver, timeout),
+                               label=f"strain {name}")
+                step.set(result=result)
+        except WebDriverException as e:
+            print(f"[Strain] Failed: {name}: {e}")
+            stats["failed"] += 1
+            continue
+        stats[result] += 1
+        db.write(strain_cache.upsert_strains, [{"name": name, "abbreviation": name}]).result()
+    timer.report()
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sync or upsert Dutchie strains.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("sync", help="Mirror the Strains page into the local table")
+    p = sub.add_parser("upsert", help="Create or fix the given strains")
+    p.add_argument("names", nargs="+")
+    args = parser.parse_args()
+
+    with dutchie_session() as driver:
+        if not driver:
+            print("Login failed.")
+            return
+        if args.command == "sync":
+            print(sync_strains(driver))
+        else:
+            print(upsert_strains(driver, None, args.names))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,13 @@
+# automation/urls.py
+"""
+Dutchie Backoffice URLs. Set DUTCHIE_BASE_URL to point the automation at
+another host, e.g. the local stand-in from benchmarks/fake_backoffice.
+"""
+import os
+
+BASE_URL = os.getenv("DUTCHIE_BASE_URL", "https://peak.backoffice.dutchie.com").rstrip("/")
+
+
+def url(path):
+    """Absolute URL of a backoffice path such as "/products/catalog"."""
+    return BASE_URL + path
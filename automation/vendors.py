@@ -2,24 +2,23 @@
 """
 Search and create vendors in Dutchie Backoffice.
 """
-import time
-from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.common.keys import Keys
-from automation.login import login_to_dutchie
+from selenium.common.exceptions import StaleElementReferenceException
+from automation import http_backend
+from automation.grid import read_grid
+from automation.locators import find, present, retry
+from automation.session import dutchie_session
+from automation.urls import url
+from automation.waits import StepTimer, wait_for_page_ready, wait_for_results
 
-VENDOR_PAGE_URL = "https://peak.backoffice.dutchie.com/products/vendors"
+VENDOR_PAGE_URL = url("/products/vendors")
 
-# XPaths
-HEADER_XPATH = "/html/body/div[1]/div/div[2]/div[2]/div[1]/header/div[1]/div/h1"
-SEARCH_INPUT_XPATH = "/html/body/div[1]/div/div[2]/div[2]/div[1]/div[1]/div/div[1]/div/input"
+# XPaths (the add-vendor form's fields live in automation/locators.py)
 ROWS_BASE_XPATH = "/html/body/div[1]/div/div[2]/div[2]/div[1]/div[2]/div/div[2]/div[2]/div/div/div[1]"
-ADD_BUTTON_XPATH = "/html/body/div[1]/div/div[2]/div[2]/div[1]/header/div[2]/button[2]"
-ADD_HEADER_XPATH = "/html/body/div[1]/div/div[2]/div[2]/div[1]/div[1]/div/h1"
-NEW_NAME_XPATH = "/html/body/div[1]/div/div[2]/div[2]/div[1]/div[2]/div/div[1]/div/div/input"
-NEW_LICENSE_XPATH = "/html/body/div[1]/div/div[2]/div[2]/div[1]/div[2]/div/div[2]/div/div/input"
-SAVE_BUTTON_XPATH = "/html/body/div[1]/div/div[2]/div[2]/div[1]/div[2]/button"
+
+# Zero-based cell index of each field in a vendor row
+VENDOR_COLUMNS = {"name": 0, "license": 1}
 
 
 def search_vendor(driver, vendor_name, timeout=15):
@@ -27,89 +26,93 @@ def search_vendor(driver, vendor_name, timeout=15):
     Search the vendor table for rows matching `vendor_name`.
     Returns a list of dicts: {'name': ..., 'license': ...}.
     """
-    driver.get(VENDOR_PAGE_URL)
-    # Wait for page header
-    WebDriverWait(driver, timeout).until(
-        EC.text_to_be_present_in_element((By.XPATH, HEADER_XPATH), "Vendors")
-    )
-    time.sleep(1)
+    timer = StepTimer(f"Vendor Search {vendor_name!r}", trace="vendor_search", driver=driver)
+    with timer.step("load vendors page"):
+        driver.get(VENDOR_PAGE_URL)
+        # Wait for page header
+        header = find(driver, "page.header", timeout)
+        WebDriverWait(driver, timeout).until(lambda d: "Vendors" in header.text)
 
     # Enter search
-    search_input = WebDriverWait(driver, timeout).until(
-        EC.presence_of_element_located((By.XPATH, SEARCH_INPUT_XPATH))
-    )
-    search_input.clear()
-    search_input.send_keys(vendor_name)
-    search_input.send_keys(Keys.ENTER)
-    time.sleep(2)
+    with timer.step("search"):
+        search_input = find(driver, "list.search_input", timeout)
+        search_input.clear()
+        search_input.send_keys(vendor_name)
+        search_input.send_keys(Keys.ENTER)
+        wait_for_results(driver, ROWS_BASE_XPATH + "/div", timeout)
 
     # Collect rows
-    rows = driver.find_elements(By.XPATH, ROWS_BASE_XPATH + "/div")
-    results = []
-    for idx in range(1, len(rows) + 1):
-        row_xpath = f"{ROWS_BASE_XPATH}/div[{idx}]"
-        try:
-            name = driver.find_element(By.XPATH, row_xpath + "/div[1]/div").text.strip()
-        except:
-            name = ""
-        try:
-            license_num = driver.find_element(By.XPATH, row_xpath + "/div[2]/div").text.strip()
-        except:
-            license_num = ""
-        results.append({'name': name, 'license': license_num})
+    with timer.step("read rows"):
+        results = read_grid(driver, ROWS_BASE_XPATH + "/div", VENDOR_COLUMNS)
+    timer.report()
     return results
 
 
+def _wait_for_header(driver, locator, text, timeout):
+    """Wait for `text` in the header `locator` names (re-found on each poll)."""
+    def shown(d):
+        header = present(d, locator)
+        return header is not None and text in header.text
+    WebDriverWait(driver, timeout, ignored_exceptions=(StaleElementReferenceException,)).until(shown)
+
+
 def create_vendor(driver, vendor_name, license_number, timeout=15):
     """
-    Create a new vendor with the given name and license number.
+    Create a new vendor with the given name and license number. Opening and
+    filling the form are retried on stale elements and timeouts; the save
+    click is not, since a second one could create a duplicate.
     """
-    # Navigate and click Add Vendor
-    driver.get(VENDOR_PAGE_URL)
-    WebDriverWait(driver, timeout).until(
-        EC.element_to_be_clickable((By.XPATH, ADD_BUTTON_XPATH))
-    ).click()
-    # Wait for 'Add vendor' header
-    WebDriverWait(driver, timeout).until(
-        EC.text_to_be_present_in_element((By.XPATH, ADD_HEADER_XPATH), "Add vendor")
-    )
-    time.sleep(1)
-
-    # Fill form
-    name_input = driver.find_element(By.XPATH, NEW_NAME_XPATH)
-    license_input = driver.find_element(By.XPATH, NEW_LICENSE_XPATH)
-    name_input.clear()
-    name_input.send_keys(vendor_name)
-    license_input.clear()
-    license_input.send_keys(license_number)
-    time.sleep(2)
-
-    # Save
-    save_btn = driver.find_element(By.XPATH, SAVE_BUTTON_XPATH)
-    save_btn.click()
-    # Wait for redirect back to vendor page
-    time.sleep(3)
-    WebDriverWait(driver, timeout).until(
-        EC.text_to_be_present_in_element((By.XPATH, HEADER_XPATH), "Vendors")
-    )
+    def open_form():
+        driver.get(VENDOR_PAGE_URL)
+        find(driver, "list.add_button", timeout, clickable=True).click()
+        _wait_for_header(driver, "vendor.header", "Add vendor", timeout)
+
+    def fill_form():
+        for name, value in (("vendor.name", vendor_name), ("vendor.license", license_number)):
+            field = find(driver, name, timeout, clickable=True)
+            field.clear()
+            field.send_keys(value)
+
+    def save():
+        find(driver, "vendor.save", timeout, clickable=True).click()
+        # Wait for redirect back to vendor page
+        wait_for_page_ready(driver, timeout)
+        _wait_for_header(driver, "page.header", "Vendors", timeout)
+
+    retry(open_form, label=f"{vendor_name}: open form")
+    retry(fill_form, label=f"{vendor_name}: fill form")
+    save()
     print(f"[Vendors] Created: {vendor_name} ({license_number})")
 
 
+def _find_vendor(results, vendor_name):
+    matches = [v for v in results if v['name'].lower() == vendor_name.lower()]
+    if matches:
+        print(f"[Vendors] Found existing: {matches}")
+        return {'name': matches[0]['name'], 'license': matches[0]['license'], 'created': False}
+    return None
+
+
 def upsert_vendor(vendor_name, license_number):
     """
-    Log in, search for vendor_name, create if not found.
+    Search for vendor_name (over HTTP when INTAKE_READ_BACKEND=http), and
+    borrow a logged-in driver to create it if not found.
+    Returns {'name', 'license', 'created'}, or None if login failed.
     """
-    driver = login_to_dutchie()
-    if not driver:
-        print("[Vendors] Login failed.")
-        return
-    existing = search_vendor(driver, vendor_name)
-    matches = [v for v in existing if v['name'].lower() == vendor_name.lower()]
-    if matches:
-        print(f"[Vendors] Found existing: {matches}")
-    else:
+    if http_backend.enabled():
+        found = _find_vendor(http_backend.search_vendor(None, vendor_name), vendor_name)
+        if found:
+            return found
+    with dutchie_session() as driver:
+        if not driver:
+            print("[Vendors] Login failed.")
+            return None
+        if not http_backend.enabled():
+            found = _find_vendor(retry(search_vendor, driver, vendor_name), vendor_name)
+            if found:
+                return found
         create_vendor(driver, vendor_name, license_number)
-    driver.quit()
+        return {'name': vendor_name, 'license': license_number, 'created': True}
 
 
 if __name__ == "__main__":
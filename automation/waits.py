@@ -0,0 +1,178 @@
+# automation/waits.py
+"""
+Condition-based waits and per-step timing shared by the automation flows.
+
+Use these instead of fixed ``time.sleep`` calls: each helper returns as soon
+as the page reaches the state the next step needs.
+"""
+import os
+import time
+from contextlib import contextmanager
+import tracing
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import StaleElementReferenceException
+
+DEFAULT_TIMEOUT = float(os.getenv("INTAKE_WAIT_TIMEOUT", "15"))
+POLL_INTERVAL = 0.1
+# How long the page must stay quiet to count as idle/stable (seconds)
+SETTLE_TIME = float(os.getenv("INTAKE_WAIT_SETTLE", "0.3"))
+# Print a per-step report at the end of each flow
+REPORT_TIMINGS = os.getenv("INTAKE_TIMING", "0") == "1"
+
+# Loading indicators used by the backoffice (MUI progress + skeleton rows)
+SPINNER_CSS = "[role='progressbar'], .MuiCircularProgress-root, .MuiSkeleton-root"
+
+# Counts in-flight fetch/XHR requests; installed once per page load.
+NETWORK_STATE_JS = """
+if (!window.__intakePending) {
+    window.__intakePending = {count: 0};
+    const pending = window.__intakePending;
+    const origFetch = window.fetch;
+    if (origFetch) {
+        window.fetch = function() {
+            pending.count++;
+            return origFetch.apply(this, arguments).finally(() => pending.count--);
+        };
+    }
+    const origSend = XMLHttpRequest.prototype.send;
+    XMLHttpRequest.prototype.send = function() {
+        pending.count++;
+        this.addEventListener('loadend', () => pending.count--);
+        return origSend.apply(this, arguments);
+    };
+}
+return [
+    document.readyState,
+    window.__intakePending.count,
+    performance.getEntriesByType('resource').length
+];
+"""
+
+SPINNER_VISIBLE_JS = """
+return Array.from(document.querySelectorAll(arguments[0]))
+    .some(el => el.offsetParent !== null);
+"""
+
+
+def _wait(driver, timeout):
+    return WebDriverWait(
+        driver, timeout, POLL_INTERVAL,
+        ignored_exceptions=(StaleElementReferenceException,),
+    )
+
+
+def wait_for_network_idle(driver, timeout=DEFAULT_TIMEOUT, settle=SETTLE_TIME):
+    """Wait until the document is loaded and no requests ran for `settle` seconds."""
+    state = {"last": None, "since": time.monotonic()}
+
+    def idle(d):
+        ready, pending, resources = d.execute_script(NETWORK_STATE_JS)
+        now = time.monotonic()
+        snapshot = (ready, pending, resources)
+        if snapshot != state["last"]:
+            state["last"], state["since"] = snapshot, now
+            return False
+        return ready == "complete" and pending == 0 and now - state["since"] >= settle
+
+    _wait(driver, timeout).until(idle)
+
+
+def wait_for_spinner_gone(driver, timeout=DEFAULT_TIMEOUT):
+    """Wait until no loading indicator is visible."""
+    _wait(driver, timeout).until_not(
+        lambda d: d.execute_script(SPINNER_VISIBLE_JS, SPINNER_CSS)
+    )
+
+
+def wait_for_page_ready(driver, timeout=DEFAULT_TIMEOUT):
+    """Network idle and no spinner: the page has finished what it was doing."""
+    wait_for_network_idle(driver, timeout)
+    wait_for_spinner_gone(driver, timeout)
+
+
+def wait_for_row_count_stable(driver, rows_xpath, timeout=DEFAULT_TIMEOUT,
+                              settle=SETTLE_TIME, allow_empty=True):
+    """
+    Wait until the number of rows matching `rows_xpath` stops changing.
+    Returns the final row count.
+    """
+    state = {"count": None, "since": time.monotonic()}
+
+    def stable(d):
+        count = len(d.find_elements(By.XPATH, rows_xpath))
+        now = time.monotonic()
+        if count != state["count"]:
+            state["count"], state["since"] = count, now
+            return False
+        if count == 0 and not allow_empty:
+            return False
+        return now - state["since"] >= settle
+
+    _wait(driver, timeout).until(stable)
+    return state["count"]
+
+
+def wait_for_results(driver, rows_xpath, timeout=DEFAULT_TIMEOUT, allow_empty=True):
+    """After submitting a search: wait for the request, the spinner and the rows."""
+    wait_for_page_ready(driver, timeout)
+    return wait_for_row_count_stable(driver, rows_xpath, timeout, allow_empty=allow_empty)
+
+
+def wait_for_clickable(driver, xpath, timeout=DEFAULT_TIMEOUT):
+    return _wait(driver, timeout).until(EC.element_to_be_clickable((By.XPATH, xpath)))
+
+
+def wait_for_present(driver, xpath, timeout=DEFAULT_TIMEOUT):
+    return _wait(driver, timeout).until(EC.presence_of_element_located((By.XPATH, xpath)))
+
+
+def wait_for_gone(driver, xpath, timeout=DEFAULT_TIMEOUT):
+    """Wait until the element is hidden or removed (e.g. a closed dropdown menu)."""
+    _wait(driver, timeout).until(EC.invisibility_of_element_located((By.XPATH, xpath)))
+
+
+class StepTimer:
+    """
+    Record how long each named step of a flow takes. Every step is also a
+    tracing span named "<trace>.<step>" carrying the page URL of `driver`.
+    """
+
+    def __init__(self, flow, trace=None, driver=None):
+        self.flow = flow
+        self.trace = trace or "_".join(flow.lower().split())
+        self.driver = driver
+        self.steps = []  # (name, seconds)
+
+    @contextmanager
+    def step(self, name, span=None):
+        """Time one step; `span` names its trace span when `name` varies per call."""
+        start = time.perf_counter()
+        with tracing.span(f"{self.trace}.{span or name}") as s:
+            if span:
+                s.set(step=name)
+            try:
+                yield s
+            finally:
+                self.steps.append((name, time.perf_counter() - start))
+                if self.driver is not None:
+                    try:
+                        s.set(url=self.driver.current_url)
+                    except Exception:
+                        pass
+
+    @property
+    def total(self):
+        return sum(seconds for _, seconds in self.steps)
+
+    def format_report(self):
+        lines = [f"[Timing] {self.flow}: {self.total:.2f}s total"]
+        for name, seconds in self.steps:
+            lines.append(f"  {name:<28} {seconds:7.2f}s")
+        return "\n".join(lines)
+
+    def report(self, force=False):
+        """Print the per-step report if INTAKE_TIMING=1 (or `force`)."""
+        if REPORT_TIMINGS or force:
+            print(self.format_report())
@@ -0,0 +1,46 @@
+# ── intake-manager/benchmarks/bench_driver_profiles.py ───────────────
+"""
+Time Chrome start-up and page-ready for each driver factory profile.
+
+Run from the project root (needs Chrome and network access to the URL):
+    python -m benchmarks.bench_driver_profiles [url] [repeats]
+"""
+import sys
+import time
+
+from automation.driver_factory import PROFILES, create_driver
+from automation.login import HOME_URL
+from automation.waits import wait_for_page_ready
+
+
+def time_profile(profile, url, repeats):
+    """Best (launch, dom-ready, page-ready) seconds over `repeats` runs."""
+    best = [float("inf")] * 3
+    for _ in range(repeats):
+        start = time.perf_counter()
+        driver = create_driver(profile, user_data_dir=None)
+        launched = time.perf_counter()
+        try:
+            driver.get(url)
+            dom_ready = time.perf_counter()
+            wait_for_page_ready(driver, 60)
+            page_ready = time.perf_counter()
+        finally:
+            driver.quit()
+        run = (launched - start, dom_ready - launched, page_ready - launched)
+        best = [min(b, r) for b, r in zip(best, run)]
+    return best
+
+
+def main():
+    url = sys.argv[1] if len(sys.argv) > 1 else HOME_URL
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    print(f"{url} (best of {repeats})")
+    print(f"{'profile':<10} {'launch s':>9} {'get() s':>9} {'ready s':>9}")
+    for profile in PROFILES:
+        launch, dom, ready = time_profile(profile, url, repeats)
+        print(f"{profile:<10} {launch:>9.2f} {dom:>9.2f} {ready:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
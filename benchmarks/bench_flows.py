@@ -0,0 +1,228 @@
+# ── intake-manager/benchmarks/bench_flows.py ─────────────────────────
+"""
+Time the Selenium flows end to end against the local fake backoffice and
+flag regressions against a saved baseline.
+
+Needs Chrome; no network or Dutchie account. Run from the project root:
+    python -m benchmarks.bench_flows [--repeats 5] [--latency 50] [--json out.json]
+    python -m benchmarks.bench_flows --baseline base.json [--threshold 0.25]
+
+Each flow is also checked for the right result (rows scraped, product
+saved, ...), so a "fast" run that silently broke a flow fails too. The
+*_http flows repeat the reads through automation/http_backend.py.
+catalog_search_async runs ten searches at once in tabs of one browser
+through automation/async_engine.py (needs Playwright; skipped by default
+when it is not installed).
+The exit status is 1 on a failed check or a median slower than
+baseline * (1 + threshold). tests/test_flow_benchmarks.py runs the same
+flows under pytest-benchmark.
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+from contextlib import contextmanager
+
+from benchmarks.fake_backoffice.server import Store, serve
+
+# Manifest fields the scrape returns
+MANIFEST_FIELDS = ("name", "qty", "unit", "cost", "rec")
+FLOWS = ("login", "receive_scrape", "catalog_search", "vendor_search", "add_product",
+         "receive_scrape_http", "catalog_search_http", "catalog_search_async")
+# Flows needing Playwright
+ASYNC_FLOWS = ("catalog_search_async",)
+
+
+def default_flows():
+    try:
+        import playwright  # noqa: F401
+    except ImportError:
+        return [name for name in FLOWS if name not in ASYNC_FLOWS]
+    return list(FLOWS)
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, round(pct / 100 * (len(ordered) - 1)))]
+
+
+@contextmanager
+def fake_backoffice(latency_ms=0, profile="headless"):
+    """Serve a fresh Store and point the automation at it; yields (store, base_url)."""
+    store = Store()
+    server, base_url = serve(latency_ms=latency_ms, store=store)
+    os.environ["DUTCHIE_BASE_URL"] = base_url
+    os.environ["INTAKE_BROWSER_PROFILE"] = profile
+    os.environ.pop("INTAKE_CHROME_PROFILE_DIR", None)
+    os.environ.setdefault("USERNAME", "bench@example.com")
+    os.environ.setdefault("PASSWORD", "bench")
+    try:
+        yield store, base_url
+    finally:
+        from automation.session import get_pool
+        get_pool().close()
+        server.shutdown()
+
+
+def build_flows(store):
+    """{name: callable(run_number)}; each raises AssertionError on a wrong result."""
+    # automation/ reads DUTCHIE_BASE_URL at import time, so import it late
+    from automation import http_backend
+    from automation.add_product import add_cannabis_flower_product
+    from automation.async_engine import AsyncEngine
+    from automation.catalog_search import search_catalog
+    from automation.login import is_logged_in, login_to_dutchie
+    from automation.receive_inventory import scrape_receive_inventory
+    from automation.session import dutchie_session
+    from automation.vendors import search_vendor
+    from data.database import init_db
+
+    conn = init_db(":memory:")
+    strain = store.strains[0]["name"]
+    vendor = store.vendors[0]["name"]
+    term = strain.split()[0]
+
+    def catalog_row(p):
+        """A server product as search_catalog returns it."""
+        return {"product_name": p["name"], "category": p["category"], "vendor": p["vendor"],
+                "rec_price": p["price"], "strain_name": p["strain"], "cost": p["cost"]}
+
+    def login(run):
+        with dutchie_session() as driver:
+            driver.delete_all_cookies()
+            assert login_to_dutchie(driver) is driver and is_logged_in(driver), "login failed"
+
+    def receive_scrape(run):
+        results = scrape_receive_inventory() or {}
+        expected = {title: [{f: r[f] for f in MANIFEST_FIELDS} for r in rows]
+                    for title, rows in store.manifests.items()}
+        assert results == expected, "scraped manifests differ from the server's"
+
+    def catalog_search(run):
+        results = search_catalog(term, conn=conn, force=True)
+        expected = [catalog_row(p) for p in store.search("catalog", term)[:50]]
+        assert results == expected, f"{len(results)} catalog rows differ from the server's {len(expected)}"
+
+    def vendor_search(run):
+        with dutchie_session() as driver:
+            results = search_vendor(driver, vendor)
+        assert any(v["name"] == vendor for v in results), f"vendor {vendor!r} not found"
+
+    def add_product(run):
+        name = f"Bench Product {run} {time.time_ns()}"
+        with dutchie_session() as driver:
+            add_cannabis_flower_product(driver, name, "25", "10", strain, vendor)
+        saved = next((p for p in store.created if p.get("name") == name), None)
+        assert saved, f"{name!r} was not saved"
+        assert saved["category"] == "Cannabis Flower" and saved["strain"] and saved["vendor"], \
+            f"{name!r} saved with {saved}"
+
+    def over_http(flow):
+        """`flow` with its reads routed through the HTTP backend."""
+        def run_http(run):
+            http_backend.READ_BACKEND = "http"
+            try:
+                flow(run)
+            finally:
+                http_backend.READ_BACKEND = "selenium"
+        return run_http
+
+    def catalog_search_all(run):
+        # The HTTP backend returns every match, not just the first grid page
+        results = search_catalog(term, conn=conn, force=True)
+        expected = [catalog_row(p) for p in store.search("catalog", term)]
+        assert results == expected, f"{len(results)} catalog rows differ from the server's {len(expected)}"
+
+    def catalog_search_async(run):
+        terms = sorted({s["name"].split()[0] for s in store.strains})[:10]
+
+        async def search_all():
+            async with AsyncEngine() as engine:
+                return await asyncio.gather(*(engine.search_catalog(t) for t in terms))
+
+        for t, results in zip(terms, asyncio.run(search_all())):
+            expected = [catalog_row(p) for p in store.search("catalog", t)[:50]]
+            assert results == expected, f"{t!r}: {len(results)} catalog rows differ from the server's"
+
+    return {"catalog_search_async": catalog_search_async,
+            "receive_scrape_http": over_http(receive_scrape),
+            "catalog_search_http": over_http(catalog_search_all),
+            "login": login, "receive_scrape": receive_scrape, "catalog_search": catalog_search,
+            "vendor_search": vendor_search, "add_product": add_product}
+
+
+def run(flows, names, repeats):
+    """{flow: {'runs', 'min', 'median', 'p95'}} in seconds, or {'error'} for a failed flow."""
+    results = {}
+    for name in names:
+        times = []
+        try:
+            for n in range(repeats):
+                start = time.perf_counter()
+                flows[name](n)
+                times.append(time.perf_counter() - start)
+        except Exception as e:
+            results[name] = {"error": f"{type(e).__name__}: {e}"}
+            continue
+        results[name] = {
+            "runs": repeats, "min": min(times),
+            "median": statistics.median(times), "p95": percentile(times, 95),
+        }
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Messages for every failed flow and every median over the baseline."""
+    problems = []
+    for name, result in results.items():
+        if "error" in result:
+            problems.append(f"{name}: {result['error']}")
+            continue
+        base = baseline.get(name, {}).get("median")
+        if base and result["median"] > base * (1 + threshold):
+            problems.append(f"{name}: median {result['median']:.2f}s vs baseline {base:.2f}s "
+                            f"(+{result['median'] / base - 1:.0%})")
+    return problems
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the automation flows on a fake backoffice.")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0, help="Milliseconds added to each API call")
+    parser.add_argument("--flows", nargs="+", choices=FLOWS, default=default_flows())
+    parser.add_argument("--profile", default="headless", help="Driver factory profile")
+    parser.add_argument("--json", help="Write the results to this file (usable as a baseline)")
+    parser.add_argument("--baseline", help="Results file from an earlier run to compare against")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="Allowed slowdown over the baseline median (0.25 = 25%%)")
+    args = parser.parse_args(argv)
+
+    with fake_backoffice(args.latency, args.profile) as (store, base_url):
+        results = run(build_flows(store), args.flows, args.repeats)
+
+    print(f"{base_url} ({args.profile}, {args.repeats} runs, +{args.latency:g} ms/request)")
+    print(f"{'flow':<21} {'min s':>8} {'median s':>9} {'p95 s':>8}")
+    for name, r in results.items():
+        if "error" in r:
+            print(f"{name:<21} FAILED {r['error']}")
+        else:
+            print(f"{name:<21} {r['min']:>8.2f} {r['median']:>9.2f} {r['p95']:>8.2f}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+    problems = compare(results, baseline, args.threshold)
+    for problem in problems:
+        print(f"[Regression] {problem}")
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,123 @@
+# ── intake-manager/benchmarks/bench_pricing.py ───────────────────────
+"""
+Compare a per-row pricing loop against the column-wise engine in
+data/pricing.py, then time a full repricing of master_product.
+
+Run from the project root:
+    python -m benchmarks.bench_pricing
+"""
+import math
+import random
+import time
+
+from data.database import init_db
+from data.pricing import add_rule, apply_repricing, load_rules, parse_grams, price_items, reprice
+
+CATALOG_SIZE = 100000
+SIZES = (1000, 10000, 100000)
+REPEATS = 3
+VENDORS = [f"Vendor {i}" for i in range(40)]
+CATEGORIES = ("Flower", "Pre-Roll", "Vape", "Edible", "Concentrate")
+ROOMS = ("Sales Floor", "Vault")
+WEIGHTS = ("1g", "3.5g", "7g", "14 g", "1oz", "1/8", "")
+
+
+def build_db():
+    """In-memory database with a synthetic master_product and a rule set."""
+    conn = init_db(":memory:")
+    rng = random.Random(0)
+    conn.executemany(
+        """
+        INSERT INTO master_product
+            (metrc_name, catalog_name, cost, retail, room, dutchie_vendor, category, strain_name)
+        VALUES (?, ?, ?, ?, ?, ?, ?, '')
+        """,
+        (
+            (f"METRC Product {i}", f"Catalog Product {i} {rng.choice(WEIGHTS)}".strip(),
+             round(rng.uniform(1, 60), 2), round(rng.uniform(2, 120), 2), rng.choice(ROOMS),
+             rng.choice(VENDORS), rng.choice(CATEGORIES))
+            for i in range(CATALOG_SIZE)
+        ),
+    )
+    conn.commit()
+    add_rule(conn, 2.0)
+    add_rule(conn, 2.2, category="Flower", round_to=1)
+    add_rule(conn, 1.9, category="Flower", min_grams=14, round_to=5)
+    add_rule(conn, 1.8, category="Vape", room="Vault", round_to=0.5)
+    for vendor in VENDORS[:10]:
+        add_rule(conn, 2.4, dutchie_vendor=vendor, category="Edible", round_to=0.25)
+    return conn
+
+
+def price_per_row(rules, costs, names, vendors, categories, rooms):
+    """The straightforward loop: score every rule against every row."""
+    retail = []
+    for cost, name, vendor, category, room in zip(costs, names, vendors, categories, rooms):
+        grams = parse_grams(name)
+        best, best_score = None, -1
+        for rule in rules:
+            score = 0
+            ok = True
+            for rule_value, value in ((rule["dutchie_vendor"], vendor),
+                                      (rule["category"], category), (rule["room"], room)):
+                if rule_value:
+                    ok = ok and (value or "").lower() == rule_value.lower()
+                    score += 1
+            if rule["min_grams"] is not None or rule["max_grams"] is not None:
+                score += 1
+                ok = ok and not (rule["min_grams"] is not None and not grams >= rule["min_grams"])
+                ok = ok and not (rule["max_grams"] is not None and not grams < rule["max_grams"])
+            if ok and score >= best_score:
+                best, best_score = rule, score
+        if best is None or not cost or cost <= 0:
+            retail.append(math.nan)
+            continue
+        steps = math.ceil(round(cost * best["markup"] / best["round_to"], 6))
+        retail.append(round(steps * best["round_to"], 2))
+    return retail
+
+
+def best_of(func, *args):
+    best = float("inf")
+    for _ in range(REPEATS):
+        parse_grams.cache_clear()
+        start = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    conn = build_db()
+    rules = load_rules(conn)
+    rows = conn.execute(
+        "SELECT cost, COALESCE(NULLIF(catalog_name, ''), metrc_name), dutchie_vendor,"
+        " category, room FROM master_product"
+    ).fetchall()
+    costs, names, vendors, categories, rooms = (list(c) for c in zip(*rows))
+
+    print(f"{len(rules)} rules")
+    print(f"{'items':>8} {'per-row ms':>12} {'columns ms':>12} {'speedup':>8}")
+    for size in SIZES:
+        columns = [c[:size] for c in (costs, names, vendors, categories, rooms)]
+        expected = price_per_row(rules, *columns)
+        retail, _ = price_items(rules, *columns)
+        assert all(a == b or (math.isnan(a) and math.isnan(b))
+                   for a, b in zip(expected, retail.tolist())), "engines disagree"
+        per_row = best_of(price_per_row, rules, *columns)
+        vectorized = best_of(price_items, rules, *columns)
+        print(f"{size:>8} {per_row * 1000:>12.2f} {vectorized * 1000:>12.2f} "
+              f"{per_row / vectorized:>7.1f}x")
+
+    preview = best_of(reprice, conn)
+    repricing = reprice(conn)
+    start = time.perf_counter()
+    updated = apply_repricing(conn, repricing)
+    applied = time.perf_counter() - start
+    print(f"reprice {CATALOG_SIZE} products: preview {preview * 1000:.0f} ms "
+          f"({len(repricing)} changes), apply {applied * 1000:.0f} ms ({updated} rows)")
+    assert not len(reprice(conn)), "prices changed again after applying"
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+# ── intake-manager/benchmarks/bench_resolver.py ──────────────────────
+"""
+Compare per-row master_product lookups against the batched resolver.
+
+Run from the project root:
+    python -m benchmarks.bench_resolver
+"""
+import random
+import time
+
+from data.database import init_db
+from data.resolver import resolve_products, default_product
+
+CATALOG_SIZE = 20000
+SIZES = (100, 1000, 10000)
+REPEATS = 5
+
+
+def build_db():
+    """In-memory database with a synthetic master_product."""
+    conn = init_db(":memory:")
+    conn.executemany(
+        """
+        INSERT INTO master_product
+            (metrc_name, catalog_name, cost, retail, room, dutchie_vendor, strain_name)
+        VALUES (?, ?, ?, ?, 'Sales Floor', ?, '')
+        """,
+        (
+            (f"METRC Product {i}", f"Catalog Product {i}", 1.5, 5.0, f"Vendor {i % 50}")
+            for i in range(CATALOG_SIZE)
+        ),
+    )
+    conn.commit()
+    return conn
+
+
+def resolve_per_row(conn, metrc_names):
+    """The original on_load path: one query per manifest row."""
+    cur = conn.cursor()
+    results = []
+    for metrc_name in metrc_names:
+        cur.execute(
+            "SELECT catalog_name, cost, retail, room, strain_name FROM master_product WHERE metrc_name = ?",
+            (metrc_name,)
+        )
+        prod = cur.fetchone()
+        results.append(prod if prod else default_product(metrc_name))
+    return results
+
+
+def best_of(func, *args):
+    best = float("inf")
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    conn = build_db()
+    rng = random.Random(0)
+    print(f"{'items':>8} {'per-row ms':>12} {'batched ms':>12} {'speedup':>8}")
+    for size in SIZES:
+        # Roughly 80% known products, 20% misses
+        names = [
+            f"METRC Product {rng.randrange(CATALOG_SIZE)}" if rng.random() < 0.8
+            else f"Unknown Product {i}"
+            for i in range(size)
+        ]
+        per_row = best_of(resolve_per_row, conn, names)
+        batched = best_of(resolve_products, conn, names)
+        print(f"{size:>8} {per_row * 1000:>12.2f} {batched * 1000:>12.2f} {per_row / batched:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,425 @@
+# ── intake-manager/benchmarks/fake_backoffice/server.py ──────────────
+"""
+Local stand-in for the Dutchie Backoffice, for benchmarks without network.
+
+Pages are rendered as static HTML with the same element nesting the
+absolute XPaths in automation/ expect (login, catalog, vendors, strains,
+receive inventory and the new product form); static/app.js adds the
+dropdowns, searches and saves, fetching data from a small JSON/HTML API.
+Data is synthetic and generated from a fixed seed.
+
+Run standalone, then point the automation at it:
+    python -m benchmarks.fake_backoffice.server [--port 8765] [--latency 50]
+    DUTCHIE_BASE_URL=http://127.0.0.1:8765 python -m automation.catalog_search Kush
+"""
+import argparse
+import html
+import json
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static")
+SESSION_COOKIE = "fake_session"
+PAGE_SIZE = 50
+
+CATEGORIES = ["Accessories", "Cannabis Flower", "Edibles", "Pre-Rolls", "Vapes"]
+EXTERNAL_CATEGORIES = ["Buds", "Buds by Strain", "Shake", "Smalls"]
+TYPES = ["Quantity", "Weight"]
+UNITS = ["Gram", "Ounce", "Each"]
+PRICING_TIERS = ["None", "Flower Tier A", "Flower Tier B", "Flower Tier C"]
+_WORDS = ["Blue", "Dream", "Kush", "Haze", "Bruce", "Banner", "Gelato", "Runtz", "Sour",
+          "Diesel", "Wedding", "Cake", "Zkittlez", "Cookies", "Sherbet", "Mints", "Gas"]
+
+
+def _esc(text):
+    return html.escape(str(text), quote=True)
+
+
+class Store:
+    """Synthetic backoffice data, mutated by the add/save endpoints."""
+
+    def __init__(self, products=500, vendors=40, manifests=5, manifest_rows=200, seed=7):
+        rnd = random.Random(seed)
+        self.lock = threading.Lock()
+        self.vendors = [
+            {"name": f"{rnd.choice(_WORDS)} {rnd.choice(_WORDS)} Farms {i}",
+             "license": f"C11-{1000000 + i:07d}-LIC"}
+            for i in range(vendors)
+        ]
+        self.strains = sorted({f"{rnd.choice(_WORDS)} {rnd.choice(_WORDS)}" for _ in range(150)})
+        self.strains = [{"name": s, "abbreviation": s} for s in self.strains]
+        self.products = []
+        for i in range(products):
+            strain = rnd.choice(self.strains)["name"]
+            vendor = rnd.choice(self.vendors)["name"]
+            price = rnd.choice([10, 15, 20, 25, 35, 45])
+            self.products.append({
+                "name": f"{strain} {rnd.choice(['Flower', 'Smalls', 'Pre-Roll'])} {i} ({vendor.split()[0]})",
+                "category": rnd.choice(CATEGORIES), "vendor": vendor,
+                "sku": f"SKU{100000 + i}", "price": f"{price:.2f}", "med_price": f"{price * 0.9:.2f}",
+                "available": f"{i % 97} in stock",
+                "measurement": "Grams", "strain": strain, "cost": f"{price * 0.4:.2f}",
+            })
+        self.products.sort(key=lambda p: p["name"])
+        self.manifests = {}
+        for m in range(manifests):
+            vendor = rnd.choice(self.vendors)["name"]
+            title = f"06/{m + 1:02d}/2024 - {vendor} - {40000000 + m * 1111:08d}"
+            self.manifests[title] = [
+                {"name": rnd.choice(self.products)["name"], "package": f"1A40{m:02d}{r:010d}",
+                 "qty": str(rnd.randint(1, 50)), "unit": "Grams",
+                 "cost": f"{rnd.randint(2, 20):.2f}", "rec": f"{rnd.randint(10, 60):.2f}"}
+                for r in range(manifest_rows)
+            ]
+        self.created = []   # products saved through the New Product form
+
+    def search(self, kind, term):
+        term = (term or "").lower()
+        items = {"catalog": self.products, "vendors": self.vendors, "strains": self.strains}[kind]
+        return [it for it in items if term in it["name"].lower()]
+
+
+# ── HTML ────────────────────────────────────────────────────────────
+def layout(main, page, title="Backoffice"):
+    """
+    body/div[1] is the app (…/div/div[2]/div[2]/div[1] is #main, the root of
+    every absolute XPath); body/div[3] is the portal dropdown menus open in.
+    """
+    return f"""<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>{_esc(title)}</title>
+<link rel="stylesheet" href="/static/app.css"></head>
+<body>
+<div id="root"><div><div class="sidebar"></div><div class="content"><div class="topbar"></div><div class="page"><div id="main" data-page="{page}">{main}</div></div></div></div></div>
+<div></div>
+<div id="portal"></div>
+<script src="/static/app.js"></script>
+</body></html>"""
+
+
+def _header(title, add_label=None):
+    buttons = ""
+    if add_label:
+        buttons = f'<div><button type="button">Export</button><button type="button" id="add-button">{_esc(add_label)}</button></div>'
+    return f"<header><div><div><h1>{_esc(title)}</h1></div></div>{buttons}</header>"
+
+
+def _cells(values):
+    return "".join(f"<div><div>{_esc(v)}</div></div>" for v in values)
+
+
+# Every cell holds a different value, so a wrong column index reads the wrong field
+CATALOG_CELLS = lambda p: ["", p["name"], p["category"], p["vendor"], p["sku"], p["price"],
+                           p.get("available", ""), p.get("med_price", ""), p["measurement"],
+                           p["strain"], p["cost"]]
+VENDOR_CELLS = lambda v: [v["name"], v["license"], ""]
+STRAIN_CELLS = lambda s: [s["name"], s["abbreviation"], ""]
+MANIFEST_CELLS = lambda r: ["", r["name"], r["package"], r["qty"], r["unit"], "Inventory",
+                            "Sales Floor", "Tested", "Taxable", r["cost"], "Med n/a", r["rec"]]
+
+
+def grid(rows, page=0, has_next=False):
+    """
+    Inner HTML of a grid wrapper: …/div/div[2]/div[1]/div/div/p[1] is the
+    empty message and …/div/div[2]/div[2]/div/div/div[1]/div the rows.
+    """
+    empty = "<div><div><p>No data available</p><p>Try another search</p></div></div>" if not rows else ""
+    body = "".join(f'<div class="row" data-index="{i}">{_cells(cells)}</div>' for i, cells in enumerate(rows))
+    disabled = "" if has_next else " disabled"
+    pager = (f'<div class="pager"><span>Page {page + 1}</span>'
+             f'<button type="button" aria-label="Go to next page" data-page="{page + 1}"{disabled}>›</button></div>')
+    return (f'<div><div class="toolbar"></div><div><div>{empty}</div>'
+            f'<div><div><div><div class="rows">{body}</div>{pager}</div></div></div></div></div>')
+
+
+def list_page(kind, title, add_label, rows, page, has_next):
+    search = ('<div><div><div><div><input type="text" placeholder="Search" id="search"></div></div>'
+              '<button type="button">Filter</button><button type="button" id="search-button">Search</button></div></div>')
+    return layout(_header(title, add_label) + search + f'<div id="grid" data-kind="{kind}">'
+                  + grid(rows, page, has_next) + "</div>", kind, title)
+
+
+def login_page():
+    main = ('<div class="login"><h1>Sign in</h1>'
+            '<input id="input-input_" type="text" placeholder="Email">'
+            '<input type="password" placeholder="Password"></div>')
+    return layout(main, "login", "Sign in")
+
+
+def receive_page():
+    filler = "<div></div>" * 5
+    select = ('<section><article><div><div><label>Transaction</label></div><div><div></div><div><div>'
+              '<div class="select" id="manifest-select" role="button">Select a transaction</div>'
+              '</div></div></div></div></article></section>')
+    return layout(_header("Receive inventory") + filler
+                  + '<div id="grid" data-kind="manifest">' + grid([]) + "</div>" + select,
+                  "receive", "Receive inventory")
+
+
+def _field(label, control):
+    return f'<div class="field"><label>{_esc(label)}</label>{control}</div>'
+
+
+def new_product_page():
+    text = lambda name: f'<div><div><input type="text" name="{name}"></div></div>'
+    select = lambda menu: f'<div><div class="select" role="button" data-menu="{menu}">Select</div></div>'
+    search = lambda source: (f'<div><div class="search-select" data-search="{source}">'
+                             f'<input type="text" autocomplete="off"></div></div>')
+    fields = {
+        1: _field("Product name", text("name")),
+        2: _field("SKU", '<div><div><div><input type="text" name="sku">'
+                         '<button type="button" id="generate-sku">Generate</button></div></div></div>'),
+        5: _field("Category", select("category")),
+        6: _field("External category", select("external_category")),
+        8: _field("Type", select("type")),
+        9: _field("Unit", select("unit")),
+        14: _field("Price", text("price")),
+        18: _field("Unit cost", text("unitCost")),
+        22: _field("Strain", f'<div>{search("strains")}</div>'),
+        23: _field("Vendor", search("vendors")),
+        33: _field("Pricing tier", '<div><div><div class="search-select" data-search="tiers">'
+                                   '<svg width="12" height="12"><path d="M0 0L12 0L6 8Z"></path></svg>'
+                                   '<input type="text" readonly></div></div></div>'),
+    }
+    form = "".join(fields.get(n, _field(f"Field {n}", text(f"field{n}"))) for n in range(1, 34))
+    main = (_header("New Product") + '<div class="breadcrumbs"></div>'
+            f'<div><div id="product-form">{form}</div>'
+            '<div><div><button type="button" id="save-product">Save</button></div></div></div>')
+    return layout(main, "new-product", "New Product")
+
+
+def add_vendor_page():
+    main = ('<div><div><h1>Add vendor</h1></div></div>'
+            '<div><div><div><div><div><input type="text" name="name"></div></div></div>'
+            '<div><div><div><input type="text" name="license"></div></div></div></div>'
+            '<button type="button" id="save-vendor">Save</button></div>')
+    return layout(main, "add-vendor", "Add vendor")
+
+
+def strain_form_page(strain=None):
+    value = _esc(strain["name"]) if strain else ""
+    values = {"name": value, "description": value,
+              "abbreviation": _esc(strain["abbreviation"]) if strain else ""}
+    inputs = "".join(
+        f'<div><div><div><input type="text" name="{n}" value="{v}"></div></div></div>'
+        for n, v in values.items()
+    )
+    title = "Edit strain" if strain else "Add strain"
+    original = f' data-original="{value}"' if strain else ""
+    main = (_header(title) + f'<div><div><div id="strain-form"{original}>{inputs}</div>'
+            '<button type="button" id="save-strain">Save</button></div></div>')
+    return layout(main, "strain-form", title)
+
+
+# ── HTTP ────────────────────────────────────────────────────────────
+class Handler(BaseHTTPRequestHandler):
+    store = None
+    latency = 0.0   # seconds added to every API call
+
+    def log_message(self, fmt, *args):
+        pass
+
+    def _send(self, status, body, content_type="text/html; charset=utf-8", headers=()):
+        data = body.encode("utf-8") if isinstance(body, str) else body
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.send_header("Cache-Control", "no-store")
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _json(self, payload, status=200):
+        self._send(status, json.dumps(payload), "application/json")
+
+    def _logged_in(self):
+        return f"{SESSION_COOKIE}=" in (self.headers.get("Cookie") or "")
+
+    def _body(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    def do_GET(self):
+        parsed = urlparse(self.path)
+        path, query = parsed.path.rstrip("/") or "/", parse_qs(parsed.query)
+        q = query.get("q", [""])[0]
+        page = int(query.get("page", ["0"])[0])
+
+        if path.startswith("/static/"):
+            return self._static(path[len("/static/"):])
+        if path.startswith("/api/") or path.startswith("/fragment/"):
+            time.sleep(self.latency)
+            return self._api_get(path, q, page, query)
+        if not self._logged_in():
+            return self._send(200, login_page())
+
+        store = self.store
+        if path == "/":
+            return self._send(200, layout(_header("Home"), "home", "Home"))
+        if path == "/products/catalog":
+            return self._send(200, self._list_html("catalog", q, page))
+        if path == "/products/catalog/newProduct":
+            return self._send(200, new_product_page())
+        if path == "/products/vendors":
+            return self._send(200, self._list_html("vendors", q, page))
+        if path == "/products/vendors/new":
+            return self._send(200, add_vendor_page())
+        if path == "/products/strains":
+            return self._send(200, self._list_html("strains", q, page))
+        if path == "/products/strains/new":
+            return self._send(200, strain_form_page())
+        if path == "/products/strains/edit":
+            with store.lock:
+                match = next((s for s in store.strains if s["name"] == q), None)
+            return self._send(200 if match else 404, strain_form_page(match))
+        if path == "/products/inventory/receive-inventory":
+            return self._send(200, receive_page())
+        return self._send(404, layout(_header("Not found"), "missing", "Not found"))
+
+    def _list_html(self, kind, q, page):
+        title, add = {"catalog": ("Catalog", "Add product"), "vendors": ("Vendors", "Add vendor"),
+                      "strains": ("Strains", "Add strain")}[kind]
+        rows, has_next = self._rows(kind, q, page)
+        return list_page(kind, title, add, rows, page, has_next)
+
+    def _rows(self, kind, q, page):
+        cells = {"catalog": CATALOG_CELLS, "vendors": VENDOR_CELLS, "strains": STRAIN_CELLS}[kind]
+        with self.store.lock:
+            found = self.store.search(kind, q)
+        chunk = found[page * PAGE_SIZE:(page + 1) * PAGE_SIZE]
+        return [cells(it) for it in chunk], len(found) > (page + 1) * PAGE_SIZE
+
+    def _api_get(self, path, q, page, query):
+        store = self.store
+        if path.startswith("/api/v1/"):
+            if not self._logged_in():
+                return self._json({"error": "unauthorised"}, 401)
+            return self._api_v1(path[len("/api/v1"):], query)
+        if path.startswith("/fragment/"):
+            kind = path[len("/fragment/"):]
+            if kind == "manifest":
+                title = query.get("title", [""])[0]
+                with store.lock:
+                    rows = [MANIFEST_CELLS(r) for r in store.manifests.get(title, [])]
+                return self._send(200, grid(rows))
+            if kind in ("catalog", "vendors", "strains"):
+                rows, has_next = self._rows(kind, q, page)
+                return self._send(200, grid(rows, page, has_next))
+        if path == "/api/manifests":
+            with store.lock:
+                return self._json(list(store.manifests))
+        if path in ("/api/strains", "/api/vendors"):
+            kind = path[len("/api/"):]
+            with store.lock:
+                return self._json([it["name"] for it in store.search(kind, q)[:20]])
+        if path == "/api/tiers":
+            return self._json(PRICING_TIERS)
+        if path == "/api/sku":
+            return self._json(f"SKU{random.randint(200000, 999999)}")
+        if path == "/api/created":
+            with store.lock:
+                return self._json(store.created)
+        return self._json({"error": "not found"}, 404)
+
+    def _api_v1(self, path, query):
+        """JSON reads used by automation/http_backend.py (paged {'items', 'total'})."""
+        store = self.store
+        search = query.get("search", [""])[0]
+        page = int(query.get("page", ["0"])[0])
+        size = int(query.get("pageSize", ["100"])[0])
+        with store.lock:
+            if path == "/products":
+                items = [{"productName": p["name"], "category": p["category"], "vendor": p["vendor"],
+                          "sku": p["sku"], "recPrice": p["price"], "strain": p["strain"],
+                          "cost": p["cost"]} for p in store.search("catalog", search)]
+            elif path == "/vendors":
+                items = [{"name": v["name"], "licenseNumber": v["license"]}
+                         for v in store.search("vendors", search)]
+            elif path == "/receive/transactions":
+                items = [{"id": i, "title": t} for i, t in enumerate(store.manifests)]
+            elif path.startswith("/receive/transactions/") and path.endswith("/items"):
+                index = int(path.split("/")[3])
+                titles = list(store.manifests)
+                if not 0 <= index < len(titles):
+                    return self._json({"error": "not found"}, 404)
+                items = [{"productName": r["name"], "packageId": r["package"], "quantity": r["qty"],
+                          "unit": r["unit"], "unitCost": r["cost"], "recPrice": r["rec"]}
+                         for r in store.manifests[titles[index]]]
+            else:
+                return self._json({"error": "not found"}, 404)
+        return self._json({"items": items[page * size:(page + 1) * size], "total": len(items)})
+
+    def do_POST(self):
+        path = urlparse(self.path).path
+        time.sleep(self.latency)
+        store = self.store
+        if path == "/api/login":
+            return self._send(200, "{}", "application/json",
+                              [("Set-Cookie", f"{SESSION_COOKIE}=1; Path=/")])
+        if not self._logged_in():
+            return self._json({"error": "unauthorised"}, 401)
+        payload = self._body()
+        with store.lock:
+            if path == "/api/products":
+                store.created.append(payload)
+                store.products.append({
+                    "name": payload.get("name", ""), "category": payload.get("category", ""),
+                    "vendor": payload.get("vendor", ""), "sku": payload.get("sku", ""),
+                    "price": payload.get("price", ""), "measurement": "Grams",
+                    "strain": payload.get("strain", ""), "cost": payload.get("unitCost", ""),
+                })
+                store.products.sort(key=lambda p: p["name"])
+            elif path == "/api/vendors":
+                store.vendors.append({"name": payload.get("name", ""), "license": payload.get("license", "")})
+            elif path == "/api/strains":
+                original = payload.pop("original", None)
+                store.strains = [s for s in store.strains if s["name"] != original]
+                store.strains.append({"name": payload.get("name", ""),
+                                      "abbreviation": payload.get("abbreviation", "")})
+                store.strains.sort(key=lambda s: s["name"])
+            else:
+                return self._json({"error": "not found"}, 404)
+        return self._json({"ok": True})
+
+    def _static(self, name):
+        path = os.path.join(STATIC_DIR, os.path.basename(name))
+        if not os.path.isfile(path):
+            return self._send(404, "")
+        content_type = "text/css" if path.endswith(".css") else "application/javascript"
+        with open(path, "rb") as f:
+            return self._send(200, f.read(), content_type)
+
+
+def serve(port=0, latency_ms=0, store=None):
+    """
+    Start the fake backoffice on a background thread.
+    Returns (server, base_url); call server.shutdown() when done.
+    """
+    handler = type("FakeBackofficeHandler", (Handler,), {
+        "store": store or Store(), "latency": latency_ms / 1000,
+    })
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the fake Dutchie Backoffice.")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0, help="Milliseconds added to each API call")
+    args = parser.parse_args()
+    server, base_url = serve(args.port, args.latency)
+    print(f"[Fake Backoffice] {base_url} (Ctrl+C to stop)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
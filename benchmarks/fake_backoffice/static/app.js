@@ -0,0 +1,258 @@
+// Behaviour for the fake backoffice pages: login, grid searches and paging,
+// dropdown menus in the #portal, and the add/save forms. Every server call
+// goes through fetch() so the automation's network-idle waits see it, and a
+// progressbar is shown while one is pending, like the real app.
+(function () {
+    const main = document.getElementById("main");
+    const portal = document.getElementById("portal");
+    const page = main.dataset.page;
+    let pending = 0;
+    let spinner = null;
+
+    function request(url, options) {
+        pending++;
+        if (!spinner) {
+            spinner = document.createElement("div");
+            spinner.setAttribute("role", "progressbar");
+            spinner.className = "spinner";
+            document.body.appendChild(spinner);
+        }
+        return fetch(url, options).finally(function () {
+            if (--pending === 0 && spinner) {
+                spinner.remove();
+                spinner = null;
+            }
+        });
+    }
+
+    function getJSON(url) {
+        return request(url).then(function (r) { return r.json(); });
+    }
+
+    function post(url, payload) {
+        return request(url, {
+            method: "POST",
+            headers: {"Content-Type": "application/json"},
+            body: JSON.stringify(payload || {}),
+        });
+    }
+
+    function go(path) {
+        window.location.href = path;
+    }
+
+    // ── menus ──────────────────────────────────────────────────────────
+    function closeMenu() {
+        portal.innerHTML = "";
+    }
+
+    function backdrop() {
+        const el = document.createElement("div");
+        el.className = "backdrop";
+        el.addEventListener("click", closeMenu);
+        return el;
+    }
+
+    // portal > div (backdrop), div, div.paper > ul > li
+    function openMenu(options, onPick) {
+        closeMenu();
+        const paper = document.createElement("div");
+        paper.className = "paper";
+        const ul = document.createElement("ul");
+        ul.setAttribute("role", "listbox");
+        options.forEach(function (text) {
+            const li = document.createElement("li");
+            li.textContent = text;
+            li.addEventListener("click", function () {
+                closeMenu();
+                onPick(text);
+            });
+            ul.appendChild(li);
+        });
+        paper.appendChild(ul);
+        portal.append(backdrop(), document.createElement("div"), paper);
+    }
+
+    // portal > div > div[2] > div > div > div > ul > li > div > div > span
+    function openSearchMenu(options, onPick) {
+        closeMenu();
+        const outer = document.createElement("div");
+        outer.className = "search-menu";
+        outer.innerHTML = "<div></div><div><div><div><div><ul role=\"listbox\"></ul></div></div></div></div>";
+        const ul = outer.querySelector("ul");
+        options.forEach(function (text) {
+            const li = document.createElement("li");
+            li.innerHTML = "<div><div><span></span></div></div>";
+            li.querySelector("span").textContent = text;
+            li.addEventListener("click", function () {
+                closeMenu();
+                onPick(text);
+            });
+            ul.appendChild(li);
+        });
+        outer.firstChild.appendChild(backdrop());
+        portal.appendChild(outer);
+    }
+
+    document.addEventListener("keydown", function (e) {
+        if (e.key === "Escape") closeMenu();
+    });
+
+    // ── login ──────────────────────────────────────────────────────────
+    if (page === "login") {
+        const password = main.querySelector("input[placeholder='Password']");
+        password.addEventListener("keydown", function (e) {
+            if (e.key === "Enter") {
+                post("/api/login").then(function () { window.location.reload(); });
+            }
+        });
+        return;
+    }
+
+    // ── list pages (catalog, vendors, strains) ─────────────────────────
+    const grid = document.getElementById("grid");
+    const search = document.getElementById("search");
+    let query = "";
+
+    function loadGrid(pageIndex) {
+        const url = "/fragment/" + grid.dataset.kind + "?q=" + encodeURIComponent(query)
+            + "&page=" + pageIndex;
+        return request(url).then(function (r) { return r.text(); }).then(function (html) {
+            grid.innerHTML = html;
+        });
+    }
+
+    if (search) {
+        const runSearch = function () {
+            query = search.value;
+            loadGrid(0);
+        };
+        search.addEventListener("keydown", function (e) {
+            if (e.key === "Enter") runSearch();
+        });
+        document.getElementById("search-button").addEventListener("click", runSearch);
+
+        grid.addEventListener("click", function (e) {
+            const next = e.target.closest("button[aria-label='Go to next page']");
+            if (next) {
+                if (!next.disabled) loadGrid(Number(next.dataset.page));
+                return;
+            }
+            if (grid.dataset.kind !== "strains") return;
+            const rows = grid.querySelector(".rows");
+            if (!rows || !rows.contains(e.target)) return;
+            const row = e.target.closest(".row") || rows.querySelector(".row");
+            if (row) go("/products/strains/edit?q=" + encodeURIComponent(row.firstChild.innerText.trim()));
+        });
+
+        const add = document.getElementById("add-button");
+        const addPaths = {
+            catalog: "/products/catalog/newProduct",
+            vendors: "/products/vendors/new",
+            strains: "/products/strains/new",
+        };
+        add.addEventListener("click", function () { go(addPaths[grid.dataset.kind]); });
+    }
+
+    // ── receive inventory ──────────────────────────────────────────────
+    if (page === "receive") {
+        const select = document.getElementById("manifest-select");
+        select.addEventListener("click", function () {
+            getJSON("/api/manifests").then(function (titles) {
+                openMenu(titles, function (title) {
+                    select.textContent = title;
+                    request("/fragment/manifest?title=" + encodeURIComponent(title))
+                        .then(function (r) { return r.text(); })
+                        .then(function (html) { grid.innerHTML = html; });
+                });
+            });
+        });
+    }
+
+    // ── add vendor / strain ────────────────────────────────────────────
+    function values(form) {
+        const data = {};
+        form.querySelectorAll("input[name]").forEach(function (input) {
+            data[input.name] = input.value;
+        });
+        return data;
+    }
+
+    if (page === "add-vendor") {
+        document.getElementById("save-vendor").addEventListener("click", function () {
+            post("/api/vendors", values(main)).then(function () { go("/products/vendors"); });
+        });
+    }
+
+    if (page === "strain-form") {
+        const form = document.getElementById("strain-form");
+        document.getElementById("save-strain").addEventListener("click", function () {
+            const data = values(form);
+            if (form.dataset.original) data.original = form.dataset.original;
+            post("/api/strains", data).then(function () { go("/products/strains"); });
+        });
+    }
+
+    // ── new product ────────────────────────────────────────────────────
+    if (page === "new-product") {
+        const form = document.getElementById("product-form");
+        const chosen = {};
+        const menus = {
+            category: ["Accessories", "Cannabis Flower", "Edibles", "Pre-Rolls", "Vapes"],
+            external_category: ["Buds", "Buds by Strain", "Shake", "Smalls"],
+            type: ["Quantity", "Weight"],
+            unit: ["Gram", "Ounce", "Each"],
+        };
+
+        document.getElementById("generate-sku").addEventListener("click", function () {
+            getJSON("/api/sku").then(function (sku) {
+                form.querySelector("input[name='sku']").value = sku;
+            });
+        });
+
+        form.querySelectorAll(".select[data-menu]").forEach(function (select) {
+            select.addEventListener("click", function () {
+                const name = select.dataset.menu;
+                openMenu(menus[name], function (text) {
+                    chosen[name] = text;
+                    select.textContent = text;
+                });
+            });
+        });
+
+        form.querySelectorAll(".search-select").forEach(function (box) {
+            const source = box.dataset.search;
+            const input = box.querySelector("input");
+            let latest = 0;
+            const show = function () {
+                const seq = ++latest;
+                getJSON("/api/" + source + "?q=" + encodeURIComponent(input.value)).then(function (options) {
+                    if (seq !== latest) return;  // a newer keystroke's results are coming
+                    openSearchMenu(options, function (text) {
+                        chosen[source] = text;
+                        input.value = text;
+                    });
+                });
+            };
+            box.addEventListener("click", function () {
+                if (source === "tiers") show();
+                else input.focus();
+            });
+            input.addEventListener("input", show);
+        });
+
+        document.getElementById("save-product").addEventListener("click", function () {
+            const data = values(form);
+            Object.assign(data, {
+                category: chosen.category || "",
+                external_category: chosen.external_category || "",
+                type: chosen.type || "",
+                unit: chosen.unit || "",
+                strain: chosen.strains || "",
+                vendor: chosen.vendors || "",
+                pricing_tier: chosen.tiers || "",
+            });
+            post("/api/products", data).then(function () { go("/products/catalog"); });
+        });
+    }
+})();
@@ -0,0 +1,115 @@
+# ── intake-manager/data/catalog_cache.py ──────────────────────────────
+"""
+Local mirror of the Dutchie product catalog (the catalog_cache table).
+
+Rows are written by automation/catalog_sync.py and by browser lookups that
+miss the mirror. Exact-name lookups read from here first; substring searches
+only once a full sync has run, since until then the mirror holds just the
+products earlier lookups happened to fetch.
+"""
+from datetime import datetime
+
+FIELDS = (
+    "product_name", "category", "vendor", "sku", "rec_price",
+    "measurement_type", "strain_name", "cost",
+)
+
+# sync_state names
+LAST_FULL_SYNC = "catalog_last_full_sync"
+LAST_SYNC = "catalog_last_sync"
+
+
+def _now():
+    return datetime.now().isoformat(timespec="seconds")
+
+
+def _row_to_dict(row):
+    return dict(zip(FIELDS, row))
+
+
+def upsert_products(conn, products, synced_at=None):
+    """
+    Insert or refresh catalog rows (dicts keyed by FIELDS; missing keys are
+    left unchanged on existing rows). Returns how many rows were new or changed.
+    """
+    synced_at = synced_at or _now()
+    cur = conn.cursor()
+    changed = 0
+    for p in products:
+        values = {f: p.get(f) for f in FIELDS}
+        values["vendor"] = values["vendor"] or ""
+        cur.execute(
+            f"SELECT {', '.join(FIELDS)} FROM catalog_cache WHERE product_name = ? AND vendor = ?",
+            (values["product_name"], values["vendor"]),
+        )
+        existing = cur.fetchone()
+        if existing is None:
+            cur.execute(
+                f"INSERT INTO catalog_cache ({', '.join(FIELDS)}, synced_at)"
+                f" VALUES ({', '.join('?' * len(FIELDS))}, ?)",
+                [values[f] for f in FIELDS] + [synced_at],
+            )
+            changed += 1
+            continue
+        merged = {f: values[f] if values[f] is not None else old
+                  for f, old in zip(FIELDS, existing)}
+        if tuple(merged[f] for f in FIELDS) != tuple(existing):
+            changed += 1
+        cur.execute(
+            f"UPDATE catalog_cache SET {', '.join(f + ' = ?' for f in FIELDS)}, synced_at = ?"
+            " WHERE product_name = ? AND vendor = ?",
+            [merged[f] for f in FIELDS] + [synced_at, values["product_name"], values["vendor"]],
+        )
+    conn.commit()
+    return changed
+
+
+def delete_not_synced_since(conn, synced_at):
+    """Drop rows a full sync did not see (removed from Dutchie). Returns the count."""
+    cur = conn.cursor()
+    cur.execute("DELETE FROM catalog_cache WHERE synced_at < ?", (synced_at,))
+    conn.commit()
+    return cur.rowcount
+
+
+def find_product(conn, product_name):
+    """Exact (case-insensitive) match on product name, or None."""
+    cur = conn.cursor()
+    cur.execute(
+        f"SELECT {', '.join(FIELDS)} FROM catalog_cache"
+        " WHERE product_name = ? COLLATE NOCASE ORDER BY rowid LIMIT 1",
+        (product_name,),
+    )
+    row = cur.fetchone()
+    return _row_to_dict(row) if row else None
+
+
+def search_products(conn, term, limit=200):
+    """Rows whose product name contains `term`, like the catalog search box."""
+    cur = conn.cursor()
+    escaped = term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    cur.execute(
+        f"SELECT {', '.join(FIELDS)} FROM catalog_cache"
+        " WHERE product_name LIKE ? ESCAPE '\\' ORDER BY product_name LIMIT ?",
+        (f"%{escaped}%", limit),
+    )
+    return [_row_to_dict(row) for row in cur.fetchall()]
+
+
+def is_complete(conn):
+    """True once a full sync has mirrored the whole catalog."""
+    return get_state(conn, LAST_FULL_SYNC) is not None
+
+
+def get_state(conn, name):
+    row = conn.execute("SELECT value FROM sync_state WHERE name = ?", (name,)).fetchone()
+    return row[0] if row else None
+
+
+def set_state(conn, name, value):
+    conn.execute(
+        "INSERT INTO sync_state (name, value) VALUES (?, ?)"
+        " ON CONFLICT(name) DO UPDATE SET value = excluded.value",
+        (name, value),
+    )
+    conn.commit()
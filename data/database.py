@@ -1,10 +1,19 @@
 # ── intake-manager/data/database.py ───────────────────────────────────
-import sqlite3
+import atexit
+import logging
 import os
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+import tracing
 from dotenv import load_dotenv
 
 load_dotenv()
 
+log = logging.getLogger(__name__)
+
 # Determine the base directory of the repository. This ensures that the
 # default database path is always anchored to the project root rather than
 # the current working directory.
@@ -15,9 +24,274 @@ DEFAULT_DB_PATH = os.path.join(BASE_DIR, "intake.db")
 DB_PATH = os.getenv("INTAKE_DB_PATH", DEFAULT_DB_PATH)
 DB_FOLDER = os.path.dirname(DB_PATH)
 
-def init_db():
-    os.makedirs(DB_FOLDER, exist_ok=True)
-    conn = sqlite3.connect(DB_PATH)
+# Applied to every connection. WAL lets readers run while a write is in
+# progress; busy_timeout makes a second writer wait instead of failing.
+PRAGMAS = (
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA busy_timeout = 5000",
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA cache_size = -20000",
+)
+
+
+# ── Schema migrations ────────────────────────────────────────────────
+# Each migration upgrades the schema by one version. The current version is
+# stored in ``PRAGMA user_version`` so upgrades run once, in order, the next
+# time the app starts against an older database.
+
+# Columns of ux_master_product_vendor_catalog, the unique key of a product
+MASTER_PRODUCT_KEY = ("dutchie_vendor", "catalog_name", "metrc_name")
+
+
+def _move_duplicates(cur, key):
+    """
+    Keep one master_product row per `key` (SQL expressions) and move the
+    other copies to master_product_dupes. The highest rowid (usually the
+    last inserted copy) is kept, since there is no timestamp column;
+    moving rather than dropping means a wrong guess can be undone.
+    """
+    group = ", ".join(key)
+    losers = f"rowid NOT IN (SELECT MAX(rowid) FROM master_product GROUP BY {group})"
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS master_product_dupes AS
+    SELECT rowid AS original_rowid, * FROM master_product WHERE 0""")
+    cur.execute(f"INSERT INTO master_product_dupes SELECT rowid, * FROM master_product WHERE {losers}")
+    removed = cur.rowcount
+    if removed:
+        # Keys whose copies disagree on price, room, vendor, ... need a look
+        values = " || '|' || ".join(
+            f"quote({c})" for c in ("cost", "retail", "room", "metrc_vendor", "category", "strain_name")
+        )
+        conflicts = cur.execute(f"""
+        SELECT {group} FROM master_product
+        GROUP BY {group}
+        HAVING COUNT(DISTINCT {values}) > 1""").fetchall()
+        cur.execute(f"DELETE FROM master_product WHERE {losers}")
+        log.warning(
+            "Moved %d duplicate master_product rows to master_product_dupes; "
+            "%d products had copies with different values, e.g. %s",
+            removed, len(conflicts), conflicts[:5],
+        )
+
+
+def _migration_1(cur):
+    """Dedupe master_product and index the lookup columns."""
+    _move_duplicates(cur, MASTER_PRODUCT_KEY)
+    cur.execute("""
+    CREATE UNIQUE INDEX IF NOT EXISTS ux_master_product_vendor_catalog
+    ON master_product (dutchie_vendor, catalog_name, metrc_name)""")
+    cur.execute("""
+    CREATE INDEX IF NOT EXISTS ix_master_product_metrc_name
+    ON master_product (metrc_name)""")
+    cur.execute("""
+    CREATE INDEX IF NOT EXISTS ix_vendor_names_metrc_vendor
+    ON vendor_names (metrc_vendor)""")
+
+
+def _migration_2(cur):
+    """Job table for bulk product creation (one row per product per batch)."""
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS product_job (
+        batch TEXT NOT NULL,
+        product_name TEXT NOT NULL,
+        retail REAL,
+        cost REAL,
+        strain TEXT,
+        vendor TEXT,
+        status TEXT NOT NULL DEFAULT 'pending',
+        attempts INTEGER NOT NULL DEFAULT 0,
+        error TEXT,
+        updated_at TEXT,
+        PRIMARY KEY (batch, product_name)
+    )""")
+
+
+def _migration_3(cur):
+    """Local mirror of the Dutchie catalog plus sync bookkeeping."""
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS catalog_cache (
+        product_name TEXT NOT NULL,
+        category TEXT,
+        vendor TEXT NOT NULL DEFAULT '',
+        sku TEXT,
+        rec_price TEXT,
+        measurement_type TEXT,
+        strain_name TEXT,
+        cost TEXT,
+        synced_at TEXT,
+        UNIQUE (product_name, vendor)
+    )""")
+    cur.execute("""
+    CREATE INDEX IF NOT EXISTS ix_catalog_cache_name
+    ON catalog_cache (product_name COLLATE NOCASE)""")
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS sync_state (
+        name TEXT PRIMARY KEY,
+        value TEXT
+    )""")
+
+
+def _migration_4(cur):
+    """Full-text index over master_product names, kept in sync by triggers."""
+    try:
+        cur.execute("""
+        CREATE VIRTUAL TABLE product_search USING fts5(
+            metrc_name, catalog_name,
+            content='master_product', content_rowid='rowid',
+            tokenize='trigram'
+        )""")
+    except sqlite3.OperationalError:
+        # SQLite < 3.34 has no trigram tokenizer; fall back to word tokens
+        cur.execute("""
+        CREATE VIRTUAL TABLE product_search USING fts5(
+            metrc_name, catalog_name,
+            content='master_product', content_rowid='rowid'
+        )""")
+    cur.execute("""
+    CREATE TRIGGER product_search_ai AFTER INSERT ON master_product BEGIN
+        INSERT INTO product_search (rowid, metrc_name, catalog_name)
+        VALUES (new.rowid, new.metrc_name, new.catalog_name);
+    END""")
+    cur.execute("""
+    CREATE TRIGGER product_search_ad AFTER DELETE ON master_product BEGIN
+        INSERT INTO product_search (product_search, rowid, metrc_name, catalog_name)
+        VALUES ('delete', old.rowid, old.metrc_name, old.catalog_name);
+    END""")
+    cur.execute("""
+    CREATE TRIGGER product_search_au AFTER UPDATE OF metrc_name, catalog_name ON master_product BEGIN
+        INSERT INTO product_search (product_search, rowid, metrc_name, catalog_name)
+        VALUES ('delete', old.rowid, old.metrc_name, old.catalog_name);
+        INSERT INTO product_search (rowid, metrc_name, catalog_name)
+        VALUES (new.rowid, new.metrc_name, new.catalog_name);
+    END""")
+    cur.execute("INSERT INTO product_search (product_search) VALUES ('rebuild')")
+
+
+def _migration_5(cur):
+    """Persist Receive Inventory scrapes: run log, scraped titles, row links."""
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS scrape_run (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        mode TEXT NOT NULL DEFAULT 'full',
+        status TEXT NOT NULL DEFAULT 'running',
+        started_at TEXT NOT NULL,
+        finished_at TEXT,
+        listed INTEGER,
+        scraped INTEGER
+    )""")
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS manifest_title (
+        title TEXT PRIMARY KEY,
+        run_id INTEGER REFERENCES scrape_run (id),
+        scraped_at TEXT,
+        row_count INTEGER
+    )""")
+    cur.execute("ALTER TABLE active_manifest ADD COLUMN unit TEXT")
+    cur.execute("ALTER TABLE active_manifest ADD COLUMN run_id INTEGER")
+    cur.execute("""
+    CREATE INDEX IF NOT EXISTS ix_active_manifest_title
+    ON active_manifest (title)""")
+
+
+def _migration_6(cur):
+    """Checkpoint the last completed form step of each product job."""
+    cur.execute("ALTER TABLE product_job ADD COLUMN last_step TEXT")
+
+
+def _migration_7(cur):
+    """Local mirror of the Dutchie strain list."""
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS strains (
+        name TEXT PRIMARY KEY COLLATE NOCASE,
+        abbreviation TEXT,
+        synced_at TEXT
+    )""")
+
+
+def _migration_8(cur):
+    """Markup rules for the pricing engine (NULL matches anything)."""
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS pricing_rule (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        dutchie_vendor TEXT,
+        category TEXT,
+        room TEXT,
+        min_grams REAL,
+        max_grams REAL,
+        markup REAL NOT NULL,
+        round_to REAL NOT NULL DEFAULT 0.01
+    )""")
+
+
+def _migration_9(cur):
+    """
+    Make master_product's key columns NOT NULL. A UNIQUE index treats NULLs
+    as distinct, so NULL-key rows could be duplicated and never hit an
+    upsert's ON CONFLICT. Existing NULLs become '' (merging any copies that
+    then collide), and triggers reject new ones, since SQLite can't add NOT
+    NULL to an existing column.
+    """
+    _move_duplicates(cur, [f"COALESCE({c}, '')" for c in MASTER_PRODUCT_KEY])
+    blanks = ", ".join(f"{c} = COALESCE({c}, '')" for c in MASTER_PRODUCT_KEY)
+    nulls = " OR ".join(f"{c} IS NULL" for c in MASTER_PRODUCT_KEY)
+    cur.execute(f"UPDATE master_product SET {blanks} WHERE {nulls}")
+    for name, event in (("bi", "INSERT"), ("bu", f"UPDATE OF {', '.join(MASTER_PRODUCT_KEY)}")):
+        for column in MASTER_PRODUCT_KEY:
+            cur.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS master_product_{column}_{name}
+            BEFORE {event} ON master_product WHEN NEW.{column} IS NULL BEGIN
+                SELECT RAISE(ABORT, 'NOT NULL constraint failed: master_product.{column}');
+            END""")
+
+
+MIGRATIONS = [
+    _migration_1,
+    _migration_2,
+    _migration_3,
+    _migration_4,
+    _migration_5,
+    _migration_6,
+    _migration_7,
+    _migration_8,
+    _migration_9,
+]
+SCHEMA_VERSION = len(MIGRATIONS)
+
+
+def migrate(conn):
+    """Apply any migrations newer than the database's user_version."""
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    for target in range(version + 1, SCHEMA_VERSION + 1):
+        cur = conn.cursor()
+        cur.execute("BEGIN")
+        try:
+            MIGRATIONS[target - 1](cur)
+            cur.execute(f"PRAGMA user_version = {target}")
+        except Exception:
+            conn.rollback()
+            raise
+        conn.commit()
+    return conn
+
+
+def configure(conn):
+    """Apply PRAGMAS (WAL, relaxed fsync, busy timeout) to `conn`."""
+    for pragma in PRAGMAS:
+        conn.execute(pragma)
+    return conn
+
+
+def connect(db_path=DB_PATH, **kwargs):
+    """A configured connection to an already initialised database."""
+    return configure(sqlite3.connect(db_path, **kwargs))
+
+
+def init_db(db_path=DB_PATH):
+    db_folder = os.path.dirname(db_path)
+    if db_folder:
+        os.makedirs(db_folder, exist_ok=True)
+    conn = connect(db_path)
     cur = conn.cursor()
     cur.execute("""
     CREATE TABLE IF NOT EXISTS active_manifest (
@@ -56,4 +330,116 @@ def init_db():
         dutchie_vendor TEXT
     )""")
     conn.commit()
+    migrate(conn)
     return conn
+
+
+# ── Connection manager ───────────────────────────────────────────────
+class ConnectionManager:
+    """
+    Shares one database between the GUI and background threads.
+
+    reader() hands each thread its own connection; write() queues a function
+    for the single writer thread, which runs it in a transaction on its own
+    connection. Under WAL the readers never wait for the writer, so workers
+    can persist results while the UI keeps reading.
+
+    Needs a file database: each connection to ":memory:" is a separate DB.
+    """
+
+    def __init__(self, db_path=DB_PATH):
+        self.db_path = db_path
+        init_db(db_path).close()  # schema and migrations, once
+        self._local = threading.local()
+        self._readers = []
+        self._readers_lock = threading.Lock()
+        self._queue = queue.Queue()
+        self._closed = False
+        self._writer = threading.Thread(target=self._write_loop, name="db-writer", daemon=True)
+        self._writer.start()
+
+    def reader(self):
+        """This thread's connection (created on first use)."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # Closed by close(), possibly from another thread
+            conn = connect(self.db_path, check_same_thread=False)
+            self._local.conn = conn
+            with self._readers_lock:
+                self._readers.append(conn)
+        return conn
+
+    def write(self, fn, *args, **kwargs):
+        """
+        Run fn(conn, *args, **kwargs) on the writer thread, inside a
+        transaction. Returns a Future with its result; call .result() to
+        wait for the write to be committed.
+        """
+        if self._closed:
+            raise RuntimeError("ConnectionManager is closed")
+        future = Future()
+        self._queue.put((future, fn, args, kwargs, time.perf_counter()))
+        return future
+
+    def execute(self, sql, params=()):
+        """Queue a single statement; the Future resolves to its rowcount."""
+        return self.write(lambda conn: conn.execute(sql, params).rowcount)
+
+    def executemany(self, sql, seq_of_params):
+        """Queue one statement for many parameter sets."""
+        rows = list(seq_of_params)
+        return self.write(lambda conn: conn.executemany(sql, rows).rowcount)
+
+    def flush(self):
+        """Block until every write queued so far has been committed."""
+        self.write(lambda conn: None).result()
+
+    def _write_loop(self):
+        conn = connect(self.db_path)
+        try:
+            while True:
+                job = self._queue.get()
+                if job is None:
+                    break
+                future, fn, args, kwargs, queued = job
+                if not future.set_running_or_notify_cancel():
+                    continue
+                name = getattr(fn, "__name__", "<lambda>")
+                if name == "<lambda>":
+                    name = "write"
+                try:
+                    with tracing.span(f"db.{name}") as span, conn:
+                        span.set(queued_ms=round((time.perf_counter() - queued) * 1000, 2))
+                        result = fn(conn, *args, **kwargs)
+                except BaseException as e:
+                    future.set_exception(e)
+                else:
+                    future.set_result(result)
+        finally:
+            conn.close()
+
+    def close(self):
+        """Finish queued writes, stop the writer and close every connection."""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._writer.join()
+        with self._readers_lock:
+            for conn in self._readers:
+                conn.close()
+            self._readers.clear()
+
+
+_manager = None
+_manager_lock = threading.Lock()
+
+
+def get_manager():
+    """The process-wide connection manager for DB_PATH, created on first use."""
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            _manager = ConnectionManager()
+            atexit.register(_manager.close)
+        return _manager
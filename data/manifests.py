@@ -0,0 +1,168 @@
+# ── intake-manager/data/manifests.py ──────────────────────────────────
+"""
+Scraped Receive Inventory manifests, persisted in active_manifest.
+
+Each scrape is recorded in scrape_run; manifest_title remembers which
+transaction titles have been scraped so a diff run only fetches new ones.
+Rows keep the scraped values; catalog matching happens when they are shown.
+Each row's strain is filled in when it is saved, for product creation.
+"""
+import re
+from datetime import datetime
+
+from data import strain_cache
+from data.resolver import default_product, resolve_products
+
+_NUMBER = re.compile(r"-?\d+(?:\.\d+)?")
+
+
+def _now():
+    return datetime.now().isoformat(timespec="seconds")
+
+
+def _number(text):
+    """First number in a scraped cell ('$1,234.50' -> 1234.5), or None."""
+    match = _NUMBER.search(str(text or "").replace(",", ""))
+    return float(match.group()) if match else None
+
+
+def _text(value):
+    if value is None:
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value)
+
+
+def parse_title(title):
+    """
+    Split a transaction title into its parts:
+    received date (first 10 chars), METRC vendor (between the first and last
+    hyphens) and manifest number (last 8 chars).
+    """
+    first_dash = title.find('-')
+    last_dash = title.rfind('-')
+    return {
+        "received_date": title[:10],
+        "metrc_vendor": title[first_dash + 1:last_dash] if 0 <= first_dash < last_dash else "",
+        "manifest": title[-8:],
+    }
+
+
+def strains_for(conn, metrc_names):
+    """
+    A strain for each METRC name: the matched product's strain, else the
+    longest known strain (from the strains mirror) named in it, else the
+    default for unknown products.
+    """
+    known = {name.lower(): name for name, _ in strain_cache.strain_map(conn).values()}
+    # Longest first, so "Blue Dream Haze" wins over "Blue Dream"
+    pattern = re.compile(
+        r"(?<!\w)(" + "|".join(map(re.escape, sorted(known.values(), key=len, reverse=True)))
+        + r")(?!\w)", re.IGNORECASE,
+    ) if known else None
+    strains = []
+    for prod in resolve_products(conn, metrc_names):
+        match = pattern.search(prod.metrc_name) if pattern else None
+        strains.append((prod.matched and prod.strain)
+                       or (known[match.group(1).lower()] if match else "")
+                       or default_product(prod.metrc_name).strain)
+    return strains
+
+
+def start_run(conn, mode="full"):
+    """Record the start of a scrape; returns its run id."""
+    cur = conn.cursor()
+    cur.execute(
+        "INSERT INTO scrape_run (mode, status, started_at) VALUES (?, 'running', ?)",
+        (mode, _now()),
+    )
+    conn.commit()
+    return cur.lastrowid
+
+
+def finish_run(conn, run_id, status="done", listed=0, scraped=0):
+    conn.execute(
+        "UPDATE scrape_run SET status = ?, finished_at = ?, listed = ?, scraped = ?"
+        " WHERE id = ?",
+        (status, _now(), listed, scraped, run_id),
+    )
+    conn.commit()
+
+
+def last_run(conn):
+    """The most recent scrape_run as a dict, or None."""
+    cur = conn.execute(
+        "SELECT id, mode, status, started_at, finished_at, listed, scraped"
+        " FROM scrape_run ORDER BY id DESC LIMIT 1"
+    )
+    row = cur.fetchone()
+    return dict(zip([d[0] for d in cur.description], row)) if row else None
+
+
+def save_manifest(conn, run_id, title, rows):
+    """Replace the stored rows of `title` with freshly scraped `rows`."""
+    parts = parse_title(title)
+    strains = strains_for(conn, [row.get("name", "") for row in rows])
+    with conn:
+        conn.execute("DELETE FROM active_manifest WHERE title = ?", (title,))
+        conn.executemany(
+            """
+            INSERT INTO active_manifest (
+                title, manifest, metrc_vendor, received_date,
+                metrc_name, qty, unit, cost, retail, strain, run_id
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            [
+                (title, parts["manifest"], parts["metrc_vendor"], parts["received_date"],
+                 row.get("name", ""), _number(row.get("qty")), row.get("unit", ""),
+                 _number(row.get("cost")), _number(row.get("rec")), strain, run_id)
+                for row, strain in zip(rows, strains)
+            ],
+        )
+        conn.execute(
+            "INSERT INTO manifest_title (title, run_id, scraped_at, row_count)"
+            " VALUES (?, ?, ?, ?)"
+            " ON CONFLICT(title) DO UPDATE SET run_id = excluded.run_id,"
+            " scraped_at = excluded.scraped_at, row_count = excluded.row_count",
+            (title, run_id, _now(), len(rows)),
+        )
+
+
+def drop_missing(conn, titles):
+    """
+    Forget manifests that are no longer listed (already received). Returns
+    the count. An empty list is ignored: it means the scrape saw nothing.
+    """
+    if not titles:
+        return 0
+    listed = set(titles)
+    gone = [t for t in scraped_titles(conn) if t not in listed]
+    with conn:
+        conn.executemany("DELETE FROM active_manifest WHERE title = ?", [(t,) for t in gone])
+        conn.executemany("DELETE FROM manifest_title WHERE title = ?", [(t,) for t in gone])
+    return len(gone)
+
+
+def scraped_titles(conn):
+    """Titles already scraped, in the order they were first seen."""
+    cur = conn.execute("SELECT title FROM manifest_title ORDER BY rowid")
+    return [row[0] for row in cur.fetchall()]
+
+
+def load_manifests(conn):
+    """
+    Stored manifests as {title: rows}, rows shaped like the scraper's
+    ({'name', 'qty', 'unit', 'cost', 'rec'}), without touching the browser.
+    """
+    results = {title: [] for title in scraped_titles(conn)}
+    cur = conn.execute(
+        "SELECT title, metrc_name, qty, unit, cost, retail FROM active_manifest"
+        " ORDER BY rowid"
+    )
+    for title, name, qty, unit, cost, retail in cur.fetchall():
+        results.setdefault(title, []).append({
+            "name": name or "", "qty": _text(qty), "unit": unit or "",
+            "cost": _text(cost), "rec": _text(retail),
+        })
+    return results
@@ -0,0 +1,324 @@
+# ── intake-manager/data/pricing.py ────────────────────────────────────
+"""
+Markup rules and column-wise repricing of master_product and manifests.
+
+A pricing_rule sets retail = cost * markup, rounded up to a multiple of
+round_to. A rule can be limited to a Dutchie vendor, a category, a room
+and a weight tier [min_grams, max_grams); NULL fields match anything.
+The weight comes from the product name ("3.5g", "28 g", "1oz", "1/8").
+When several rules match a product, the one with the most conditions
+wins, and among equals the newest.
+
+Rules are matched against whole NumPy columns at once, one pass per rule,
+so a catalog of 100k products reprices in a fraction of a second.
+reprice() returns the differences only, for preview; apply_repricing()
+writes them in one transaction.
+"""
+import math
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+
+import numpy as np
+
+RULE_FIELDS = ("dutchie_vendor", "category", "room")
+RULE_COLUMNS = ("id",) + RULE_FIELDS + ("min_grams", "max_grams", "markup", "round_to")
+GRAMS_PER_OUNCE = 28.0
+
+# Matched against lower-cased names; the leading lookahead lets the regex
+# engine skip ahead to digits
+_WEIGHT = re.compile(
+    r"(?=\d)(?:(?<![\d.])(\d+(?:\.\d+)?)\s*(g|grams?|oz|ounces?)\b"
+    r"|(?<![\d/])([1-7])/(2|4|8)(?![\d/]))"
+)
+
+
+# ── rules ────────────────────────────────────────────────────────────
+def load_rules(conn):
+    """Every pricing rule as a dict, oldest first."""
+    cur = conn.execute(f"SELECT {', '.join(RULE_COLUMNS)} FROM pricing_rule ORDER BY id")
+    return [dict(zip(RULE_COLUMNS, row)) for row in cur.fetchall()]
+
+
+def add_rule(conn, markup, dutchie_vendor=None, category=None, room=None,
+             min_grams=None, max_grams=None, round_to=0.01):
+    """Store a rule; returns its id."""
+    if not markup or markup <= 0:
+        raise ValueError("markup must be positive")
+    if not round_to or round_to <= 0:
+        raise ValueError("round_to must be positive")
+    with conn:
+        cur = conn.execute(
+            "INSERT INTO pricing_rule (dutchie_vendor, category, room, min_grams, max_grams,"
+            " markup, round_to) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (dutchie_vendor or None, category or None, room or None,
+             min_grams, max_grams, markup, round_to),
+        )
+    return cur.lastrowid
+
+
+def delete_rule(conn, rule_id):
+    """Remove a rule; returns False if there was none with that id."""
+    with conn:
+        return conn.execute("DELETE FROM pricing_rule WHERE id = ?", (rule_id,)).rowcount > 0
+
+
+# ── columns ──────────────────────────────────────────────────────────
+# Bounded, so a long-running GUI doesn't keep every name it has ever priced;
+# whole columns go through grams_column(), which dedupes per call
+@lru_cache(maxsize=4096)
+def parse_grams(name):
+    """Weight in grams named in a product name, or NaN ('Gelato 3.5g' -> 3.5)."""
+    return _grams(_WEIGHT.search((name or "").lower()))
+
+
+def _grams(match):
+    if not match:
+        return math.nan
+    amount, unit, numerator, denominator = match.groups()
+    if amount:
+        return float(amount) * GRAMS_PER_OUNCE if unit.startswith("o") else float(amount)
+    return int(numerator) / int(denominator) * GRAMS_PER_OUNCE
+
+
+def grams_column(names):
+    """
+    parse_grams() of every name as a float array. Each distinct name is
+    parsed once, and all of them in a single regex pass over the joined names.
+    """
+    index = {}
+    inverse = np.fromiter((index.setdefault((name or "").lower(), len(index)) for name in names),
+                          np.intp, len(names))
+    unique = list(index)
+    lengths = np.fromiter(map(len, unique), np.int64, len(unique)) + 1
+    starts = np.cumsum(lengths) - lengths
+    # No match can span the NUL between two names
+    matches = list(_WEIGHT.finditer("\0".join(unique)))
+    grams = np.full(len(unique), math.nan)
+    if matches:
+        rows = np.searchsorted(starts, [m.start() for m in matches], "right") - 1
+        first = np.flatnonzero(np.diff(rows, prepend=-1))  # a name's first weight wins
+        grams[rows[first]] = [_grams(matches[i]) for i in first.tolist()]
+    return grams[inverse]
+
+
+def _number(value):
+    """A float from a number or price text ('$1,234.50'), NaN if there is none."""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        pass
+    try:
+        return float(str(value).replace("$", "").replace(",", ""))
+    except ValueError:
+        return math.nan
+
+
+def _floats(values):
+    """Float column; blanks, text and non-positive prices become NaN."""
+    try:
+        column = np.array(values, float)  # None -> NaN
+    except (TypeError, ValueError):
+        column = np.fromiter(map(_number, values), float, len(values))
+    column[~(column > 0)] = math.nan
+    return column
+
+
+def _codes(values, vocabulary):
+    """Each value's index in `vocabulary` (case-insensitive), -1 if absent."""
+    # Columns repeat a handful of values: look each distinct one up once
+    codes = {v: vocabulary.get((v or "").lower(), -1) for v in set(values)}
+    return np.fromiter(map(codes.__getitem__, values), np.int32, len(values))
+
+
+# ── engine ───────────────────────────────────────────────────────────
+def _has_tier(rule):
+    return rule["min_grams"] is not None or rule["max_grams"] is not None
+
+
+def match_rules(rules, vendors, categories, rooms, names):
+    """
+    Index into `rules` of each item's winning rule, -1 where none matches.
+    Weights are parsed only from the names of items whose vendor, category
+    and room a weight-tier rule accepts.
+    """
+    n = len(names)
+    columns = {}
+    for field, values in zip(RULE_FIELDS, (vendors, categories, rooms)):
+        vocabulary = {}
+        for rule in rules:
+            if rule[field]:
+                vocabulary.setdefault(rule[field].lower(), len(vocabulary))
+        columns[field] = (vocabulary, _codes(values, vocabulary) if vocabulary else None)
+
+    masks = []
+    for rule in rules:
+        mask = np.ones(n, bool)
+        for field in RULE_FIELDS:
+            if rule[field]:
+                vocabulary, codes = columns[field]
+                mask &= codes == vocabulary[rule[field].lower()]
+        masks.append(mask)
+
+    grams = np.full(n, math.nan)
+    tiered = [mask for rule, mask in zip(rules, masks) if _has_tier(rule)]
+    if tiered:
+        weighed = np.flatnonzero(np.logical_or.reduce(tiered))
+        grams[weighed] = grams_column([names[i] for i in weighed.tolist()])
+
+    best = np.full(n, -1, np.int32)
+    best_score = np.full(n, -1, np.int8)
+    with np.errstate(invalid="ignore"):  # NaN weights never match a tier
+        for index, (rule, mask) in enumerate(zip(rules, masks)):
+            score = sum(1 for field in RULE_FIELDS if rule[field])
+            if _has_tier(rule):
+                score += 1
+                if rule["min_grams"] is not None:
+                    mask &= grams >= rule["min_grams"]
+                if rule["max_grams"] is not None:
+                    mask &= grams < rule["max_grams"]
+            # Rules come oldest first, so a newer rule wins a tie
+            take = mask & (best_score <= score)
+            best[take] = index
+            best_score[take] = score
+    return best
+
+
+def price_items(rules, costs, names, vendors, categories, rooms):
+    """
+    Retail price of every item from its best rule, as a float array (NaN
+    where no rule matches or the cost is missing), and the id of that rule
+    (-1 for none). All arguments but `rules` are equal-length sequences.
+    """
+    costs = _floats(costs)
+    best = match_rules(rules, vendors, categories, rooms, names)
+    # One extra slot of NaN for "no rule"
+    markup = np.array([r["markup"] for r in rules] + [math.nan])
+    step = np.array([r["round_to"] for r in rules] + [math.nan])
+    ids = np.array([r["id"] for r in rules] + [-1])
+    # Round up to the step; the inner round absorbs float error (2.2 * 10 = 22.000000000000004)
+    raw = costs * markup[best]
+    retail = np.round(np.ceil(np.round(raw / step[best], 6)) * step[best], 2)
+    return retail, ids[best]
+
+
+# ── master_product ───────────────────────────────────────────────────
+@dataclass
+class Repricing:
+    """Products whose retail price the rules would change (parallel columns)."""
+    rowid: np.ndarray
+    dutchie_vendor: list
+    catalog_name: list
+    cost: np.ndarray
+    old_retail: np.ndarray
+    new_retail: np.ndarray
+    rule_id: np.ndarray
+    stored_retail: list  # retail exactly as read, to detect edits before applying
+    priced: int  # products a rule applied to, changed or not
+
+    def __len__(self):
+        return len(self.rowid)
+
+    def rows(self, limit=None):
+        """The changes as dicts, largest price change first (for a preview)."""
+        delta = np.abs(np.nan_to_num(self.new_retail - self.old_retail, nan=np.inf))
+        order = np.argsort(-delta, kind="stable")[:limit]
+        return [{
+            "rowid": int(self.rowid[i]),
+            "dutchie_vendor": self.dutchie_vendor[i],
+            "catalog_name": self.catalog_name[i],
+            "cost": float(self.cost[i]),
+            "old_retail": None if math.isnan(self.old_retail[i]) else float(self.old_retail[i]),
+            "new_retail": float(self.new_retail[i]),
+            "rule_id": int(self.rule_id[i]),
+        } for i in order]
+
+
+def reprice(conn, vendor=None, rules=None):
+    """
+    The retail changes the pricing rules (or `rules`) make to master_product,
+    or to one Dutchie vendor's products. Nothing is written.
+    """
+    rules = load_rules(conn) if rules is None else rules
+    query = ("SELECT rowid, dutchie_vendor, COALESCE(NULLIF(catalog_name, ''), metrc_name),"
+             " category, room, cost, retail FROM master_product")
+    params = ()
+    if vendor:
+        query += " WHERE dutchie_vendor = ? COLLATE NOCASE"
+        params = (vendor,)
+    rows = conn.execute(query, params).fetchall()
+    empty = np.empty(0)
+    if not rows or not rules:
+        return Repricing(np.empty(0, np.int64), [], [], empty, empty, empty,
+                         np.empty(0, np.int64), [], 0)
+
+    rowid, vendors, names, categories, rooms, costs, retails = zip(*rows)
+    new, rule_ids = price_items(rules, costs, names, vendors, categories, rooms)
+    old = _floats(retails)
+    priced = ~np.isnan(new)
+    changed = priced & (np.isnan(old) | (np.abs(new - old) >= 0.005))
+    index = np.flatnonzero(changed)
+    return Repricing(
+        rowid=np.array(rowid, np.int64)[index],
+        dutchie_vendor=[vendors[i] for i in index],
+        catalog_name=[names[i] for i in index],
+        cost=_floats(costs)[index],
+        old_retail=old[index],
+        new_retail=new[index],
+        rule_id=rule_ids[index],
+        stored_retail=[retails[i] for i in index],
+        priced=int(priced.sum()),
+    )
+
+
+def apply_repricing(conn, repricing):
+    """
+    Write a Repricing in one transaction. A row whose retail was edited
+    since the preview is left alone. Returns the number of rows updated.
+    """
+    if not len(repricing):
+        return 0
+    with conn:
+        cur = conn.executemany(
+            "UPDATE master_product SET retail = ? WHERE rowid = ? AND retail IS ?",
+            zip(repricing.new_retail.tolist(), repricing.rowid.tolist(), repricing.stored_retail),
+        )
+    return cur.rowcount
+
+
+# ── manifests ────────────────────────────────────────────────────────
+def price_manifest(conn, items, dutchie_vendor="", resolved=None, rules=None):
+    """
+    Suggested retail (float or None) for each scraped manifest row, from its
+    unit cost and the product it resolved to (category and room, when known).
+    """
+    from data.resolver import resolve_products
+
+    rules = load_rules(conn) if rules is None else rules
+    if not items or not rules:
+        return [None] * len(items)
+    names = [itm.get("name", "") for itm in items]
+    resolved = resolved or resolve_products(conn, names)
+    categories = _categories(conn, [p.catalog_name for p in resolved if p.matched], dutchie_vendor)
+    retail, _ = price_items(
+        rules,
+        [itm.get("cost") for itm in items],
+        [p.catalog_name or p.metrc_name for p in resolved],
+        [dutchie_vendor] * len(items),
+        [categories.get(p.catalog_name) for p in resolved],
+        [p.room for p in resolved],
+    )
+    return [None if math.isnan(v) else v for v in retail.tolist()]
+
+
+def _categories(conn, catalog_names, dutchie_vendor):
+    """{catalog_name: category} for a vendor's products."""
+    if not catalog_names:
+        return {}
+    cur = conn.execute(
+        "SELECT catalog_name, category FROM master_product"
+        " WHERE dutchie_vendor = ? COLLATE NOCASE AND category IS NOT NULL",
+        (dutchie_vendor,),
+    )
+    wanted = set(catalog_names)
+    return {name: category for name, category in cur.fetchall() if name in wanted}
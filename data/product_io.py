@@ -0,0 +1,296 @@
+# ── intake-manager/data/product_io.py ─────────────────────────────────
+"""
+Bulk import and export of master_product as CSV or XLSX.
+
+Files are streamed in chunks of CHUNK_SIZE rows: each chunk is validated,
+normalized, loaded into a temporary table with executemany and upserted
+with one INSERT ... ON CONFLICT in its own transaction, so memory stays
+flat whatever the file size. Rows are keyed like the unique index on
+(dutchie_vendor, catalog_name, metrc_name).
+
+XLSX support needs openpyxl (pip install openpyxl); CSV needs nothing extra.
+"""
+import csv
+import math
+import os
+import re
+from itertools import islice
+
+CHUNK_SIZE = 5000
+# Keep at most this many row errors in an import report
+MAX_ERRORS = 100
+
+COLUMNS = (
+    "metrc_name", "catalog_name", "cost", "retail", "room",
+    "metrc_vendor", "dutchie_vendor", "category", "strain_name",
+)
+KEY = ("dutchie_vendor", "catalog_name", "metrc_name")
+# Key columns a row can't do without; a blank metrc_name is stored as ''
+REQUIRED = ("dutchie_vendor", "catalog_name")
+VALUES = tuple(c for c in COLUMNS if c not in KEY)
+PRICE_COLUMNS = ("cost", "retail")
+
+# Accepted header spellings (after lower-casing and _ for spaces/dashes)
+ALIASES = {
+    "metrc": "metrc_name", "metrc_product": "metrc_name", "metrc_product_name": "metrc_name",
+    "catalog": "catalog_name", "product_name": "catalog_name", "name": "catalog_name",
+    "unit_cost": "cost", "price": "retail", "retail_price": "retail", "rec_price": "retail",
+    "vendor": "dutchie_vendor", "strain": "strain_name",
+}
+
+_PRICE_JUNK = re.compile(r"[$,\s]")
+
+
+class ImportReport(dict):
+    """Counts of an import: inserted, updated, unchanged, skipped, plus errors."""
+
+    def __init__(self):
+        super().__init__(inserted=0, updated=0, unchanged=0, skipped=0, errors=[])
+
+    def error(self, line, message):
+        self["skipped"] += 1
+        if len(self["errors"]) < MAX_ERRORS:
+            self["errors"].append((line, message))
+
+
+# ── reading ──────────────────────────────────────────────────────────
+def _header_key(name):
+    key = "_".join(str(name or "").lower().replace("-", " ").split())
+    return ALIASES.get(key, key)
+
+
+def _iter_csv(path):
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        yield from csv.reader(f)
+
+
+def _iter_xlsx(path):
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise ImportError("Reading .xlsx files needs openpyxl: pip install openpyxl") from None
+    wb = load_workbook(path, read_only=True, data_only=True)
+    try:
+        yield from wb.worksheets[0].iter_rows(values_only=True)
+    finally:
+        wb.close()
+
+
+def _is_xlsx(path):
+    return os.path.splitext(path)[1].lower() in (".xlsx", ".xlsm")
+
+
+def read_rows(path):
+    """
+    Yield (line number, {column: raw value}) for every data row of a CSV or
+    XLSX file, mapping header names onto COLUMNS. Unknown columns are ignored.
+    """
+    rows = _iter_xlsx(path) if _is_xlsx(path) else _iter_csv(path)
+    header = next(rows, None)
+    if header is None:
+        return
+    columns = [(i, key) for i, key in enumerate(map(_header_key, header)) if key in COLUMNS]
+    if not {"metrc_name", "catalog_name"} <= {key for _, key in columns}:
+        raise ValueError(f"{path}: header needs at least metrc_name and catalog_name columns")
+    for line, row in enumerate(rows, start=2):
+        if not row or all(v is None or str(v).strip() == "" for v in row):
+            continue
+        yield line, {key: row[i] if i < len(row) else None for i, key in columns}
+
+
+# ── validation ───────────────────────────────────────────────────────
+def _text(value):
+    return " ".join(str(value).split()) if value is not None else ""
+
+
+def _key_text(value):
+    """Key columns keep their inner spacing, which has to match the catalog's."""
+    return str(value).strip() if value is not None else ""
+
+
+def _price(value):
+    """A non-negative price rounded to cents, or None when blank."""
+    if value is None or isinstance(value, (int, float)):
+        price = value
+    else:
+        text = _PRICE_JUNK.sub("", str(value))
+        if not text:
+            return None
+        price = float(text)  # ValueError for anything non-numeric
+    if price is not None and not (math.isfinite(price) and price >= 0):
+        raise ValueError("not a price")
+    return None if price is None else round(float(price), 2)
+
+
+def _canonical(known, value):
+    """Spell `value` like an existing room/category that differs only in case."""
+    if not value:
+        return None
+    return known.setdefault(value.lower(), value)
+
+
+def _known_values(conn, column):
+    cur = conn.execute(
+        f"SELECT DISTINCT {column} FROM master_product WHERE {column} IS NOT NULL AND {column} != ''"
+    )
+    return {value.lower(): value for (value,) in cur.fetchall()}
+
+
+def normalize(raw, rooms, categories, default_vendor=""):
+    """
+    Validated master_product values (a tuple in COLUMNS order) from one raw
+    row; raises ValueError with the reason a row is unusable.
+    """
+    row = {c: (_key_text if c in KEY else _text)(raw.get(c)) for c in COLUMNS if c not in PRICE_COLUMNS}
+    row["dutchie_vendor"] = row["dutchie_vendor"] or default_vendor
+    for column in REQUIRED:
+        if not row[column]:
+            raise ValueError(f"missing {column}")
+    for column in PRICE_COLUMNS:
+        try:
+            row[column] = _price(raw.get(column))
+        except ValueError:
+            raise ValueError(f"bad {column} {raw.get(column)!r}") from None
+    row["room"] = _canonical(rooms, row["room"])
+    row["category"] = _canonical(categories, row["category"])
+    for column in ("metrc_vendor", "strain_name"):
+        row[column] = row[column] or None
+    return tuple(row[c] for c in COLUMNS)
+
+
+# ── import ───────────────────────────────────────────────────────────
+_MATCH = " AND ".join(f"m.{c} = i.{c}" for c in KEY)
+
+
+def _comparable(ref, column):
+    """SQL for `ref` as normalize() would store it, so blanks and unrounded prices compare equal."""
+    if column in PRICE_COLUMNS:
+        return f"ROUND(NULLIF({ref}, ''), 2)"
+    return f"COALESCE({ref}, '')"
+
+
+def _differs(old, new, columns):
+    return " OR ".join(
+        f"{_comparable(f'{old}.{c}', c)} IS NOT {_comparable(f'{new}.{c}', c)}" for c in columns
+    ) or "false"
+
+
+def _upsert_chunk(conn, rows, columns, report):
+    """
+    Upsert one chunk of normalized rows in a single transaction. Existing
+    rows only get the value `columns` (those in the file) updated.
+    """
+    if columns:
+        update = (f"DO UPDATE SET {', '.join(f'{c} = excluded.{c}' for c in columns)}"
+                  f" WHERE {_differs('master_product', 'excluded', columns)}")
+    else:
+        update = "DO NOTHING"
+    with conn:
+        conn.execute("DELETE FROM temp.product_import")
+        conn.executemany(
+            f"INSERT INTO temp.product_import ({', '.join(COLUMNS)})"
+            f" VALUES ({', '.join('?' * len(COLUMNS))})",
+            rows,
+        )
+        inserted, updated = conn.execute(f"""
+            SELECT
+                SUM(NOT EXISTS (SELECT 1 FROM master_product m WHERE {_MATCH})),
+                SUM(EXISTS (SELECT 1 FROM master_product m WHERE {_MATCH}
+                            AND ({_differs('m', 'i', columns)})))
+            FROM temp.product_import i
+        """).fetchone()
+        conn.execute(f"""
+            INSERT INTO master_product ({', '.join(COLUMNS)})
+            SELECT {', '.join(COLUMNS)} FROM temp.product_import WHERE true
+            ON CONFLICT ({', '.join(KEY)}) {update}
+        """)
+    report["inserted"] += inserted or 0
+    report["updated"] += updated or 0
+    report["unchanged"] += len(rows) - (inserted or 0) - (updated or 0)
+
+
+def import_products(conn, path, default_vendor="", chunk_size=CHUNK_SIZE):
+    """
+    Stream a CSV/XLSX file into master_product. Rows need a catalog_name
+    and a Dutchie vendor (or `default_vendor`); cost and retail
+    may carry $ signs and thousands separators. A later row with the same
+    key wins over an earlier one; columns the file lacks are left as they
+    are on existing rows. Returns the ImportReport.
+    """
+    report = ImportReport()
+    rooms = _known_values(conn, "room")
+    categories = _known_values(conn, "category")
+    conn.execute(
+        f"CREATE TEMP TABLE IF NOT EXISTS product_import ({', '.join(COLUMNS)})"
+    )
+    rows = read_rows(path)
+    try:
+        while True:
+            batch = list(islice(rows, chunk_size))
+            if not batch:
+                break
+            # Every row has the header's columns
+            columns = [c for c in VALUES if c in batch[0][1]]
+            chunk = {}
+            for line, raw in batch:
+                try:
+                    values = normalize(raw, rooms, categories, default_vendor)
+                except ValueError as e:
+                    report.error(line, str(e))
+                    continue
+                key = tuple(values[COLUMNS.index(c)] for c in KEY)
+                if key in chunk:
+                    report["skipped"] += 1  # superseded by this later row
+                chunk[key] = values
+            if chunk:
+                _upsert_chunk(conn, list(chunk.values()), columns, report)
+    finally:
+        rows.close()
+        conn.execute("DROP TABLE IF EXISTS temp.product_import")
+    return report
+
+
+# ── export ───────────────────────────────────────────────────────────
+def iter_products(conn, vendor=None, chunk_size=CHUNK_SIZE):
+    """Yield master_product rows (tuples in COLUMNS order), optionally for one Dutchie vendor."""
+    query = f"SELECT {', '.join(COLUMNS)} FROM master_product"
+    params = ()
+    if vendor:
+        query += " WHERE dutchie_vendor = ?"
+        params = (vendor,)
+    cur = conn.cursor()
+    cur.execute(query + " ORDER BY dutchie_vendor, catalog_name, metrc_name", params)
+    while True:
+        rows = cur.fetchmany(chunk_size)
+        if not rows:
+            return
+        yield from rows
+
+
+def export_products(conn, path, vendor=None):
+    """
+    Write master_product (or one Dutchie vendor's rows) to a CSV or XLSX
+    file with a COLUMNS header, in a form import_products() reads back.
+    Returns the number of rows written.
+    """
+    count = 0
+    if _is_xlsx(path):
+        try:
+            from openpyxl import Workbook
+        except ImportError:
+            raise ImportError("Writing .xlsx files needs openpyxl: pip install openpyxl") from None
+        wb = Workbook(write_only=True)
+        ws = wb.create_sheet("master_product")
+        ws.append(COLUMNS)
+        for row in iter_products(conn, vendor):
+            ws.append(row)
+            count += 1
+        wb.save(path)
+    else:
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(COLUMNS)
+            for row in iter_products(conn, vendor):
+                writer.writerow(row)
+                count += 1
+    return count
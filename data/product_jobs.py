@@ -0,0 +1,149 @@
+# ── intake-manager/data/product_jobs.py ───────────────────────────────
+"""
+Persistent job records for bulk product creation.
+
+Each product in a batch has one row in product_job whose status moves from
+'pending' to 'running' to 'done' or 'failed', so an interrupted batch can be
+resumed without re-creating products that already succeeded. last_step
+checkpoints how far the current attempt got through the product form.
+"""
+import csv
+from datetime import datetime
+
+from data.manifests import strains_for
+
+
+def _now():
+    return datetime.now().isoformat(timespec="seconds")
+
+
+def enqueue(conn, batch, products):
+    """
+    Add products (dicts with name/retail/cost/strain/vendor) to `batch`.
+    Products already in the batch keep their current status.
+    Returns the number of newly added jobs.
+    """
+    cur = conn.cursor()
+    before = conn.total_changes
+    cur.executemany(
+        """
+        INSERT OR IGNORE INTO product_job
+            (batch, product_name, retail, cost, strain, vendor, updated_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+        """,
+        [
+            (batch, p["name"], p["retail"], p["cost"], p["strain"], p["vendor"], _now())
+            for p in products
+        ],
+    )
+    conn.commit()
+    return conn.total_changes - before
+
+
+def unfinished_jobs(conn, batch):
+    """Jobs in `batch` that have not succeeded yet, in insertion order."""
+    cur = conn.cursor()
+    cur.execute(
+        """
+        SELECT product_name, retail, cost, strain, vendor, status, last_step
+        FROM product_job
+        WHERE batch = ? AND status != 'done'
+        ORDER BY rowid
+        """,
+        (batch,),
+    )
+    return [
+        {"name": n, "retail": r, "cost": c, "strain": s, "vendor": v,
+         "status": st, "last_step": ls}
+        for n, r, c, s, v, st, ls in cur.fetchall()
+    ]
+
+
+def mark(conn, batch, product_name, status, error=None):
+    """
+    Record a job's new status; 'running' starts a new attempt (counted, with
+    its step checkpoint cleared).
+    """
+    conn.execute(
+        """
+        UPDATE product_job
+        SET status = ?, error = ?, updated_at = ?,
+            attempts = attempts + (? = 'running'),
+            last_step = CASE WHEN ? = 'running' THEN NULL ELSE last_step END
+        WHERE batch = ? AND product_name = ?
+        """,
+        (status, error, _now(), status, status, batch, product_name),
+    )
+    conn.commit()
+
+
+def mark_step(conn, batch, product_name, step):
+    """Checkpoint the last form step the job's current attempt completed."""
+    conn.execute(
+        "UPDATE product_job SET last_step = ?, updated_at = ?"
+        " WHERE batch = ? AND product_name = ?",
+        (step, _now(), batch, product_name),
+    )
+    conn.commit()
+
+
+def summary(conn, batch):
+    """{status: count} for `batch`."""
+    cur = conn.cursor()
+    cur.execute(
+        "SELECT status, COUNT(*) FROM product_job WHERE batch = ? GROUP BY status",
+        (batch,),
+    )
+    return dict(cur.fetchall())
+
+
+def products_from_csv(path):
+    """
+    Read products from a CSV with a header row of
+    name, retail, cost, strain, vendor.
+    """
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        reader = csv.DictReader(f)
+        return [
+            {key: (row.get(key) or "").strip()
+             for key in ("name", "retail", "cost", "strain", "vendor")}
+            for row in reader
+            if (row.get("name") or "").strip()
+        ]
+
+
+def products_from_manifest(conn, manifest=None):
+    """
+    Unresolved active_manifest rows (no master_product match), named by their
+    METRC name and mapped to their Dutchie vendor through vendor_names.
+    """
+    cur = conn.cursor()
+    query = """
+        SELECT am.metrc_name,
+               am.retail, am.cost, am.strain,
+               COALESCE(
+                   (SELECT vn.dutchie_vendor FROM vendor_names vn
+                    WHERE vn.metrc_vendor = am.metrc_vendor LIMIT 1),
+                   am.metrc_vendor
+               )
+        FROM active_manifest am
+        WHERE NOT EXISTS (
+            SELECT 1 FROM master_product mp WHERE mp.metrc_name = am.metrc_name
+        )
+    """
+    params = ()
+    if manifest:
+        query += " AND am.manifest = ?"
+        params = (manifest,)
+    cur.execute(query + " ORDER BY am.rowid", params)
+    products = {}
+    for name, retail, cost, strain, vendor in cur.fetchall():
+        products.setdefault(name, {
+            "name": name, "retail": retail, "cost": cost,
+            "strain": strain or "", "vendor": vendor or "",
+        })
+    # Rows saved before strains were stored have none
+    missing = [p for p in products.values() if not p["strain"]]
+    for product, strain in zip(missing, strains_for(conn, [p["name"] for p in missing])):
+        product["strain"] = strain
+    return list(products.values())
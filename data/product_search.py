@@ -0,0 +1,98 @@
+# ── intake-manager/data/product_search.py ─────────────────────────────
+"""
+Fuzzy matching of METRC product names against master_product.
+
+Candidates come from the product_search FTS5 index (any shared word), then
+are re-ranked by trigram similarity so near-misses such as
+"Bruce Banner Flower (Sunlight)" vs "Bruce Banner - Flower" score highly.
+"""
+import re
+from dataclasses import dataclass
+
+# FTS candidates fetched per lookup before re-ranking
+CANDIDATES = 50
+# Suggestions scoring below this are dropped
+MIN_SCORE = 0.3
+
+_WORD = re.compile(r"[^\W_]+")
+
+
+@dataclass
+class Suggestion:
+    catalog_name: str
+    metrc_name: str
+    dutchie_vendor: str
+    score: float
+
+
+def _normalize(text):
+    return " ".join(_WORD.findall((text or "").lower()))
+
+
+def _trigrams(text):
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _jaccard(ta, tb):
+    if not ta or not tb:
+        return 0.0
+    return len(ta & tb) / len(ta | tb)
+
+
+def similarity(a, b):
+    """Jaccard similarity of the two names' trigrams (0..1)."""
+    return _jaccard(_trigrams(_normalize(a)), _trigrams(_normalize(b)))
+
+
+def _match_query(name):
+    # Quote each word so punctuation can't break the FTS query syntax;
+    # the trigram tokenizer needs at least three characters per term.
+    words = {w for w in _WORD.findall(name.lower()) if len(w) >= 3}
+    return " OR ".join(f'"{w}"' for w in sorted(words))
+
+
+def suggest(conn, name, limit=5, min_score=MIN_SCORE):
+    """Ranked master_product entries whose names resemble `name`."""
+    query = _match_query(name)
+    if not query:
+        return []
+    cur = conn.cursor()
+    cur.execute(
+        """
+        SELECT mp.catalog_name, mp.metrc_name, mp.dutchie_vendor
+        FROM product_search
+        JOIN master_product mp ON mp.rowid = product_search.rowid
+        WHERE product_search MATCH ?
+        ORDER BY bm25(product_search)
+        LIMIT ?
+        """,
+        (query, CANDIDATES),
+    )
+    target = _trigrams(_normalize(name))
+    best = {}
+    for catalog_name, metrc_name, vendor in cur.fetchall():
+        score = max(
+            _jaccard(target, _trigrams(_normalize(catalog_name))),
+            _jaccard(target, _trigrams(_normalize(metrc_name))),
+        )
+        key = (catalog_name, vendor)
+        if score >= min_score and (key not in best or score > best[key].score):
+            best[key] = Suggestion(catalog_name, metrc_name or "", vendor or "", score)
+    return sorted(best.values(), key=lambda s: s.score, reverse=True)[:limit]
+
+
+def suggest_many(conn, names, min_score=MIN_SCORE):
+    """Best suggestion (or None) for each name, in input order."""
+    cache = {}
+    for name in names:
+        if name not in cache:
+            top = suggest(conn, name, limit=1, min_score=min_score)
+            cache[name] = top[0] if top else None
+    return [cache[name] for name in names]
+
+
+def rebuild_index(conn):
+    """Rebuild product_search from master_product (e.g. after a VACUUM)."""
+    conn.execute("INSERT INTO product_search (product_search) VALUES ('rebuild')")
+    conn.commit()
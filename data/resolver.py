@@ -0,0 +1,61 @@
+# ── intake-manager/data/resolver.py ───────────────────────────────────
+"""
+Resolve scraped METRC product names to catalog entries in master_product.
+"""
+from dataclasses import dataclass
+
+# Stay well under SQLite's host-parameter limit (999 on older builds).
+CHUNK_SIZE = 500
+
+
+@dataclass
+class ResolvedProduct:
+    metrc_name: str
+    catalog_name: str
+    cost: object
+    retail: object
+    room: str
+    strain: str
+    matched: bool
+
+
+def default_product(metrc_name):
+    """Fallback values for a METRC name with no master_product entry."""
+    return ResolvedProduct(
+        metrc_name=metrc_name,
+        catalog_name=metrc_name,
+        cost='',
+        retail='',
+        room="Back Room" if "Sample" in metrc_name else "Sales Floor",
+        strain="1Unit Item",
+        matched=False,
+    )
+
+
+def resolve_products(conn, metrc_names):
+    """
+    Resolve every name in `metrc_names` with one query per chunk of names.
+    Returns a list of ResolvedProduct in the same order as the input.
+    """
+    unique_names = list(dict.fromkeys(metrc_names))
+    found = {}
+    cur = conn.cursor()
+    for start in range(0, len(unique_names), CHUNK_SIZE):
+        chunk = unique_names[start:start + CHUNK_SIZE]
+        placeholders = ",".join("?" * len(chunk))
+        cur.execute(
+            f"""
+            SELECT metrc_name, catalog_name, cost, retail, room, strain_name
+            FROM master_product
+            WHERE metrc_name IN ({placeholders})
+            ORDER BY rowid
+            """,
+            chunk,
+        )
+        for metrc_name, catalog_name, cost, retail, room, strain in cur.fetchall():
+            # First match wins, as with the old per-row fetchone()
+            found.setdefault(metrc_name, ResolvedProduct(
+                metrc_name, catalog_name, cost, retail, room, strain, True
+            ))
+
+    return [found.get(name) or default_product(name) for name in metrc_names]
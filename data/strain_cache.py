@@ -0,0 +1,70 @@
+# ── intake-manager/data/strain_cache.py ───────────────────────────────
+"""
+Local mirror of the Dutchie strain list (the strains table).
+
+Filled by automation/strains.py's sync and by every strain it creates or
+edits; batch upserts diff against it so only missing or different strains
+are opened in the browser. Names compare case-insensitively, like Dutchie's
+search.
+"""
+from datetime import datetime
+
+
+def _now():
+    return datetime.now().isoformat(timespec="seconds")
+
+
+def strain_map(conn):
+    """{name.lower(): (name, abbreviation)} for every stored strain."""
+    cur = conn.cursor()
+    cur.execute("SELECT name, abbreviation FROM strains")
+    return {name.lower(): (name, abbr) for name, abbr in cur.fetchall()}
+
+
+def upsert_strains(conn, strains, synced_at=None):
+    """
+    Insert or refresh strains, given as dicts with 'name' and 'abbreviation'.
+    Returns how many rows were new or changed.
+    """
+    synced_at = synced_at or _now()
+    known = strain_map(conn)
+    changed = 0
+    for s in strains:
+        old = known.get(s["name"].lower())
+        if old != (s["name"], s["abbreviation"]):
+            changed += 1
+    with conn:
+        conn.executemany(
+            "INSERT INTO strains (name, abbreviation, synced_at) VALUES (?, ?, ?)"
+            " ON CONFLICT(name) DO UPDATE SET name = excluded.name,"
+            " abbreviation = excluded.abbreviation, synced_at = excluded.synced_at",
+            [(s["name"], s["abbreviation"], synced_at) for s in strains],
+        )
+    return changed
+
+
+def delete_not_synced_since(conn, synced_at):
+    """Drop strains a full sync did not see. Returns the count."""
+    with conn:
+        cur = conn.execute("DELETE FROM strains WHERE synced_at < ?", (synced_at,))
+    return cur.rowcount
+
+
+def diff_strains(conn, names):
+    """
+    The strains among `names` that need the browser: not stored yet, or
+    stored with a different spelling or abbreviation (the form sets name,
+    description and abbreviation all to the strain name). Blank and repeated
+    names are dropped; order is kept.
+    """
+    known = strain_map(conn)
+    todo, seen = [], set()
+    for name in names:
+        name = (name or "").strip()
+        key = name.lower()
+        if not name or key in seen:
+            continue
+        seen.add(key)
+        if known.get(key) != (name, name):
+            todo.append(name)
+    return todo
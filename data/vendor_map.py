@@ -0,0 +1,56 @@
+# ── intake-manager/data/vendor_map.py ─────────────────────────────────
+"""
+METRC → Dutchie vendor names (the vendor_names table), cached in memory.
+
+Both vendor tabs read through here; apply_changes() writes a delta in one
+transaction and drops the cache so the next read sees the new mapping.
+"""
+
+# id(conn) -> [(rowid, metrc_vendor, dutchie_vendor), ...]
+_cache = {}
+
+
+def vendor_rows(conn):
+    """Every mapping as (rowid, metrc_vendor, dutchie_vendor), in table order."""
+    key = id(conn)
+    if key not in _cache:
+        cur = conn.cursor()
+        cur.execute(
+            "SELECT rowid, metrc_vendor, dutchie_vendor FROM vendor_names ORDER BY rowid"
+        )
+        _cache[key] = cur.fetchall()
+    return list(_cache[key])
+
+
+def vendor_map(conn):
+    """{metrc_vendor: dutchie_vendor}; a later row wins for duplicate names."""
+    return {metrc: dutchie for _, metrc, dutchie in vendor_rows(conn)}
+
+
+def invalidate(conn=None):
+    """Forget cached mappings (for `conn`, or for every connection)."""
+    if conn is None:
+        _cache.clear()
+    else:
+        _cache.pop(id(conn), None)
+
+
+def apply_changes(conn, added=(), updated=(), removed=()):
+    """
+    Apply a delta to vendor_names in one transaction:
+    `added` (metrc, dutchie) pairs, `updated` (rowid, metrc, dutchie) rows and
+    `removed` rowids. Returns the number of rows written.
+    """
+    added, updated, removed = list(added), list(updated), list(removed)
+    with conn:
+        conn.executemany("DELETE FROM vendor_names WHERE rowid = ?", [(r,) for r in removed])
+        conn.executemany(
+            "UPDATE vendor_names SET metrc_vendor = ?, dutchie_vendor = ? WHERE rowid = ?",
+            [(metrc, dutchie, rowid) for rowid, metrc, dutchie in updated],
+        )
+        conn.executemany(
+            "INSERT INTO vendor_names (metrc_vendor, dutchie_vendor) VALUES (?, ?)",
+            added,
+        )
+    invalidate(conn)
+    return len(added) + len(updated) + len(removed)
@@ -0,0 +1,48 @@
+# ── intake-manager/gui/lazy_tab.py ───────────────────────────────────
+import importlib
+import time
+from PyQt5.QtWidgets import QWidget, QVBoxLayout
+from PyQt5.QtCore import QTimer, pyqtSignal
+
+
+class LazyTab(QWidget):
+    """
+    Placeholder page that imports and constructs the real tab the first time
+    it is shown, so startup only pays for the tab on screen.
+
+    `target` is "module:ClassName"; `args` are passed to the constructor.
+    """
+
+    built = pyqtSignal(QWidget)
+
+    def __init__(self, target, *args):
+        super().__init__()
+        self.target = target
+        self.args = args
+        self.widget = None
+        self.import_time = 0.0
+        self.init_time = 0.0
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        if self.widget is None:
+            # Let the window paint first, then build
+            QTimer.singleShot(0, self.ensure_built)
+
+    def ensure_built(self):
+        """Import and construct the tab now if it hasn't been yet."""
+        if self.widget is not None:
+            return self.widget
+        module_name, class_name = self.target.split(":")
+        start = time.perf_counter()
+        module = importlib.import_module(module_name)
+        self.import_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        self.widget = getattr(module, class_name)(*self.args)
+        self.init_time = time.perf_counter() - start
+        self.layout().addWidget(self.widget)
+        self.built.emit(self.widget)
+        return self.widget
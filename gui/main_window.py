@@ -2,15 +2,16 @@
 from PyQt5.QtWidgets import QMainWindow, QTabWidget
 from PyQt5.QtGui import QFont, QPalette, QColor
 from PyQt5.QtCore import Qt
-from gui.tabs.active_manifest import ActiveManifestTab
-from gui.tabs.vendor_products import VendorProductsTab
-from gui.tabs.vendor_names import VendorNamesTab
-from data.database import init_db
+from gui.lazy_tab import LazyTab
+from data.database import get_manager
 
 class ManifestManagerApp(QMainWindow):
     def __init__(self):
         super().__init__()
-        self.conn = init_db()
+        # The GUI reads (and saves edits) on its own connection; background
+        # workers write through the manager's writer thread.
+        self.db = get_manager()
+        self.conn = self.db.reader()
         self.setWindowTitle("Manifest Manager")
         self.resize(1600, 1200)
         font = QFont("Arial", 10)
@@ -22,12 +23,40 @@ class ManifestManagerApp(QMainWindow):
         self.init_ui()
 
     def init_ui(self):
+        # Each tab is imported, built and loaded the first time it is shown
         tabs = QTabWidget()
-        self.vendor_products_tab = VendorProductsTab(self.conn)
-        self.vendor_names_tab = VendorNamesTab(self.conn)
-
-        tabs.addTab(ActiveManifestTab(self.conn), "Active Manifest")
-        tabs.addTab(self.vendor_products_tab, "Vendor Products")
-        tabs.addTab(self.vendor_names_tab, "Vendor Name Matching")
+        self.pages = {
+            "Active Manifest": LazyTab("gui.tabs.active_manifest:ActiveManifestTab", self.conn, self.db),
+            "Vendor Products": LazyTab("gui.tabs.vendor_products:VendorProductsTab", self.conn),
+            "Vendor Name Matching": LazyTab("gui.tabs.vendor_names:VendorNamesTab", self.conn),
+        }
+        self.pages["Vendor Name Matching"].built.connect(
+            lambda tab: tab.mappings_saved.connect(self.on_mappings_saved)
+        )
+        for title, page in self.pages.items():
+            tabs.addTab(page, title)
 
         self.setCentralWidget(tabs)
+
+    @property
+    def active_manifest_tab(self):
+        return self.pages["Active Manifest"].widget
+
+    @property
+    def vendor_products_tab(self):
+        return self.pages["Vendor Products"].widget
+
+    @property
+    def vendor_names_tab(self):
+        return self.pages["Vendor Name Matching"].widget
+
+    def on_mappings_saved(self):
+        # A products tab that hasn't been opened yet will load fresh mappings anyway
+        if self.vendor_products_tab is not None:
+            self.vendor_products_tab.load_vendor_mappings()
+
+    def closeEvent(self, event):
+        # Let a background scrape finish its current manifest and release the browser
+        if self.active_manifest_tab is not None:
+            self.active_manifest_tab.stop_scrape()
+        super().closeEvent(event)
@@ -0,0 +1,169 @@
+# ── intake-manager/gui/models.py ─────────────────────────────────────
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex
+
+
+def _as_text(values):
+    return tuple("" if v is None else str(v) for v in values)
+
+
+class VendorProductModel(QAbstractTableModel):
+    """
+    Catalog entries of one Dutchie vendor, fetched from master_product a page
+    at a time as the view scrolls. Edits are tracked per row so saving only
+    writes the rows that actually changed.
+    """
+
+    HEADERS = ["METRC Name", "Catalog Name", "Cost", "Retail"]
+    EDITABLE = (0, 2, 3)
+    PRICE_COLUMNS = (2, 3)
+    PAGE_SIZE = 200
+
+    def __init__(self, conn, parent=None):
+        super().__init__(parent)
+        self.conn = conn
+        self.vendor = ""
+        self._rows = []       # current values: [metrc, catalog, cost, retail]
+        self._original = []   # values as loaded from the database
+        self._dirty = set()   # indexes of rows that differ from _original
+        self._exhausted = True
+
+    # ── loading ──────────────────────────────────────────────────────
+    def load(self, vendor):
+        """Show `vendor`'s products, starting with the first page."""
+        self.beginResetModel()
+        self.vendor = vendor
+        self._rows, self._original, self._dirty = [], [], set()
+        self._exhausted = not vendor
+        self.endResetModel()
+        if vendor:
+            self.fetchMore(QModelIndex())
+
+    def _fetch_page(self):
+        cur = self.conn.cursor()
+        cur.execute(
+            """
+            SELECT metrc_name, catalog_name, cost, retail
+            FROM master_product
+            WHERE dutchie_vendor = ?
+            GROUP BY catalog_name
+            ORDER BY catalog_name
+            LIMIT ? OFFSET ?
+            """,
+            (self.vendor, self.PAGE_SIZE, len(self._rows)),
+        )
+        return cur.fetchall()
+
+    def canFetchMore(self, parent):
+        return not parent.isValid() and not self._exhausted
+
+    def fetchMore(self, parent):
+        if parent.isValid() or self._exhausted:
+            return
+        page = self._fetch_page()
+        self._exhausted = len(page) < self.PAGE_SIZE
+        if not page:
+            return
+        start = len(self._rows)
+        self.beginInsertRows(QModelIndex(), start, start + len(page) - 1)
+        self._rows.extend(list(row) for row in page)
+        self._original.extend(tuple(row) for row in page)
+        self.endInsertRows()
+
+    # ── Qt model interface ──────────────────────────────────────────
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.HEADERS[section]
+        return super().headerData(section, orientation, role)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        if role in (Qt.DisplayRole, Qt.EditRole):
+            val = self._rows[index.row()][index.column()]
+            return "" if val is None else str(val)
+        if role == Qt.TextAlignmentRole:
+            return Qt.AlignCenter
+        return None
+
+    def flags(self, index):
+        flags = super().flags(index)
+        if index.column() in self.EDITABLE:
+            flags |= Qt.ItemIsEditable
+        return flags
+
+    def setData(self, index, value, role=Qt.EditRole):
+        if role != Qt.EditRole or index.column() not in self.EDITABLE:
+            return False
+        text = str(value).strip()
+        if index.column() in self.PRICE_COLUMNS:
+            try:
+                value = float(text) if text else None
+            except ValueError:
+                return False
+        else:
+            value = text
+        r = index.row()
+        self._rows[r][index.column()] = value
+        if self._changed(r):
+            self._dirty.add(r)
+        else:
+            self._dirty.discard(r)
+        self.dataChanged.emit(index, index, [Qt.DisplayRole, Qt.EditRole])
+        return True
+
+    # ── persistence ─────────────────────────────────────────────────
+    def _changed(self, row):
+        return _as_text(self._rows[row]) != _as_text(self._original[row])
+
+    def product_key(self, row):
+        """(metrc_name, catalog_name) of `row` as stored in the database."""
+        return self._original[row][:2]
+
+    def is_dirty(self):
+        return bool(self._dirty)
+
+    def save(self):
+        """Write changed rows in one transaction. Returns how many were saved."""
+        changes = [
+            (self._rows[r][0], self._rows[r][2], self._rows[r][3],
+             self._original[r][0], self._original[r][1], self.vendor)
+            for r in sorted(self._dirty)
+        ]
+        if not changes:
+            return 0
+        with self.conn:
+            self.conn.executemany(
+                """
+                UPDATE master_product
+                SET metrc_name = ?, cost = ?, retail = ?
+                WHERE metrc_name = ? AND catalog_name = ? AND dutchie_vendor = ?
+                """,
+                changes,
+            )
+        for r in self._dirty:
+            self._original[r] = tuple(self._rows[r])
+        self._dirty.clear()
+        return len(changes)
+
+    def delete_rows(self, rows):
+        """Delete the given rows from the database and the model."""
+        rows = sorted(set(rows), reverse=True)
+        with self.conn:
+            self.conn.executemany(
+                "DELETE FROM master_product"
+                " WHERE metrc_name = ? AND catalog_name = ? AND dutchie_vendor = ?",
+                [self.product_key(r) + (self.vendor,) for r in rows],
+            )
+        for r in rows:
+            self.beginRemoveRows(QModelIndex(), r, r)
+            del self._rows[r]
+            del self._original[r]
+            self.endRemoveRows()
+        # Row indexes shifted; recompute which rows are dirty
+        self._dirty = {r for r in range(len(self._rows)) if self._changed(r)}
@@ -0,0 +1,66 @@
+# ── intake-manager/gui/startup_profile.py ────────────────────────────
+"""
+Startup timing for `python main.py --profile-startup`.
+
+Records how long each newly imported module took (including the modules it
+imported in turn) and the time to each startup milestone, then prints a
+report to stderr once the first tab has been built.
+"""
+import builtins
+import sys
+import time
+
+# Modules worth listing even when fast
+PACKAGES = ("gui", "data", "automation", "PyQt5", "selenium", "secrets", "dotenv")
+TOP_IMPORTS = 15
+
+
+class StartupProfiler:
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.marks = []
+        self.imports = {}   # module name -> inclusive import seconds
+        self._original_import = None
+
+    def install(self):
+        """Start timing imports of modules that are not loaded yet."""
+        original = self._original_import = builtins.__import__
+
+        def timed_import(name, globals=None, locals=None, fromlist=(), level=0):
+            if level or name in sys.modules:
+                return original(name, globals, locals, fromlist, level)
+            start = time.perf_counter()
+            try:
+                return original(name, globals, locals, fromlist, level)
+            finally:
+                self.imports.setdefault(name, time.perf_counter() - start)
+
+        builtins.__import__ = timed_import
+
+    def uninstall(self):
+        if self._original_import is not None:
+            builtins.__import__ = self._original_import
+            self._original_import = None
+
+    def mark(self, label):
+        self.marks.append((label, time.perf_counter() - self.start))
+
+    def report(self, window=None):
+        self.uninstall()
+        out = sys.stderr
+        print("[Startup] milestones (since launch):", file=out)
+        for label, elapsed in self.marks:
+            print(f"  {elapsed * 1000:8.1f} ms  {label}", file=out)
+
+        print("[Startup] slowest imports (inclusive):", file=out)
+        ranked = sorted(self.imports.items(), key=lambda kv: kv[1], reverse=True)
+        shown = [(n, t) for n, t in ranked if n.split(".")[0] in PACKAGES][:TOP_IMPORTS]
+        for name, seconds in shown:
+            print(f"  {seconds * 1000:8.1f} ms  {name}", file=out)
+
+        for title, page in getattr(window, "pages", {}).items():
+            state = "built" if page.widget is not None else "not built yet"
+            print(f"[Startup] tab {title!r}: import {page.import_time * 1000:.1f} ms, "
+                  f"init {page.init_time * 1000:.1f} ms ({state})", file=out)
+        loaded = [m for m in ("selenium", "automation.receive_inventory") if m in sys.modules]
+        print(f"[Startup] browser modules loaded: {', '.join(loaded) or 'none'}", file=out)
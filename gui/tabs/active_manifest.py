@@ -2,17 +2,31 @@
 from PyQt5.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QFormLayout,
     QComboBox, QLineEdit, QPushButton, QTableWidget,
-    QTableWidgetItem, QHeaderView
+    QTableWidgetItem, QHeaderView, QProgressBar, QCheckBox
 )
-from automation.receive_inventory import scrape_receive_inventory
+from PyQt5.QtCore import QThread
+import tracing
+from data import manifests, pricing, vendor_map
+from data.product_search import suggest_many
+from data.resolver import resolve_products
+from gui.workers import ScrapeWorker
 
 class ActiveManifestTab(QWidget):
-    def __init__(self, conn):
+    def __init__(self, conn, db):
         super().__init__()
         self.conn = conn
+        self.db = db                # ConnectionManager; scrape writes go through it
         self.scraped_results = {}
+        self.scrape_thread = None
+        self.scrape_worker = None
+        self.scrape_run = None      # scrape_run id of the scrape in progress
+        self._listed = []
+        self._skipped = set()
+        self._scraped = 0
+        self._scrape_status = "done"
         self._build_ui()
         self._connect_signals()
+        self.load_saved()
 
     def _build_ui(self):
         layout = QVBoxLayout(self)
@@ -39,93 +53,181 @@ class ActiveManifestTab(QWidget):
         btnLayout = QHBoxLayout()
         self.retrieveButton = QPushButton("Scrape Manifests from Dutchie")
         btnLayout.addWidget(self.retrieveButton)
+        self.diffCheck = QCheckBox("New manifests only")
+        self.diffCheck.setToolTip("Skip manifests already scraped in an earlier run")
+        btnLayout.addWidget(self.diffCheck)
+        self.scrapeProgress = QProgressBar()
+        self.scrapeProgress.setVisible(False)
+        btnLayout.addWidget(self.scrapeProgress)
+        self.cancelButton = QPushButton("Cancel")
+        self.cancelButton.setEnabled(False)
+        btnLayout.addWidget(self.cancelButton)
         layout.addLayout(btnLayout)
 
-        self.overviewTable = QTableWidget(0, 11)
+        self.overviewTable = QTableWidget(0, 12)
         self.overviewTable.setHorizontalHeaderLabels([
             "Title", "Manifest", "License", "METRC Vendor", "Received Date",
-            "METRC Name", "Qty", "Cost", "Retail", "Room", "Strain"
+            "METRC Name", "Qty", "Cost", "Retail", "Room", "Strain", "Suggestion"
         ])
         self.overviewTable.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
         layout.addWidget(self.overviewTable)
 
     def _connect_signals(self):
         self.retrieveButton.clicked.connect(self.on_retrieve)
+        self.cancelButton.clicked.connect(self.on_cancel)
         self.titleCombo.currentTextChanged.connect(self.on_title_changed)
 
+    def load_saved(self):
+        """Show the manifests stored by earlier scrapes (no browser needed)."""
+        with tracing.span("gui.manifests.load_saved"):
+            self.scraped_results = manifests.load_manifests(self.conn)
+            self.titleCombo.clear()
+            self.titleCombo.addItems(list(self.scraped_results))
+
     def on_retrieve(self):
-        try:
-            self.scraped_results = scrape_receive_inventory()
-        except Exception as e:
-            print("Error scraping:", e)
+        """
+        Start scraping in the background; manifests appear (and are saved) as
+        they arrive. In diff mode titles already stored are skipped.
+        """
+        if self.scrape_thread is not None:
             return
-
-        self.titleCombo.clear()
-        self.titleCombo.addItems(self.scraped_results.keys())
-        if self.titleCombo.count() > 0:
-            self.titleCombo.setCurrentIndex(0)
-            self.on_title_changed(self.titleCombo.currentText())
+        diff = self.diffCheck.isChecked()
+        self._skipped = set(manifests.scraped_titles(self.conn)) if diff else set()
+        self._listed = []
+        self._scraped = 0
+        self._scrape_status = "done"
+        self.scrape_run = self.db.write(manifests.start_run, "diff" if diff else "full").result()
+
+        self.scrape_thread = QThread(self)
+        self.scrape_worker = ScrapeWorker(self.db, self.scrape_run, skip_titles=self._skipped)
+        self.scrape_worker.moveToThread(self.scrape_thread)
+        self.scrape_thread.started.connect(self.scrape_worker.run)
+        self.scrape_worker.titles_found.connect(self.on_titles_found)
+        self.scrape_worker.manifest_scraped.connect(self.on_manifest_scraped)
+        self.scrape_worker.failed.connect(self.on_scrape_failed)
+        self.scrape_worker.finished.connect(self.scrape_thread.quit)
+        self.scrape_thread.finished.connect(self.on_scrape_finished)
+
+        self.retrieveButton.setEnabled(False)
+        self.cancelButton.setEnabled(True)
+        self.scrapeProgress.setRange(0, 0)  # busy until the manifest count is known
+        self.scrapeProgress.setVisible(True)
+        self.scrape_thread.start()
+
+    def on_cancel(self):
+        if self.scrape_worker is not None:
+            self._scrape_status = "cancelled"
+            self.scrape_worker.cancel()
+            self.cancelButton.setEnabled(False)
+            self.scrapeProgress.setFormat("Cancelling…")
+
+    def stop_scrape(self):
+        """Cancel a running scrape and wait for its thread to finish."""
+        if self.scrape_thread is not None:
+            self._scrape_status = "cancelled"
+            self.scrape_worker.cancel()
+            self.scrape_thread.wait()
+            self._finish_run()
+
+    def on_scrape_failed(self, message):
+        print("Error scraping:", message)
+        self._scrape_status = "failed"
+
+    def on_titles_found(self, titles):
+        self._listed = titles
+        # Manifests no longer listed have been received; forget them. An
+        # empty list more likely means the page failed to load, so keep them.
+        if titles:
+            self.db.write(manifests.drop_missing, titles)
+            listed = set(titles)
+            for title in [t for t in self.scraped_results if t not in listed]:
+                del self.scraped_results[title]
+                self.titleCombo.removeItem(self.titleCombo.findText(title))
+        pending = [t for t in titles if t not in self._skipped]
+        self.scrapeProgress.setRange(0, len(pending))
+        self.scrapeProgress.setValue(0)
+        self.scrapeProgress.setFormat("%v / %m manifests")
+
+    def on_manifest_scraped(self, title, rows):
+        self.scraped_results[title] = rows
+        self._scraped += 1
+        if self.titleCombo.findText(title) < 0:
+            self.titleCombo.addItem(title)  # the first one selects itself
+        elif title == self.titleCombo.currentText():
+            self.on_load()
+        self.scrapeProgress.setValue(self.scrapeProgress.value() + 1)
+
+    def _finish_run(self):
+        if self.scrape_run is None:
+            return
+        self.db.write(manifests.finish_run, self.scrape_run, self._scrape_status,
+                      len(self._listed), self._scraped)
+        self.scrape_run = None
+
+    def on_scrape_finished(self):
+        self._finish_run()
+        self.scrape_thread.deleteLater()
+        self.scrape_worker.deleteLater()
+        self.scrape_thread = None
+        self.scrape_worker = None
+        self.retrieveButton.setEnabled(True)
+        self.cancelButton.setEnabled(False)
+        self.scrapeProgress.setVisible(False)
 
     def on_title_changed(self, title):
         if not title:
             self.dateInput.clear()
             return
 
-        # Manifest = last 8 characters
-        self.manifestInput.setText(title[-8:])
-
-        # METRC Vendor = text between first and last hyphens
-        first_dash = title.find('-')
-        last_dash = title.rfind('-')
-        vendor = title[first_dash+1:last_dash] if 0 <= first_dash < last_dash else ''
-        self.metrcVendorInput.setText(vendor)
+        parts = manifests.parse_title(title)
+        self.manifestInput.setText(parts["manifest"])
+        self.metrcVendorInput.setText(parts["metrc_vendor"])
+        self.dateInput.setText(parts["received_date"])
 
-        # Received Date = first 10 characters of title
-        date_str = title[:10]
-        self.dateInput.setText(date_str)
+        self.on_load()
 
     def on_load(self):
-        title = self.titleCombo.currentText()
-        items = self.scraped_results.get(title, [])
-
-        # prepare DB cursor
-        cur = self.conn.cursor()
-
-        # set row count
-        self.overviewTable.setRowCount(len(items))
-        for row, itm in enumerate(items):
-            metrc_name = itm.get("name", "")
-            qty = itm.get("qty", "")
-
-            # Lookup in master_product by metrc_name
-            cur.execute(
-                "SELECT catalog_name, cost, retail, room, strain_name FROM master_product WHERE metrc_name = ?",
-                (metrc_name,)
-            )
-            prod = cur.fetchone()
-            if prod:
-                catalog_name, cost, retail, room, strain = prod
-            else:
-                # fallback defaults
-                catalog_name = metrc_name
-                cost = ''
-                retail = ''
-                room = "Back Room" if "Sample" in metrc_name else "Sales Floor"
-                strain = "1Unit Item"
-
-            # Populate columns according to ActiveManifest Notes:
-            # Title = catalog product name
-            self.overviewTable.setItem(row, 0, QTableWidgetItem(catalog_name))
-            # Manifest, License blank, METRC Vendor, Received Date
-            self.overviewTable.setItem(row, 1, QTableWidgetItem(self.manifestInput.text()))
-            self.overviewTable.setItem(row, 2, QTableWidgetItem(""))
-            self.overviewTable.setItem(row, 3, QTableWidgetItem(self.metrcVendorInput.text()))
-            self.overviewTable.setItem(row, 4, QTableWidgetItem(self.dateInput.text()))
-            # METRC Name, Qty
-            self.overviewTable.setItem(row, 5, QTableWidgetItem(metrc_name))
-            self.overviewTable.setItem(row, 6, QTableWidgetItem(qty))
-            # Cost, Retail, Room, Strain
-            self.overviewTable.setItem(row, 7, QTableWidgetItem(str(cost)))
-            self.overviewTable.setItem(row, 8, QTableWidgetItem(str(retail)))
-            self.overviewTable.setItem(row, 9, QTableWidgetItem(room))
-            self.overviewTable.setItem(row, 10, QTableWidgetItem(strain))
+        with tracing.span("gui.manifests.show"):
+            title = self.titleCombo.currentText()
+            items = self.scraped_results.get(title, [])
+
+            # Resolve every METRC name against master_product in one pass
+            resolved = resolve_products(self.conn, [itm.get("name", "") for itm in items])
+            # Closest catalog names for the rows that had no exact match
+            unmatched = [prod.metrc_name for prod in resolved if not prod.matched]
+            suggestions = dict(zip(unmatched, suggest_many(self.conn, unmatched)))
+
+            manifest = self.manifestInput.text()
+            metrc_vendor = self.metrcVendorInput.text()
+            received_date = self.dateInput.text()
+            # Unknown products get the manifest's unit cost and a rule-based retail
+            dutchie_vendor = vendor_map.vendor_map(self.conn).get(metrc_vendor.strip(), "")
+            prices = pricing.price_manifest(self.conn, items, dutchie_vendor, resolved) if unmatched else []
+
+            self.overviewTable.setUpdatesEnabled(False)
+            try:
+                self.overviewTable.setRowCount(len(items))
+                for row, (itm, prod) in enumerate(zip(items, resolved)):
+                    cost, retail = prod.cost, prod.retail
+                    if not prod.matched:
+                        cost = itm.get("cost", "")
+                        retail = "" if prices[row] is None else f"{prices[row]:.2f}"
+                    # Populate columns according to ActiveManifest Notes:
+                    # Title = catalog product name; License left blank
+                    values = (
+                        prod.catalog_name, manifest, "", metrc_vendor, received_date,
+                        prod.metrc_name, itm.get("qty", ""),
+                        cost, retail, prod.room, prod.strain,
+                        _suggestion_text(suggestions.get(prod.metrc_name)),
+                    )
+                    for col, val in enumerate(values):
+                        item = QTableWidgetItem("" if val is None else str(val))
+                        self.overviewTable.setItem(row, col, item)
+            finally:
+                self.overviewTable.setUpdatesEnabled(True)
+
+
+def _suggestion_text(suggestion):
+    if suggestion is None:
+        return ""
+    return f"{suggestion.catalog_name} ({suggestion.score:.0%})"
@@ -10,9 +10,13 @@ from PyQt5.QtWidgets import (
     QMessageBox,
     QHeaderView,
 )
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, pyqtSignal
+import tracing
+from data import vendor_map
 
 class VendorNamesTab(QWidget):
+    mappings_saved = pyqtSignal()
+
     def __init__(self, conn):
         super().__init__()
         self.conn = conn
@@ -53,19 +57,28 @@ class VendorNamesTab(QWidget):
     def load_vendor_names(self):
         """Populate the table with vendor mappings from the database."""
         self.vendorNameTable.setRowCount(0)
-        cur = self.conn.cursor()
-        for r, (metrc, dutchie) in enumerate(
-            cur.execute(
-                "SELECT metrc_vendor, dutchie_vendor FROM vendor_names"
-            )
-        ):
-            self.vendorNameTable.insertRow(r)
-            itm_m = QTableWidgetItem(metrc)
-            itm_m.setTextAlignment(Qt.AlignCenter)
-            itm_d = QTableWidgetItem(dutchie)
-            itm_d.setTextAlignment(Qt.AlignCenter)
-            self.vendorNameTable.setItem(r, 0, itm_m)
-            self.vendorNameTable.setItem(r, 1, itm_d)
+        self._original = {}   # rowid -> (metrc, dutchie) as loaded
+        self._removed = set()
+        for rowid, metrc, dutchie in vendor_map.vendor_rows(self.conn):
+            self._original[rowid] = (metrc or "", dutchie or "")
+            self._append_row(metrc, dutchie, rowid)
+
+    def _append_row(self, metrc, dutchie, rowid=None):
+        """Add a table row; `rowid` is None for mappings not saved yet."""
+        r = self.vendorNameTable.rowCount()
+        self.vendorNameTable.insertRow(r)
+        item_m = QTableWidgetItem(metrc)
+        item_m.setTextAlignment(Qt.AlignCenter)
+        item_m.setData(Qt.UserRole, rowid)
+        self.vendorNameTable.setItem(r, 0, item_m)
+        item_d = QTableWidgetItem(dutchie)
+        item_d.setTextAlignment(Qt.AlignCenter)
+        self.vendorNameTable.setItem(r, 1, item_d)
+
+    def _row_values(self, r):
+        items = (self.vendorNameTable.item(r, 0), self.vendorNameTable.item(r, 1))
+        rowid = items[0].data(Qt.UserRole) if items[0] else None
+        return rowid, items[0].text() if items[0] else "", items[1].text() if items[1] else ""
 
     def add_vendor_mapping(self):
         """Add the text fields as a new mapping row in the table."""
@@ -76,14 +89,7 @@ class VendorNamesTab(QWidget):
                 self, "Missing input", "Please enter both METRC and Dutchie names."
             )
             return
-        r = self.vendorNameTable.rowCount()
-        self.vendorNameTable.insertRow(r)
-        item_m = QTableWidgetItem(metrc)
-        item_m.setTextAlignment(Qt.AlignCenter)
-        self.vendorNameTable.setItem(r, 0, item_m)
-        item_d = QTableWidgetItem(dutchie)
-        item_d.setTextAlignment(Qt.AlignCenter)
-        self.vendorNameTable.setItem(r, 1, item_d)
+        self._append_row(metrc, dutchie)
         self.new_metrc_input.clear()
         self.new_dutchie_input.clear()
 
@@ -91,21 +97,32 @@ class VendorNamesTab(QWidget):
         """Remove the currently selected rows from the table."""
         selected = self.vendorNameTable.selectionModel().selectedRows()
         for model_idx in sorted(selected, key=lambda x: x.row(), reverse=True):
+            rowid = self._row_values(model_idx.row())[0]
+            if rowid is not None:
+                self._removed.add(rowid)
             self.vendorNameTable.removeRow(model_idx.row())
 
-    def save_vendor_names(self):
-        """Write the current table contents back to the database."""
-        cur = self.conn.cursor()
-        cur.execute("DELETE FROM vendor_names")
+    def pending_changes(self):
+        """(added, updated, removed) since the last load or save."""
+        added, updated = [], []
         for r in range(self.vendorNameTable.rowCount()):
-            metrc = self.vendorNameTable.item(r, 0).text()
-            dutchie = self.vendorNameTable.item(r, 1).text()
-            cur.execute(
-                "INSERT OR REPLACE INTO vendor_names(metrc_vendor, dutchie_vendor) VALUES (?, ?)",
-                (metrc, dutchie),
-            )
-        self.conn.commit()
+            rowid, metrc, dutchie = self._row_values(r)
+            if rowid is None:
+                added.append((metrc, dutchie))
+            elif self._original.get(rowid) != (metrc, dutchie):
+                updated.append((rowid, metrc, dutchie))
+        return added, updated, sorted(self._removed)
+
+    def save_vendor_names(self):
+        """Write only the added, edited and removed mappings, in one transaction."""
+        with tracing.span("gui.vendor_names.save") as span:
+            added, updated, removed = self.pending_changes()
+            saved = vendor_map.apply_changes(self.conn, added, updated, removed)
+            span.set(added=len(added), updated=len(updated), removed=len(removed))
+            if saved:
+                self.load_vendor_names()  # pick up rowids of the new rows
+                self.mappings_saved.emit()
         QMessageBox.information(
-            self, "Saved", f"{self.vendorNameTable.rowCount()} mappings saved."
+            self, "Saved",
+            f"{len(added)} added, {len(updated)} changed, {len(removed)} removed.",
         )
-
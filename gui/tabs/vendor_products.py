@@ -1,10 +1,14 @@
 # ── intake-manager/gui/tabs/vendor_products.py ───────────────────────
+import sqlite3
 from PyQt5.QtWidgets import (
     QWidget, QVBoxLayout, QFormLayout, QLineEdit, QComboBox,
-    QPushButton, QTableWidget, QTableWidgetItem, QHeaderView,
-    QHBoxLayout, QFrame, QMessageBox, QApplication
+    QPushButton, QTableView, QHeaderView, QAbstractItemView,
+    QHBoxLayout, QFrame, QMessageBox, QApplication, QFileDialog
 )
-from PyQt5.QtCore import Qt, QEvent
+from PyQt5.QtCore import Qt, QEvent, QModelIndex
+import tracing
+from data import pricing, product_io, vendor_map
+from gui.models import VendorProductModel
 
 class VendorProductsTab(QWidget):
     def __init__(self, conn):
@@ -43,20 +47,29 @@ class VendorProductsTab(QWidget):
         btn_layout = QHBoxLayout()
         self.addProductButton = QPushButton("Add Product")
         self.deleteProductButton = QPushButton("Delete Selection")
+        self.importButton = QPushButton("Import File…")
+        self.exportButton = QPushButton("Export File…")
+        self.repriceButton = QPushButton("Reprice…")
         btn_layout.addWidget(self.addProductButton)
         btn_layout.addWidget(self.deleteProductButton)
+        btn_layout.addWidget(self.importButton)
+        btn_layout.addWidget(self.exportButton)
+        btn_layout.addWidget(self.repriceButton)
         layout.addLayout(btn_layout)
 
         # Connect signals
         self.metrcVendorCombo.currentIndexChanged.connect(self.update_dutchie_vendor)
         self.addProductButton.clicked.connect(self.add_vendor_product_row)
         self.deleteProductButton.clicked.connect(self.delete_selected_product)
+        self.importButton.clicked.connect(self.import_products)
+        self.exportButton.clicked.connect(self.export_products)
+        self.repriceButton.clicked.connect(self.reprice_products)
 
-        # Products table
-        self.vendorProductTable = QTableWidget(0, 4)
-        self.vendorProductTable.setHorizontalHeaderLabels([
-            "METRC Name", "Catalog Name", "Cost", "Retail"
-        ])
+        # Products table (rows are fetched lazily as the view scrolls)
+        self.productModel = VendorProductModel(self.conn, self)
+        self.vendorProductTable = QTableView()
+        self.vendorProductTable.setModel(self.productModel)
+        self.vendorProductTable.setSelectionBehavior(QAbstractItemView.SelectRows)
         self.vendorProductTable.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
         layout.addWidget(self.vendorProductTable)
 
@@ -82,39 +95,37 @@ class VendorProductsTab(QWidget):
         if not lines:
             return
         # Determine starting row: current row or 0
-        start_row = self.vendorProductTable.currentRow()
-        if start_row < 0:
-            start_row = 0
-        # Paste each line into METRC Name column
+        start_row = max(self.vendorProductTable.currentIndex().row(), 0)
+        # Paste each line into METRC Name column of the existing rows
+        model = self.productModel
         for i, text in enumerate(lines):
             row = start_row + i
-            # Ensure row exists
-            if row >= self.vendorProductTable.rowCount():
-                self.vendorProductTable.insertRow(row)
-            item = self.vendorProductTable.item(row, 0)
-            if item is None:
-                item = QTableWidgetItem()
-                self.vendorProductTable.setItem(row, 0, item)
-            item.setText(text)
+            while row >= model.rowCount() and model.canFetchMore(QModelIndex()):
+                model.fetchMore(QModelIndex())
+            if row >= model.rowCount():
+                break
+            model.setData(model.index(row, 0), text)
 
     def load_vendor_mappings(self):
-        """Populate METRC combo and clear Dutchie."""
-        self.vendor_map = {}
+        """Populate METRC combo (keeping the current choice) and clear Dutchie."""
+        current = self.metrcVendorCombo.currentText()
+        self.vendor_map = vendor_map.vendor_map(self.conn)
+        self.metrcVendorCombo.blockSignals(True)
         self.metrcVendorCombo.clear()
         self.metrcVendorCombo.addItem("Select a Vendor")
-        cur = self.conn.cursor()
-        for metrc, dutchie in cur.execute(
-            "SELECT metrc_vendor, dutchie_vendor FROM vendor_names"
-        ):
-            self.vendor_map[metrc] = dutchie
-            self.metrcVendorCombo.addItem(metrc)
-        self.dutchieVendorCombo.clear()
+        self.metrcVendorCombo.addItems(list(self.vendor_map))
+        self.metrcVendorCombo.blockSignals(False)
+        index = self.metrcVendorCombo.findText(current)
+        self.metrcVendorCombo.setCurrentIndex(max(index, 0))
+        # Only reload products (dropping unsaved edits) if the mapping changed
+        if self.dutchieVendorCombo.currentText() != self.vendor_map.get(current, ""):
+            self.update_dutchie_vendor()
 
     def update_dutchie_vendor(self):
         """When METRC vendor changes, clear table and show its Dutchie mapping."""
         metrc_sel = self.metrcVendorCombo.currentText()
         self.dutchieVendorCombo.clear()
-        self.vendorProductTable.setRowCount(0)
+        self.productModel.load("")
         if metrc_sel == "Select a Vendor":
             return
         dutchie = self.vendor_map.get(metrc_sel)
@@ -124,33 +135,9 @@ class VendorProductsTab(QWidget):
             self.load_vendor_products()
 
     def load_vendor_products(self):
-        """Load unique catalog entries and make cells editable."""
+        """Load unique catalog entries; the model fetches further pages on scroll."""
         vendor = self.dutchieVendorCombo.currentText().strip()
-        self.vendorProductTable.setRowCount(0)
-        self.original_records = []
-        if not vendor:
-            return
-        cur = self.conn.cursor()
-        cur.execute(
-            """
-            SELECT metrc_name, catalog_name, cost, retail
-            FROM master_product
-            WHERE dutchie_vendor = ?
-            GROUP BY catalog_name
-            """,
-            (vendor,)
-        )
-        for r, (m, cat, cost, ret) in enumerate(cur.fetchall()):
-            self.original_records.append((m, cat))
-            self.vendorProductTable.insertRow(r)
-            for c, val in enumerate((m, cat, cost, ret)):
-                item = QTableWidgetItem("" if val is None else str(val))
-                item.setTextAlignment(Qt.AlignCenter)
-                if c in (0, 2, 3):
-                    item.setFlags(item.flags() | Qt.ItemIsEditable)
-                else:
-                    item.setFlags(item.flags() & ~Qt.ItemIsEditable)
-                self.vendorProductTable.setItem(r, c, item)
+        self.productModel.load(vendor)
 
     def add_vendor_product_row(self):
         """Add a new product, preventing duplicate catalog entries."""
@@ -183,37 +170,97 @@ class VendorProductsTab(QWidget):
         selected = self.vendorProductTable.selectionModel().selectedRows()
         if not selected:
             return
-        cur = self.conn.cursor()
-        for idx in sorted(selected, key=lambda i: i.row(), reverse=True):
-            row = idx.row()
-            metrc = self.vendorProductTable.item(row, 0).text()
-            catalog = self.vendorProductTable.item(row, 1).text()
-            cur.execute(
-                "DELETE FROM master_product WHERE metrc_name=? AND catalog_name=?",
-                (metrc, catalog)
-            )
-            self.vendorProductTable.removeRow(row)
-        self.conn.commit()
+        self.productModel.delete_rows(idx.row() for idx in selected)
 
     def save_product_changes(self):
-        """Save edited METRC, cost, and retail back to DB."""
+        """Save edited METRC, cost, and retail back to DB (changed rows only)."""
         dutchie_vendor = self.dutchieVendorCombo.currentText().strip()
         if not dutchie_vendor:
             QMessageBox.warning(self, "No Vendor", "Select a METRC vendor first.")
             return
-        cur = self.conn.cursor()
-        for r in range(self.vendorProductTable.rowCount()):
-            new_metrc = self.vendorProductTable.item(r, 0).text().strip()
-            catalog = self.vendorProductTable.item(r, 1).text().strip()
-            cost_text = self.vendorProductTable.item(r, 2).text().strip()
-            retail_text = self.vendorProductTable.item(r, 3).text().strip()
-            cost = float(cost_text) if cost_text else None
-            retail = float(retail_text) if retail_text else None
-            orig_metrc, orig_catalog = self.original_records[r]
-            cur.execute(
-                "UPDATE master_product SET metrc_name=?, cost=?, retail=?"
-                " WHERE metrc_name=? AND catalog_name=? AND dutchie_vendor=?",
-                (new_metrc, cost, retail, orig_metrc, orig_catalog, dutchie_vendor)
+        try:
+            with tracing.span("gui.products.save") as span:
+                saved = self.productModel.save()
+                span.set(saved=saved)
+        except sqlite3.IntegrityError:
+            # Nothing was written and the rows stay marked as changed
+            QMessageBox.warning(
+                self, "Not Saved",
+                "Another product of this vendor already has that METRC name and "
+                "catalog name. Change the METRC name and save again.",
             )
-        self.conn.commit()
-        QMessageBox.information(self, "Saved", "All changes have been saved.")
+            return
+        QMessageBox.information(self, "Saved", f"{saved} changed products saved.")
+
+    def import_products(self):
+        """Upsert products from a CSV/XLSX file; blank vendors get the selected one."""
+        path, _ = QFileDialog.getOpenFileName(
+            self, "Import Products", "", "Spreadsheets (*.csv *.xlsx)"
+        )
+        if not path:
+            return
+        vendor = self.dutchieVendorCombo.currentText().strip()
+        QApplication.setOverrideCursor(Qt.WaitCursor)
+        try:
+            with tracing.span("gui.products.import") as span:
+                report = product_io.import_products(self.conn, path, default_vendor=vendor)
+                span.set(**{k: v for k, v in report.items() if k != "errors"})
+        except (ImportError, ValueError, OSError) as e:
+            QMessageBox.warning(self, "Import Failed", str(e))
+            return
+        finally:
+            QApplication.restoreOverrideCursor()
+        message = (f"{report['inserted']} inserted, {report['updated']} updated, "
+                   f"{report['unchanged']} unchanged, {report['skipped']} skipped.")
+        if report["errors"]:
+            message += "\n\n" + "\n".join(f"Line {line}: {error}" for line, error in report["errors"][:10])
+        QMessageBox.information(self, "Import Complete", message)
+        self.load_vendor_products()
+
+    def export_products(self):
+        """Write the selected vendor's products (or all of them) to CSV/XLSX."""
+        vendor = self.dutchieVendorCombo.currentText().strip()
+        path, _ = QFileDialog.getSaveFileName(
+            self, "Export Products", f"{vendor or 'master_product'}.csv",
+            "CSV (*.csv);;Excel (*.xlsx)"
+        )
+        if not path:
+            return
+        try:
+            with tracing.span("gui.products.export") as span:
+                count = product_io.export_products(self.conn, path, vendor or None)
+                span.set(rows=count)
+        except (ImportError, OSError) as e:
+            QMessageBox.warning(self, "Export Failed", str(e))
+            return
+        QMessageBox.information(self, "Export Complete", f"{count} products written to {path}.")
+
+    def reprice_products(self):
+        """Preview the pricing rules' retail changes for this vendor, then apply them."""
+        vendor = self.dutchieVendorCombo.currentText().strip()
+        if not vendor:
+            QMessageBox.warning(self, "No Vendor", "Select a METRC vendor first.")
+            return
+        if self.productModel.is_dirty():
+            QMessageBox.warning(self, "Unsaved Changes", "Save or discard your edits before repricing.")
+            return
+        with tracing.span("gui.products.reprice") as span:
+            repricing = pricing.reprice(self.conn, vendor)
+            span.set(changed=len(repricing))
+        if not len(repricing):
+            QMessageBox.information(self, "Reprice",
+                f"No retail prices to change ({repricing.priced} products covered by pricing rules).")
+            return
+        box = QMessageBox(QMessageBox.Question, "Reprice",
+                          f"{len(repricing)} retail prices would change. Apply them?",
+                          QMessageBox.Yes | QMessageBox.No, self)
+        box.setDetailedText("\n".join(
+            f"{r['catalog_name']}: {'' if r['old_retail'] is None else r['old_retail']} → {r['new_retail']:.2f}"
+            for r in repricing.rows(500)
+        ))
+        if box.exec_() != QMessageBox.Yes:
+            return
+        with tracing.span("gui.products.reprice_apply"):
+            updated = pricing.apply_repricing(self.conn, repricing)
+        QMessageBox.information(self, "Reprice", f"{updated} retail prices updated.")
+        self.load_vendor_products()
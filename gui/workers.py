@@ -0,0 +1,59 @@
+# ── intake-manager/gui/workers.py ────────────────────────────────────
+import threading
+from PyQt5.QtCore import QObject, pyqtSignal
+import tracing
+from data import manifests
+
+
+class ScrapeWorker(QObject):
+    """
+    Runs scrape_receive_inventory() on a QThread and streams its progress.
+    Each manifest is queued for saving under `run_id` as soon as it arrives.
+    """
+
+    titles_found = pyqtSignal(list)            # every listed manifest title
+    manifest_scraped = pyqtSignal(str, list)   # title, rows
+    failed = pyqtSignal(str)
+    finished = pyqtSignal()
+
+    def __init__(self, db, run_id, skip_titles=()):
+        super().__init__()
+        self._cancel = threading.Event()
+        self._db = db
+        self._run_id = run_id
+        self._skip_titles = list(skip_titles)
+
+    def run(self):
+        try:
+            # Imported here so selenium only loads once a scrape starts
+            from automation.receive_inventory import scrape_receive_inventory
+            with tracing.span("gui.scrape", skipped=len(self._skip_titles)) as span:
+                results = scrape_receive_inventory(
+                    on_titles=lambda titles: self.titles_found.emit(list(titles)),
+                    on_manifest=self._on_manifest,
+                    cancel=self._cancel,
+                    skip_titles=self._skip_titles,
+                )
+                if results is None:
+                    span.set(outcome="failed")
+                    self.failed.emit("Login failed")
+        except Exception as e:
+            self.failed.emit(str(e))
+        finally:
+            self.finished.emit()
+
+    def _on_manifest(self, title, rows):
+        # Called from scraping threads; the writer thread does the insert
+        future = self._db.write(manifests.save_manifest, self._run_id, title, rows)
+        future.add_done_callback(lambda f: self._check_saved(title, f))
+        self.manifest_scraped.emit(title, rows)
+
+    def _check_saved(self, title, future):
+        # Runs on the writer thread once the insert has committed or failed
+        error = future.exception()
+        if error is not None:
+            self.failed.emit(f"Saving {title!r} failed: {error}")
+
+    def cancel(self):
+        """Stop after the manifest currently being scraped."""
+        self._cancel.set()
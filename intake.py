@@ -0,0 +1,318 @@
+# ── intake-manager/intake.py ───────────────────────────────────────────
+"""
+Headless command line for the intake pipeline (no PyQt5 needed).
+
+    python intake.py scrape [--diff] [--workers N]
+    python intake.py resolve [--manifest M] [--unmatched]
+    python intake.py create-products (--csv FILE | --manifest [M]) [--batch B]
+    python intake.py sync-catalog [--full]
+    python intake.py strains sync
+    python intake.py strains upsert [NAME ...] [--manifest [M]]
+    python intake.py products import FILE [--vendor V]
+    python intake.py products export FILE [--vendor V]
+    python intake.py vendors upsert NAME LICENSE
+    python intake.py pricing rules | add-rule MARKUP [--vendor V] ... | remove-rule ID
+    python intake.py pricing preview [--vendor V] [--limit N]
+    python intake.py pricing apply [--vendor V]
+    python intake.py pricing manifest [--manifest M]
+    python intake.py trace summary [--runs N] [--name PREFIX]
+
+Results go to stdout (or --output) as JSON or CSV; progress messages go to
+stderr, so the output can be piped or written by cron. Every command in a run
+shares one database connection and the process-wide browser session.
+"""
+import argparse
+import csv
+import json
+import sys
+from contextlib import redirect_stdout
+
+import tracing
+from data.database import get_manager
+
+RESOLVE_FIELDS = [
+    "title", "manifest", "metrc_vendor", "received_date", "metrc_name", "qty",
+    "unit", "catalog_name", "cost", "retail", "room", "strain", "matched",
+    "suggestion",
+]
+
+
+# ── commands ─────────────────────────────────────────────────────────
+# Each returns a dict or a list of dicts; selenium is only imported by the
+# commands that drive the browser.
+
+def cmd_scrape(args, db):
+    from automation.receive_inventory import store_receive_inventory
+    return store_receive_inventory(db, diff=args.diff, workers=args.workers)
+
+
+def cmd_resolve(args, db):
+    from data import manifests
+    from data.product_search import suggest_many
+    from data.resolver import resolve_products
+
+    conn = db.reader()
+    rows = []
+    for title, items in manifests.load_manifests(conn).items():
+        parts = manifests.parse_title(title)
+        if args.manifest and parts["manifest"] != args.manifest:
+            continue
+        resolved = resolve_products(conn, [itm["name"] for itm in items])
+        for itm, prod in zip(items, resolved):
+            if args.unmatched and prod.matched:
+                continue
+            rows.append({
+                "title": title, **parts,
+                "metrc_name": prod.metrc_name, "qty": itm["qty"], "unit": itm["unit"],
+                "catalog_name": prod.catalog_name, "cost": prod.cost,
+                "retail": prod.retail, "room": prod.room, "strain": prod.strain,
+                "matched": prod.matched, "suggestion": "",
+            })
+    if args.suggest:
+        unmatched = [r for r in rows if not r["matched"]]
+        for row, s in zip(unmatched, suggest_many(conn, [r["metrc_name"] for r in unmatched])):
+            row["suggestion"] = s.catalog_name if s else ""
+    return rows
+
+
+def cmd_create_products(args, db):
+    from automation.bulk_add_products import create_products
+    batch, summary = create_products(db, args.csv, args.manifest, args.batch, args.workers)
+    return {"batch": batch, **summary}
+
+
+def cmd_sync_catalog(args, db):
+    from automation.catalog_sync import sync_catalog
+    from automation.session import dutchie_session
+    with dutchie_session() as driver:
+        if not driver:
+            raise SystemExit("login failed")
+        return sync_catalog(driver, db, full=True if args.full else None)
+
+
+def cmd_strains_sync(args, db):
+    from automation.session import dutchie_session
+    from automation.strains import sync_strains
+    with dutchie_session() as driver:
+        if not driver:
+            raise SystemExit("login failed")
+        return sync_strains(driver, db)
+
+
+def cmd_strains_upsert(args, db):
+    from automation.session import dutchie_session
+    from automation.strains import upsert_strains
+    from data.product_jobs import products_from_manifest
+
+    names = list(args.names)
+    if args.manifest is not None:
+        names += [p["strain"] for p in products_from_manifest(db.reader(), args.manifest or None)]
+    if not names:
+        raise SystemExit("no strains given")
+    with dutchie_session() as driver:
+        if not driver:
+            raise SystemExit("login failed")
+        return upsert_strains(driver, db, names)
+
+
+def cmd_products_import(args, db):
+    from data.product_io import import_products
+    report = db.write(import_products, args.file, default_vendor=args.vendor or "").result()
+    print(f"[Product Import] {args.file}: {report['inserted']} inserted, {report['updated']} updated, "
+          f"{report['unchanged']} unchanged, {report['skipped']} skipped")
+    return dict(report)
+
+
+def cmd_products_export(args, db):
+    from data.product_io import export_products
+    count = export_products(db.reader(), args.file, args.vendor)
+    print(f"[Product Export] {count} products written to {args.file}")
+    return {"file": args.file, "exported": count}
+
+
+def cmd_vendors_upsert(args, db):
+    from automation.vendors import upsert_vendor
+    result = upsert_vendor(args.name, args.license)
+    if result is None:
+        raise SystemExit("login failed")
+    return result
+
+
+def cmd_pricing_rules(args, db):
+    from data.pricing import load_rules
+    return load_rules(db.reader())
+
+
+def cmd_pricing_add_rule(args, db):
+    from data.pricing import add_rule
+    rule_id = db.write(add_rule, args.markup, args.vendor, args.category, args.room,
+                       args.min_grams, args.max_grams, args.round_to).result()
+    return {"id": rule_id}
+
+
+def cmd_pricing_remove_rule(args, db):
+    from data.pricing import delete_rule
+    return {"id": args.id, "removed": db.write(delete_rule, args.id).result()}
+
+
+def cmd_pricing_preview(args, db):
+    from data.pricing import reprice
+    return reprice(db.reader(), args.vendor).rows(args.limit)
+
+
+def cmd_pricing_apply(args, db):
+    from data.pricing import apply_repricing, reprice
+    repricing = reprice(db.reader(), args.vendor)
+    updated = db.write(apply_repricing, repricing).result()
+    print(f"[Pricing] {updated} of {len(repricing)} retail prices updated")
+    return {"priced": repricing.priced, "changed": len(repricing), "updated": updated}
+
+
+def cmd_pricing_manifest(args, db):
+    from data import manifests, vendor_map
+    from data.pricing import price_manifest
+
+    conn = db.reader()
+    vendors = vendor_map.vendor_map(conn)
+    rows = []
+    for title, items in manifests.load_manifests(conn).items():
+        parts = manifests.parse_title(title)
+        if args.manifest and parts["manifest"] != args.manifest:
+            continue
+        dutchie_vendor = vendors.get(parts["metrc_vendor"].strip(), "")
+        for itm, retail in zip(items, price_manifest(conn, items, dutchie_vendor)):
+            rows.append({"title": title, "metrc_name": itm["name"], "dutchie_vendor": dutchie_vendor,
+                         "cost": itm["cost"], "retail": itm["rec"], "suggested_retail": retail})
+    return rows
+
+
+def cmd_trace_summary(args, db):
+    return tracing.summarize(tracing.read_records(args.file), args.runs, args.name)
+
+
+# ── output ───────────────────────────────────────────────────────────
+def write_result(result, fmt, out):
+    if fmt == "json":
+        json.dump(result, out, indent=2, default=str)
+        out.write("\n")
+        return
+    rows = result if isinstance(result, list) else [result]
+    fields = list(rows[0]) if rows else RESOLVE_FIELDS
+    writer = csv.DictWriter(out, fieldnames=fields, extrasaction="ignore", lineterminator="\n")
+    writer.writeheader()
+    writer.writerows(rows)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="intake", description=__doc__.splitlines()[1])
+    parser.add_argument("--format", choices=("json", "csv"), default="json", help="Output format")
+    parser.add_argument("-o", "--output", help="Write results to this file instead of stdout")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("scrape", help="Scrape Receive Inventory manifests into the database")
+    p.add_argument("--diff", action="store_true", help="Only scrape titles not stored yet")
+    p.add_argument("--workers", type=int, default=1, help="Parallel browsers")
+    p.set_defaults(func=cmd_scrape)
+
+    p = sub.add_parser("resolve", help="Match stored manifest rows to master_product")
+    p.add_argument("--manifest", help="Only this manifest number")
+    p.add_argument("--unmatched", action="store_true", help="Only rows without a catalog match")
+    p.add_argument("--suggest", action="store_true", help="Add the closest catalog name for unmatched rows")
+    p.set_defaults(func=cmd_resolve)
+
+    p = sub.add_parser("create-products", help="Bulk-create products in Dutchie")
+    source = p.add_mutually_exclusive_group(required=True)
+    source.add_argument("--csv", help="CSV with columns name,retail,cost,strain,vendor")
+    source.add_argument("--manifest", nargs="?", const="",
+                        help="Unresolved active_manifest rows (optionally one manifest)")
+    p.add_argument("--batch", help="Batch name; re-use it to resume a batch")
+    p.add_argument("--workers", type=int, default=1, help="Parallel browsers")
+    p.set_defaults(func=cmd_create_products)
+
+    p = sub.add_parser("sync-catalog", help="Mirror the Dutchie catalog locally")
+    p.add_argument("--full", action="store_true", help="Walk every page and prune removed products")
+    p.set_defaults(func=cmd_sync_catalog)
+
+    p = sub.add_parser("strains", help="Strain commands")
+    strains = p.add_subparsers(dest="strains_command", required=True)
+    p = strains.add_parser("sync", help="Mirror the Dutchie strain list locally")
+    p.set_defaults(func=cmd_strains_sync)
+    p = strains.add_parser("upsert", help="Create or fix strains missing from the local mirror")
+    p.add_argument("names", nargs="*")
+    p.add_argument("--manifest", nargs="?", const="",
+                   help="Add the strains of unresolved active_manifest rows (optionally one manifest)")
+    p.set_defaults(func=cmd_strains_upsert)
+
+    p = sub.add_parser("products", help="master_product import/export")
+    products = p.add_subparsers(dest="products_command", required=True)
+    p = products.add_parser("import", help="Upsert master_product from a CSV/XLSX file")
+    p.add_argument("file")
+    p.add_argument("--vendor", help="Dutchie vendor for rows that leave it blank")
+    p.set_defaults(func=cmd_products_import)
+    p = products.add_parser("export", help="Write master_product to a CSV/XLSX file")
+    p.add_argument("file")
+    p.add_argument("--vendor", help="Only this Dutchie vendor's products")
+    p.set_defaults(func=cmd_products_export)
+
+    p = sub.add_parser("vendors", help="Vendor commands")
+    vendors = p.add_subparsers(dest="vendors_command", required=True)
+    p = vendors.add_parser("upsert", help="Create a vendor unless it already exists")
+    p.add_argument("name")
+    p.add_argument("license")
+    p.set_defaults(func=cmd_vendors_upsert)
+
+    p = sub.add_parser("pricing", help="Markup rules and repricing")
+    pricing = p.add_subparsers(dest="pricing_command", required=True)
+    p = pricing.add_parser("rules", help="List the markup rules")
+    p.set_defaults(func=cmd_pricing_rules)
+    p = pricing.add_parser("add-rule", help="Add a markup rule (retail = cost * MARKUP)")
+    p.add_argument("markup", type=float)
+    p.add_argument("--vendor", help="Only this Dutchie vendor")
+    p.add_argument("--category", help="Only this category")
+    p.add_argument("--room", help="Only this room")
+    p.add_argument("--min-grams", type=float, help="Weight tier lower bound (inclusive)")
+    p.add_argument("--max-grams", type=float, help="Weight tier upper bound (exclusive)")
+    p.add_argument("--round-to", type=float, default=0.01, help="Round retail up to a multiple of this")
+    p.set_defaults(func=cmd_pricing_add_rule)
+    p = pricing.add_parser("remove-rule", help="Delete a markup rule")
+    p.add_argument("id", type=int)
+    p.set_defaults(func=cmd_pricing_remove_rule)
+    p = pricing.add_parser("preview", help="Retail prices the rules would change")
+    p.add_argument("--vendor", help="Only this Dutchie vendor's products")
+    p.add_argument("--limit", type=int, help="Largest N changes only")
+    p.set_defaults(func=cmd_pricing_preview)
+    p = pricing.add_parser("apply", help="Write the rules' retail prices in one transaction")
+    p.add_argument("--vendor", help="Only this Dutchie vendor's products")
+    p.set_defaults(func=cmd_pricing_apply)
+    p = pricing.add_parser("manifest", help="Suggested retail for stored manifest rows")
+    p.add_argument("--manifest", help="Only this manifest number")
+    p.set_defaults(func=cmd_pricing_manifest)
+
+    p = sub.add_parser("trace", help="Timing traces")
+    trace = p.add_subparsers(dest="trace_command", required=True)
+    p = trace.add_parser("summary", help="p50/p95 per traced step across runs")
+    p.add_argument("--runs", type=int, help="Only the last N runs")
+    p.add_argument("--name", help="Only spans whose name starts with this")
+    p.add_argument("--file", help="Trace file (default INTAKE_TRACE_FILE)")
+    p.set_defaults(func=cmd_trace_summary)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    db = get_manager()
+    # Keep stdout for the results; the automation modules print progress
+    with redirect_stdout(sys.stderr):
+        with tracing.span(f"cli.{args.command}"):
+            result = args.func(args, db)
+            db.flush()
+    if args.output:
+        with open(args.output, "w", newline="", encoding="utf-8") as out:
+            write_result(result, args.format, out)
+    else:
+        write_result(result, args.format, sys.stdout)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
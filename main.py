@@ -1,10 +1,27 @@
 # ── intake-manager/main.py ─────────────────────────────────────────────
-from gui.main_window import ManifestManagerApp
-from PyQt5.QtWidgets import QApplication
 import sys
 
 if __name__ == "__main__":
+    # --profile-startup: report import and init time per module
+    profiler = None
+    if "--profile-startup" in sys.argv:
+        sys.argv.remove("--profile-startup")
+        from gui.startup_profile import StartupProfiler
+        profiler = StartupProfiler()
+        profiler.install()
+
+    from PyQt5.QtWidgets import QApplication
+    from gui.main_window import ManifestManagerApp
+    if profiler:
+        profiler.mark("imports")
+
     app = QApplication(sys.argv)
     window = ManifestManagerApp()
+    if profiler:
+        profiler.mark("window init")
+        first_tab = window.pages["Active Manifest"]
+        first_tab.built.connect(lambda _: (profiler.mark("first tab built"), profiler.report(window)))
     window.show()
+    if profiler:
+        profiler.mark("window shown")
     sys.exit(app.exec_())
@@ -0,0 +1,36 @@
+# ── intake-manager/tests/test_database.py ─────────────────────────────
+import sqlite3
+
+import pytest
+
+from data.database import init_db
+
+INSERT = "INSERT INTO master_product (dutchie_vendor, catalog_name, metrc_name, cost) VALUES (?, ?, ?, ?)"
+
+
+def test_migration_merges_null_and_blank_keys(tmp_path):
+    path = str(tmp_path / "old.db")
+    old = sqlite3.connect(path)
+    old.execute("CREATE TABLE master_product (metrc_name TEXT, catalog_name TEXT, cost REAL,"
+                " retail REAL, room TEXT, metrc_vendor TEXT, dutchie_vendor TEXT,"
+                " category TEXT, strain_name TEXT)")
+    old.executemany(INSERT, [("Freshy", "Guava Cart", None, 1.0),
+                             ("Freshy", "Guava Cart", "", 2.0),
+                             ("Freshy", "Guava Cart", None, 3.0)])
+    old.commit()
+    old.close()
+
+    conn = init_db(path)
+
+    assert conn.execute("SELECT metrc_name, cost FROM master_product").fetchall() == [("", 3.0)]
+    assert conn.execute("SELECT COUNT(*) FROM master_product_dupes").fetchone()[0] == 2
+
+
+def test_key_columns_reject_null():
+    conn = init_db(":memory:")
+    conn.execute(INSERT, ("Freshy", "Guava Cart", "", 1.0))
+
+    with pytest.raises(sqlite3.IntegrityError):
+        conn.execute(INSERT, ("Freshy", "Guava Cart", None, 2.0))
+    with pytest.raises(sqlite3.IntegrityError):
+        conn.execute("UPDATE master_product SET dutchie_vendor = NULL")
@@ -0,0 +1,37 @@
+# ── intake-manager/tests/test_flow_benchmarks.py ──────────────────────
+"""
+pytest-benchmark suite for the Selenium flows, run in Chrome against the
+local fake backoffice (benchmarks/bench_flows.py is the same suite as a
+standalone script). Each flow also checks its result.
+
+    python -m pytest tests/test_flow_benchmarks.py --benchmark-autosave
+    python -m pytest tests/test_flow_benchmarks.py --benchmark-compare --benchmark-compare-fail=median:25%
+
+Skipped when pytest-benchmark or selenium is not installed; the unit tests
+alone run with --benchmark-skip.
+"""
+import itertools
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+pytest.importorskip("selenium")
+
+from benchmarks.bench_flows import FLOWS, build_flows, default_flows, fake_backoffice  # noqa: E402
+
+ROUNDS = 5
+
+
+@pytest.fixture(scope="module")
+def flows():
+    with fake_backoffice() as (store, _):
+        yield build_flows(store)
+
+
+@pytest.mark.parametrize("name", FLOWS)
+def test_flow(benchmark, flows, name):
+    if name not in default_flows():
+        pytest.skip("needs Playwright")
+    runs = itertools.count()  # add_product names each product after its run
+    benchmark.group = "flows"
+    benchmark.pedantic(flows[name], setup=lambda: ((next(runs),), {}), rounds=ROUNDS)
@@ -0,0 +1,58 @@
+# ── intake-manager/tests/test_manifests.py ────────────────────────────
+from data import manifests, strain_cache
+from data.database import init_db
+from data.product_jobs import products_from_manifest
+
+TITLE = "06/01/2024 - Acme Farms - 40000001"
+ROWS = [
+    {"name": "Freshy Live Resin Cartridge 1g Shirley Temple, S", "qty": "10", "unit": "ea",
+     "cost": "$12.00", "rec": "$30.00"},
+    {"name": "Mystery Pre-Roll 1g", "qty": "5", "unit": "ea", "cost": "4", "rec": ""},
+]
+
+
+def _conn():
+    conn = init_db(":memory:")
+    strain_cache.upsert_strains(conn, [{"name": "Shirley Temple", "abbreviation": "Shirley Temple"},
+                                       {"name": "Temple", "abbreviation": "Temple"}])
+    return conn
+
+
+def test_saved_manifest_jobs_have_strains():
+    conn = _conn()
+    manifests.save_manifest(conn, manifests.start_run(conn), TITLE, ROWS)
+
+    jobs = {job["name"]: job for job in products_from_manifest(conn)}
+
+    assert jobs[ROWS[0]["name"]]["strain"] == "Shirley Temple"
+    assert jobs[ROWS[1]["name"]]["strain"] == "1Unit Item"
+
+
+def test_matched_product_strain_wins():
+    conn = _conn()
+    conn.execute(
+        "INSERT INTO master_product (metrc_name, catalog_name, dutchie_vendor, strain_name)"
+        " VALUES (?, 'Shirley Temple 1G LR Cart (Freshy)', 'Freshy', 'Shirley Temple OG')",
+        (ROWS[0]["name"],),
+    )
+
+    assert manifests.strains_for(conn, [ROWS[0]["name"]]) == ["Shirley Temple OG"]
+
+
+def test_rows_saved_without_strain_get_one():
+    conn = _conn()
+    conn.execute(
+        "INSERT INTO active_manifest (title, manifest, metrc_vendor, metrc_name)"
+        " VALUES (?, '40000001', 'Acme Farms', ?)",
+        (TITLE, ROWS[0]["name"]),
+    )
+
+    assert [job["strain"] for job in products_from_manifest(conn)] == ["Shirley Temple"]
+
+
+def test_empty_listing_keeps_stored_manifests():
+    conn = _conn()
+    manifests.save_manifest(conn, manifests.start_run(conn), TITLE, ROWS)
+
+    assert manifests.drop_missing(conn, []) == 0
+    assert manifests.scraped_titles(conn) == [TITLE]
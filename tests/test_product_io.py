@@ -0,0 +1,82 @@
+# ── intake-manager/tests/test_product_io.py ───────────────────────────
+from data import product_io
+from data.database import init_db
+
+PRODUCTS = [
+    # metrc_name, catalog_name, cost, retail, room, metrc_vendor, dutchie_vendor, category, strain_name
+    ("", "Shirley Temple  1G LR Cart (Freshy)", 12.0, 30.0, "Sales Floor", "Freshy", "Freshy", "Vape", ""),
+    ("", "Gotta Love Guava 1g Cart (Freshy)", 2.74123, "", "Sales Floor", "", "Freshy", "", ""),
+    ("Blueberry Test", "Blueberry 4:1 20-pack (Drops)", 1.5, 5.0, "Vault", "Drops", "Drops", "Edible", ""),
+]
+
+
+def _conn(rows=PRODUCTS):
+    conn = init_db(":memory:")
+    conn.executemany(
+        f"INSERT INTO master_product ({', '.join(product_io.COLUMNS)}) VALUES ({', '.join('?' * 9)})",
+        rows,
+    )
+    conn.commit()
+    return conn
+
+
+def _products(conn):
+    return conn.execute(
+        f"SELECT {', '.join(product_io.COLUMNS)} FROM master_product ORDER BY catalog_name"
+    ).fetchall()
+
+
+def test_round_trip_keeps_blank_metrc_names(tmp_path):
+    conn = _conn()
+    path = str(tmp_path / "products.csv")
+    product_io.export_products(conn, path)
+
+    target = init_db(":memory:")
+    report = product_io.import_products(target, path)
+
+    assert report["skipped"] == 0 and report["inserted"] == len(PRODUCTS)
+    assert [row[:2] for row in _products(target)] == [row[:2] for row in _products(conn)]
+    assert target.execute("SELECT COUNT(*) FROM master_product WHERE metrc_name = ''").fetchone()[0] == 2
+
+
+def test_unchanged_round_trip_rewrites_nothing(tmp_path):
+    conn = _conn()
+    before = _products(conn)
+    path = str(tmp_path / "products.csv")
+    product_io.export_products(conn, path)
+
+    report = product_io.import_products(conn, path)
+
+    assert (report["inserted"], report["updated"], report["unchanged"]) == (0, 0, len(PRODUCTS))
+    assert _products(conn) == before
+
+
+def test_changed_price_is_updated(tmp_path):
+    conn = _conn()
+    path = tmp_path / "products.csv"
+    path.write_text("metrc_name,catalog_name,dutchie_vendor,cost\n"
+                    ",Gotta Love Guava 1g Cart (Freshy),Freshy,3.10\n")
+
+    report = product_io.import_products(conn, str(path))
+
+    assert report["updated"] == 1
+    assert conn.execute(
+        "SELECT cost, retail, room, category FROM master_product"
+        " WHERE catalog_name = 'Gotta Love Guava 1g Cart (Freshy)'"
+    ).fetchone() == (3.1, "", "Sales Floor", "")
+
+
+def test_cost_only_file_leaves_other_columns_alone(tmp_path):
+    conn = _conn()
+    path = tmp_path / "costs.csv"
+    path.write_text("metrc_name,catalog_name,dutchie_vendor,cost\n"
+                    ",Shirley Temple  1G LR Cart (Freshy),Freshy,13\n"
+                    "Blueberry Test,Blueberry 4:1 20-pack (Drops),Drops,1.5\n")
+
+    report = product_io.import_products(conn, str(path))
+
+    assert (report["updated"], report["unchanged"]) == (1, 1)
+    assert conn.execute(
+        "SELECT cost, retail, room, category, metrc_vendor FROM master_product"
+        " WHERE catalog_name = 'Shirley Temple  1G LR Cart (Freshy)'"
+    ).fetchone() == (13.0, 30.0, "Sales Floor", "Vape", "Freshy")
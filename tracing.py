@@ -0,0 +1,223 @@
+# tracing.py
+"""
+Structured timing spans for the automation flows, GUI handlers and DB writes.
+
+    with span("add_product.save", url=driver.current_url) as s:
+        ...
+        s.set(rows=12)
+
+    @traced("resolver.resolve")
+    def resolve(...): ...
+
+Each finished span is one JSON object: name, run (one id per process),
+start time, ms, outcome ('ok' or 'error' plus the exception type), retries,
+page url and any extra fields. Spans go to an in-memory ring buffer
+(recent()) and, unless INTAKE_TRACE_FILE is set to an empty string, to a
+rotating JSONL file. summarize() aggregates p50/p95 per span name across
+runs:
+
+    python -m tracing [--runs N] [--name PREFIX]
+"""
+import functools
+import glob
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from logging.handlers import RotatingFileHandler
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+TRACE_FILE = os.getenv("INTAKE_TRACE_FILE", os.path.join(BASE_DIR, "logs", "trace.jsonl"))
+TRACE_MAX_BYTES = 5 * 1024 * 1024
+TRACE_BACKUPS = 5
+RING_SIZE = 2000
+
+RUN_ID = f"{datetime.now():%Y%m%d-%H%M%S}-{uuid.uuid4().hex[:6]}"
+
+_ring = deque(maxlen=RING_SIZE)
+# Open spans, innermost last; per thread and per asyncio task
+_stack = ContextVar("tracing_stack", default=())
+_logger = None
+_logger_lock = threading.Lock()
+
+
+def _file_logger():
+    """The JSONL logger, opened on first use; None when file tracing is off."""
+    global _logger
+    if not TRACE_FILE:
+        return None
+    with _logger_lock:
+        if _logger is None:
+            os.makedirs(os.path.dirname(TRACE_FILE) or ".", exist_ok=True)
+            handler = RotatingFileHandler(TRACE_FILE, maxBytes=TRACE_MAX_BYTES,
+                                          backupCount=TRACE_BACKUPS, encoding="utf-8")
+            handler.setFormatter(logging.Formatter("%(message)s"))
+            _logger = logging.getLogger("intake.trace")
+            _logger.propagate = False
+            _logger.setLevel(logging.INFO)
+            _logger.addHandler(handler)
+        return _logger
+
+
+class Span:
+    """
+    A running span; set() adds fields to the record written when it ends
+    (url=..., or outcome=... for a failure that didn't raise).
+    """
+
+    def __init__(self, name, fields):
+        self.name = name
+        self.fields = fields
+        self.retries = 0
+
+    def set(self, **fields):
+        self.fields.update(fields)
+
+
+def _record(record):
+    _ring.append(record)
+    logger = _file_logger()
+    if logger:
+        logger.info(json.dumps(record, default=str))
+
+
+@contextmanager
+def span(name, **fields):
+    """Time the block as span `name`; exceptions are recorded and re-raised."""
+    stack = _stack.get()
+    current = Span(name, fields)
+    parent = stack[-1].name if stack else None
+    token = _stack.set(stack + (current,))
+    started = time.time()
+    start = time.perf_counter()
+    outcome, error = "ok", None
+    try:
+        yield current
+    except BaseException as e:
+        outcome, error = "error", type(e).__name__
+        raise
+    finally:
+        _stack.reset(token)
+        record = {
+            "name": name, "run": RUN_ID, "ts": round(started, 3),
+            "ms": round((time.perf_counter() - start) * 1000, 2),
+            "outcome": outcome, "retries": current.retries,
+            "thread": threading.current_thread().name,
+        }
+        if parent:
+            record["parent"] = parent
+        if error:
+            record["error"] = error
+        record.update(current.fields)
+        _record(record)
+
+
+def traced(name=None):
+    """Decorator form of span(); the name defaults to module.function."""
+    def decorate(fn):
+        span_name = name or f"{fn.__module__}.{fn.__qualname__}"
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(span_name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def current():
+    """The innermost open span on this thread or asyncio task, or None."""
+    stack = _stack.get()
+    return stack[-1] if stack else None
+
+
+def count_retry():
+    """Note a retry against the innermost open span."""
+    s = current()
+    if s is not None:
+        s.retries += 1
+
+
+def recent(n=None, name=None):
+    """The last `n` finished spans in this process (optionally by name prefix)."""
+    records = [r for r in _ring if name is None or r["name"].startswith(name)]
+    return records if n is None else records[-n:]
+
+
+# ── summary ──────────────────────────────────────────────────────────
+def read_records(path=None):
+    """Every span in the JSONL file and its rotated backups, oldest first."""
+    path = path or TRACE_FILE
+    files = sorted(glob.glob(path + ".*"), key=lambda p: -int(p.rsplit(".", 1)[1])
+                   if p.rsplit(".", 1)[1].isdigit() else 0) + [path]
+    for file in files:
+        if not os.path.exists(file):
+            continue
+        with open(file, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue  # partial line from a crash
+
+
+def _percentile(ordered, pct):
+    return ordered[min(len(ordered) - 1, round(pct / 100 * (len(ordered) - 1)))]
+
+
+def summarize(records, runs=None, name=None):
+    """
+    Per span name: count, errors, retries, p50/p95/max ms and total seconds,
+    slowest total first. `runs` keeps only the last N runs; `name` filters
+    by prefix.
+    """
+    records = [r for r in records if name is None or r["name"].startswith(name)]
+    if runs:
+        order = list(dict.fromkeys(r["run"] for r in records))
+        keep = set(order[-runs:])
+        records = [r for r in records if r["run"] in keep]
+    groups = {}
+    for r in records:
+        groups.setdefault(r["name"], []).append(r)
+    summary = []
+    for span_name, items in groups.items():
+        ms = sorted(r["ms"] for r in items)
+        summary.append({
+            "name": span_name, "count": len(items),
+            "runs": len({r["run"] for r in items}),
+            "errors": sum(r["outcome"] != "ok" for r in items),
+            "retries": sum(r.get("retries", 0) for r in items),
+            "p50_ms": _percentile(ms, 50), "p95_ms": _percentile(ms, 95), "max_ms": ms[-1],
+            "total_s": round(sum(ms) / 1000, 2),
+        })
+    summary.sort(key=lambda s: -s["total_s"])
+    return summary
+
+
+def format_summary(summary):
+    lines = [f"{'span':<40} {'n':>6} {'err':>4} {'retry':>5} {'p50 ms':>9} {'p95 ms':>9} {'total s':>9}"]
+    for s in summary:
+        lines.append(f"{s['name'][:40]:<40} {s['count']:>6} {s['errors']:>4} {s['retries']:>5} "
+                     f"{s['p50_ms']:>9.1f} {s['p95_ms']:>9.1f} {s['total_s']:>9.2f}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(description="p50/p95 per traced step across runs.")
+    parser.add_argument("--file", help=f"Trace file (default {TRACE_FILE})")
+    parser.add_argument("--runs", type=int, help="Only the last N runs")
+    parser.add_argument("--name", help="Only spans whose name starts with this")
+    args = parser.parse_args(argv)
+    summary = summarize(read_records(args.file), args.runs, args.name)
+    print(format_summary(summary) if summary else "No spans recorded.")
+
+
+if __name__ == "__main__":
+    main()